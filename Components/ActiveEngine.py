@@ -0,0 +1,104 @@
+import numpy as np
+
+from Components.Engine import Engine
+
+
+class ActiveEngine(Engine):
+    """Engine that only evaluates the cells around the cells that changed in the
+    last generation. The number of alive neighbors of every cell is kept up to date
+    incrementally, so a generation costs in proportion to the board activity and a
+    quiescent board costs nothing.
+    The board is stored with a frame of dead cells so that the neighbors of any
+    cell are at fixed offsets of its (padded) flat id.
+    Under a rule where cells are born from nothing (B0) every cell of the board is
+    evaluated at every step.
+    """
+    def __init__(self, width, height):
+        super().__init__(width, height)
+
+        H = height + 2
+        self._cells = np.zeros((width + 2, height + 2), dtype=np.uint8)
+        self._count = np.zeros((width + 2, height + 2), dtype=np.int8)
+        self._inside = np.zeros((width + 2, height + 2), dtype=bool)
+        self._inside[1:-1, 1:-1] = True
+        self._neighbors = np.array([di*H + dj for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj])
+        self._area = np.append(self._neighbors, 0)
+        # padded ids of the cells that changed since the last evaluation
+        self._active = np.zeros(0, dtype=np.int64)
+        self._pending = []
+        self._everyCell = False         # evaluate every cell at every step, for the B0 rules
+
+    def _padded_id(self, idx):
+        i, j = np.divmod(idx, self.height)
+        return (i + 1)*(self.height + 2) + j + 1
+
+    def _board_id(self, pid):
+        i, j = np.divmod(pid, self.height + 2)
+        return (i - 1)*self.height + j - 1
+
+    def get_state(self):
+        return self._cells[1:-1, 1:-1]
+
+    def set_state(self, state):
+        self._cells[1:-1, 1:-1] = np.asarray(state) != 0
+        c = self._cells
+        self._count[...] = 0
+        self._count[1:-1, 1:-1] = (c[:-2, :-2] + c[:-2, 1:-1] + c[:-2, 2:] + c[1:-1, :-2] +
+                                   c[1:-1, 2:] + c[2:, :-2] + c[2:, 1:-1] + c[2:, 2:])
+        # every alive cell has to be evaluated again with its neighborhood
+        self._active = np.flatnonzero(self._cells)
+        self._pending = []
+
+    def is_alive(self, idx):
+        return bool(self._cells.flat[self._padded_id(idx)])
+
+    def set_cell(self, idx, alive):
+        pid = self._padded_id(idx)
+        if bool(self._cells.flat[pid]) != bool(alive):
+            self._flip(np.array([pid]))
+            self._pending.append(pid)
+
+    def set_cells_at(self, ids, alive):
+        pids = self._padded_id(np.asarray(ids, dtype=np.int64))
+        pids = pids[self._cells.flat[pids] != (1 if alive else 0)]
+        if len(pids):
+            self._flip(pids)
+            self._pending.extend(pids.tolist())
+
+    def set_rule(self, rule):
+        super().set_rule(rule)
+        self._everyCell = rule.births_from_nothing
+        # the cells stable under the old rule may change under the new one
+        self._active = np.flatnonzero(self._cells)
+
+    def population(self):
+        return int(np.count_nonzero(self._cells))
+
+    def _flip(self, pids):
+        """Change the state of the given cells and update the neighbors count
+        """
+        cells = self._cells.reshape(-1)
+        cells[pids] ^= 1
+        delta = np.where(cells[pids] == 1, 1, -1).astype(np.int8)
+        np.add.at(self._count.reshape(-1), (pids[:, None] + self._neighbors).ravel(), np.repeat(delta, 8))
+
+    def step(self):
+        if self._pending:
+            self._active = np.concatenate([self._active, self._pending])
+            self._pending = []
+        if len(self._active) == 0 and not self._everyCell:
+            return self._active
+        if self._everyCell:
+            candidates = np.flatnonzero(self._inside)
+        else:
+            # only the cells next to a change can change in this generation
+            candidates = np.unique((self._active[:, None] + self._area).ravel())
+            candidates = candidates[self._inside.reshape(-1)[candidates]]
+        count = self._count.reshape(-1)[candidates]
+        state = self._cells.reshape(-1)[candidates]
+        nextState = self._rule.table[state, count]
+        flipped = candidates[nextState != state]
+
+        self._flip(flipped)
+        self._active = flipped
+        return self._board_id(flipped)
@@ -0,0 +1,113 @@
+import os, stat, glob, queue, tempfile, threading, collections
+import numpy as np
+
+from Components.BoardFormats import write_board
+from Components.Rule import LIFE
+
+# Copy of a board taken to be saved later: the (width, height) state array, or the
+# alive (i, j) cells when the universe goes beyond the state, and the rulestring
+Snapshot = collections.namedtuple('Snapshot', 'generation state cells rule', defaults=(LIFE,))
+
+# Rotated autosaves kept in a folder
+KEEP = 5
+
+# Permissions of a new board file
+FILE_MODE = 0o644
+
+
+def snapshot_cells(snapshot):
+    """ Return the alive (i, j) cells of a snapshot
+    """
+    return snapshot.cells if snapshot.cells is not None else np.argwhere(snapshot.state)
+
+
+def write_atomic(path, cells, height, rule=LIFE):
+    """ Write the board file in a temporary file of the same folder, then rename it:
+        the path file is always a whole board, the old one or the new one
+    """
+    folder, name = os.path.split(path)
+    # a temporary file of its own for every save, it keeps the extensions that give the format
+    fd, temp = tempfile.mkstemp(dir=folder or '.', prefix='.', suffix='-' + name)
+    os.close(fd)
+    try:
+        write_board(temp, cells, height, rule)
+        with open(temp, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.chmod(temp, stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path) else FILE_MODE)
+        os.replace(temp, path)
+        fsync_folder(folder)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def fsync_folder(folder):
+    """ Write to disk the entries of the folder, so that a rename in it is durable
+        (folders cannot be opened on Windows)
+    """
+    if os.name == 'nt':
+        return
+    fd = os.open(folder or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def rotate(folder, pattern, keep=KEEP):
+    """ Remove the files of the folder matching pattern but the last keep ones,
+        in the order of their names
+    """
+    files = sorted(glob.glob(os.path.join(folder, pattern)))
+    for path in files[:max(len(files) - keep, 0)]:
+        os.remove(path)
+
+
+class Autosave(object):
+    """ Save board snapshots in a background thread: the caller only copies the
+        board, the cells are extracted, serialized, compressed and written atomically
+        by the thread, in the order of the saves.
+        With a rotation pattern, the files of the folder that match it are removed
+        after the save, but the last keep ones.
+        done(path, error) is called by the thread after every save, error is None
+        when the file was written.
+    """
+    def __init__(self, done=None, keep=KEEP):
+        self._done = done
+        self._keep = keep
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def save(self, path, snapshot, height, rotation=None):
+        """ Queue the snapshot to be written in the path board file
+        """
+        self._queue.put((path, snapshot, height, rotation))
+
+    def wait(self):
+        """ Wait for the queued saves to be written
+        """
+        self._queue.join()
+
+    def close(self):
+        """ Write the queued saves and stop the thread
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _write(self):
+        for path, snapshot, height, rotation in iter(self._queue.get, None):
+            error = None
+            try:
+                folder = os.path.dirname(path)
+                if folder and not os.path.exists(folder):
+                    os.makedirs(folder)
+                write_atomic(path, snapshot_cells(snapshot), height, snapshot.rule)
+                if rotation:
+                    rotate(folder, rotation, self._keep)
+            except Exception as e:
+                error = e
+            if self._done is not None:
+                self._done(path, error)
+            self._queue.task_done()
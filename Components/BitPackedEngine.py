@@ -0,0 +1,223 @@
+import numpy as np
+
+from Components.Engine import Engine
+
+WORD_BITS = 64
+
+# number of set bits of every byte value
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def full_adder(x, y, z):
+    """Bitwise full adder: return the sum and the carry bits of x + y + z
+    """
+    t = x ^ y
+    return t ^ z, (x & y) | (t & z)
+
+
+def half_adder(x, y):
+    """Bitwise half adder: return the sum and the carry bits of x + y
+    """
+    return x ^ y, x & y
+
+
+def rule_groups(rule):
+    """Return the groups of counts of the rule that have cells living: (high, two,
+    column0, column1) for the counts 4*high + 2*two and 4*high + 2*two + 1, with the
+    (born, survive) column of the rule table of each count
+    """
+    columns = [tuple(column) for column in rule.table.T.tolist()] + [(0, 0)]
+    groups = []
+    for high in range(3):
+        for two in range(1 if high == 2 else 2):
+            count = 4*high + 2*two
+            if any(columns[count] + columns[count + 1]):
+                groups.append((high, two, columns[count], columns[count + 1]))
+    return groups
+
+
+def _by_state(column, alive):
+    """Words of the cells that live with a count, from its column of the rule table:
+    the dead cells when they are born, the alive ones when they survive; True for
+    all the cells and False for none
+    """
+    born, survive = column
+    if born and survive:
+        return True
+    if born:
+        return ~alive
+    if survive:
+        return alive
+    return False
+
+
+def _mux(a, x0, x1):
+    """Words of x1 where the bits of a are set, of x0 elsewhere; x0 and x1 are words,
+    True or False
+    """
+    if x0 is x1:
+        return x0
+    if x0 is False:
+        return a if x1 is True else a & x1
+    if x1 is False:
+        return ~a if x0 is True else ~a & x0
+    if x0 is True:
+        return ~a | x1
+    if x1 is True:
+        return a | x0
+    return (a & x1) | (~a & x0)
+
+
+class BitPackedEngine(Engine):
+    """Engine that packs every board column (the cells with the same i) into
+    uint64 words, 64 cells per word: bit b of word k holds the cell j = 64*k + b.
+    The neighbors of 64 cells are summed at once with bitwise full adders, so
+    very large boards need one bit per cell plus a bounded working buffer.
+    The four bits of the counts select the cells of every count in the rule table.
+    """
+    def __init__(self, width, height, block_bytes=1 << 22):
+        super().__init__(width, height)
+
+        self._words = -(-height // WORD_BITS)
+        self._cells = np.zeros((width, self._words), dtype=np.uint64)
+        self._next = np.zeros_like(self._cells)
+        # mask of the valid cells of the last word of each column
+        self._lastMask = np.uint64((1 << (height - WORD_BITS*(self._words - 1))) - 1)
+        # columns computed at once: bounds the size of the temporary arrays
+        self._block = max(1, block_bytes // (8 * self._words))
+        self._groups = rule_groups(self._rule)
+
+    @property
+    def words(self):
+        return self._cells
+
+    def get_state(self):
+        b = self._cells.astype('<u8').view(np.uint8)
+        state = np.unpackbits(b, axis=1, bitorder='little')
+        return state[:, :self.height]
+
+    def set_state(self, state):
+        state = np.asarray(state) != 0
+        padded = np.zeros((self.width, self._words*WORD_BITS), dtype=np.uint8)
+        padded[:, :self.height] = state
+        self._cells[...] = np.packbits(padded, axis=1, bitorder='little').view('<u8')
+
+    def is_alive(self, idx):
+        i, j = divmod(int(idx), self.height)
+        return bool((int(self._cells[i, j // WORD_BITS]) >> (j % WORD_BITS)) & 1)
+
+    def set_cell(self, idx, alive):
+        i, j = divmod(int(idx), self.height)
+        bit = np.uint64(1 << (j % WORD_BITS))
+        if alive:
+            self._cells[i, j // WORD_BITS] |= bit
+        else:
+            self._cells[i, j // WORD_BITS] &= ~bit
+
+    def are_alive(self, ids):
+        i, j = np.divmod(np.asarray(ids, dtype=np.int64), self.height)
+        return ((self._cells[i, j // WORD_BITS] >> (j % WORD_BITS).astype(np.uint64)) & np.uint64(1)) != 0
+
+    def set_cells_at(self, ids, alive):
+        i, j = np.divmod(np.asarray(ids, dtype=np.int64), self.height)
+        bits = np.left_shift(np.uint64(1), (j % WORD_BITS).astype(np.uint64))
+        # several cells of the same word: the bits are accumulated
+        if alive:
+            np.bitwise_or.at(self._cells, (i, j // WORD_BITS), bits)
+        else:
+            np.bitwise_and.at(self._cells, (i, j // WORD_BITS), ~bits)
+
+    def cells(self):
+        i, j = self._bits(self._cells)
+        return np.stack([i, j], axis=1)
+
+    def set_cells(self, cells):
+        cells = self._on_board(cells)
+        self.set_cells_at(cells[:, 0]*self.height + cells[:, 1], True)
+
+    def set_rule(self, rule):
+        super().set_rule(rule)
+        self._groups = rule_groups(rule)
+
+    def population(self):
+        return int(POPCOUNT[self._cells.view(np.uint8)].sum(dtype=np.int64))
+
+    def _shifted(self, w):
+        """Return the words of the neighbors at j-1 and at j+1 of each cell
+        """
+        one, top = np.uint64(1), np.uint64(WORD_BITS - 1)
+        up = w << one
+        up[:, 1:] |= w[:, :-1] >> top
+        down = w >> one
+        down[:, :-1] |= w[:, 1:] << top
+        return up, down
+
+    def _step_block(self, start, stop):
+        """Compute the next generation of the columns in [start, stop)
+        """
+        lo, hi = max(start - 1, 0), min(stop + 1, self.width)
+        w = np.zeros((stop - start + 2, self._words), dtype=np.uint64)
+        w[lo - start + 1:hi - start + 1] = self._cells[lo:hi]
+        up, down = self._shifted(w)
+
+        # the eight neighbors: three from the previous column, two from the
+        # same column and three from the following one
+        sa, ca = full_adder(up[:-2], w[:-2], down[:-2])
+        sb, cb = full_adder(up[1:-1], down[1:-1], up[2:])
+        sc, cc = half_adder(w[2:], down[2:])
+        ones, cd = full_adder(sa, sb, sc)
+        t, fours = full_adder(ca, cb, cc)
+        twos, c = half_adder(t, cd)
+        fours, eights = half_adder(fours, c)
+
+        # counts are grouped by their fours, eights and twos bits: the cells of a group
+        # that live are a function of their ones bit and of their state
+        alive = w[1:-1]
+        nextState = None
+        for high, two, column0, column1 in self._groups:
+            cells = _mux(ones, _by_state(column0, alive), _by_state(column1, alive))
+            # a count of 8 has only the eights bit, it is not a count of 0
+            if high == 0:
+                group = twos & ~fours if two else ~(twos | fours | eights)
+            elif high == 1:
+                group = (twos if two else ~twos) & fours
+            else:
+                group = eights
+            cells = group if cells is True else group & cells
+            nextState = cells if nextState is None else nextState | cells
+        if nextState is None:
+            nextState = np.zeros_like(alive)
+        nextState[:, -1] &= self._lastMask
+        self._next[start:stop] = nextState
+
+    @staticmethod
+    def _bits(words):
+        """(i, j) of the set bits of the words of some columns, i from the first of
+        them: only the words that are not zero are unpacked
+        """
+        rows, cols = np.nonzero(words)
+        bits = np.unpackbits(words[rows, cols].astype('<u8').view(np.uint8).reshape(-1, 8),
+                             axis=1, bitorder='little')
+        r, b = np.nonzero(bits)
+        return rows[r].astype(np.int64), cols[r].astype(np.int64) * WORD_BITS + b
+
+    def _changed(self, old, new, start):
+        """Flat ids of the cells that differ between old and new words
+        """
+        i, j = self._bits(old ^ new)
+        return (i + start)*self.height + j
+
+    def _advance_one(self):
+        for start in range(0, self.width, self._block):
+            self._step_block(start, min(start + self._block, self.width))
+        self._cells, self._next = self._next, self._cells
+
+    def step(self):
+        self._advance_one()
+        changed = [self._changed(self._next[s:s + self._block], self._cells[s:s + self._block], s)
+                   for s in range(0, self.width, self._block)]
+        return np.concatenate(changed)
+
+    def advance(self, generations):
+        for _ in range(generations):
+            self._advance_one()
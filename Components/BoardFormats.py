@@ -0,0 +1,291 @@
+import os, re, io, csv, gzip, struct
+import numpy as np
+
+from Components.Rule import LIFE
+
+# Board files looked for in a folder, the first one found is loaded
+BOARD_NAMES = ['board.rle.gz', 'board.rle', 'board.golb', 'board.cells', 'board.csv']
+
+# Extension of the gzip compressed board files, after the one of their format
+GZIP = '.gz'
+
+# Header of the packed binary format: magic, position (i, j) of the first cell
+# and size (width, height) of the bitmap that follows
+PACKED_MAGIC = b'GOLB\x01'
+PACKED_HEADER = struct.Struct('<5sqqII')
+
+# Longest line of the written RLE files
+RLE_LINE = 70
+
+
+def open_board(path, mode='r'):
+    """Open a board file, through gzip when it is compressed
+    """
+    if path.lower().endswith(GZIP):
+        return gzip.open(path, mode + 't' if 'b' not in mode else mode, compresslevel=6)
+    return open(path, mode)
+
+
+def board_file(path):
+    """Return the file of a board: path itself or the first board file in the path folder
+    """
+    if os.path.isfile(path):
+        return path
+    for name in BOARD_NAMES:
+        if os.path.isfile(os.path.join(path, name)):
+            return os.path.join(path, name)
+    return os.path.join(path, 'board.csv')
+
+
+def bounding_box(cells):
+    """Return the (i, j) corner of the cells and the (width, height) boolean bitmap
+    that contains them
+    """
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+    if len(cells) == 0:
+        return (0, 0), np.zeros((0, 0), dtype=bool)
+    corner = cells.min(axis=0)
+    size = cells.max(axis=0) - corner + 1
+    bitmap = np.zeros(tuple(size.tolist()), dtype=bool)
+    bitmap[cells[:, 0] - corner[0], cells[:, 1] - corner[1]] = True
+    return tuple(corner.tolist()), bitmap
+
+
+# id,i,j rows: the format of the first boards
+def read_csv(path):
+    """Read the alive cells of a board file (rows id,i,j) as an (n, 2) array of (i, j)
+    """
+    path = board_file(path)
+    with open_board(path) as f:
+        text = f.read()
+    if not text.strip():
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.loadtxt(io.StringIO(text), delimiter=',', dtype=np.int64, usecols=(1, 2), ndmin=2)
+
+
+def write_csv(path, cells, height):
+    """Write the alive (i, j) cells as rows id,i,j, where id is the cell id on a
+    board with the given height
+    """
+    with open_board(path, 'w') as csvfile:
+        filewriter = csv.writer(csvfile)
+        for i, j in np.asarray(cells).tolist():
+            filewriter.writerow([i*height + j, i, j])
+
+
+# Run Length Encoded: the standard format of the Life pattern collections
+def read_rle(path):
+    """Read the alive cells of an RLE file. The position of the pattern comes from
+    a '#CXRLE Pos=i,j' or '#P i j' line, return the cells and whether it was found
+    """
+    position, body = None, []
+    with open_board(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#CXRLE'):
+                match = re.search(r'Pos=(-?\d+),(-?\d+)', line)
+                if match:
+                    position = (int(match.group(1)), int(match.group(2)))
+            elif line.startswith('#P'):
+                values = line[2:].split()
+                position = (int(values[0]), int(values[1]))
+            elif line.startswith('#') or line.startswith('x') or not line:
+                continue
+            else:
+                body.append(line)
+                if '!' in line:
+                    break
+
+    # every run of alive cells is a (row, first column, length) triple
+    rows, starts, lengths = [], [], []
+    i = j = 0
+    for count, tag in re.findall(r'(\d*)([^\d\s])', ''.join(body)):
+        count = int(count) if count else 1
+        if tag == '!':
+            break
+        elif tag == '$':
+            j += count
+            i = 0
+        elif tag in 'b.':
+            i += count
+        else:
+            rows.append(j)
+            starts.append(i)
+            lengths.append(count)
+            i += count
+
+    lengths = np.array(lengths, dtype=np.int64)
+    # column of every alive cell: the start of its run plus its position in the run
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    cells = np.stack([np.repeat(np.array(starts, dtype=np.int64), lengths) + offsets,
+                      np.repeat(np.array(rows, dtype=np.int64), lengths)], axis=1)
+    if position is not None:
+        cells += position
+    return cells, position is not None
+
+
+def write_rle(path, cells, rule=LIFE):
+    """Write the alive (i, j) cells as an RLE file that keeps their position
+    """
+    corner, bitmap = bounding_box(cells)
+    width, height = bitmap.shape
+    tokens = []
+    empty = 0
+    for j in range(height):
+        row = bitmap[:, j]
+        if not row.any():
+            empty += 1
+            continue
+        if tokens:
+            tokens.append('%d$' % (empty + 1) if empty else '$')
+        empty = 0
+        # runs of equal cells, the dead cells at the end of the row are implicit
+        row = row[:np.flatnonzero(row)[-1] + 1]
+        edges = np.flatnonzero(np.diff(row.astype(np.int8))) + 1
+        bounds = np.concatenate([[0], edges, [len(row)]])
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            n = stop - start
+            tokens.append(('%d' % n if n > 1 else '') + ('o' if row[start] else 'b'))
+    tokens.append('!')
+
+    lines, line = [], ''
+    for token in tokens:
+        if len(line) + len(token) > RLE_LINE:
+            lines.append(line)
+            line = ''
+        line += token
+    lines.append(line)
+    with open_board(path, 'w') as f:
+        f.write('#CXRLE Pos=%d,%d\n' % corner)
+        f.write('x = %d, y = %d, rule = %s\n' % (width, height, rule))
+        f.write('\n'.join(lines) + '\n')
+
+
+# Plaintext: one line of '.' (dead) and 'O' (alive) for every row
+def read_plaintext(path):
+    """Read the alive cells of a plaintext (.cells) file. The position of the pattern
+    comes from a '!Position: i,j' comment, return the cells and whether it was found
+    """
+    position, lines = None, []
+    with open_board(path) as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line.startswith('!'):
+                match = re.match(r'!Position:\s*(-?\d+),\s*(-?\d+)', line)
+                if match:
+                    position = (int(match.group(1)), int(match.group(2)))
+                continue
+            lines.append(line)
+    width = max([len(line) for line in lines] + [0])
+    text = np.frombuffer(''.join(line.ljust(width, '.') for line in lines).encode(), dtype=np.uint8)
+    alive = (text == ord('O')) | (text == ord('*'))
+    # the text is a (rows, columns) array: the cells are (column, row)
+    cells = np.argwhere(alive.reshape(len(lines), width))[:, ::-1].copy()
+    if position is not None:
+        cells += position
+    return cells, position is not None
+
+
+def write_plaintext(path, cells, name=None, rule=LIFE):
+    """Write the alive (i, j) cells as a plaintext file that keeps their position,
+    and their rule when it is not Life
+    """
+    corner, bitmap = bounding_box(cells)
+    rows = np.where(bitmap.T, ord('O'), ord('.')).astype(np.uint8)
+    with open_board(path, 'w') as f:
+        if name:
+            f.write('!Name: %s\n' % name)
+        if rule != LIFE:
+            f.write('!Rule: %s\n' % rule)
+        f.write('!Position: %d,%d\n' % corner)
+        for row in rows:
+            f.write(row.tobytes().decode().rstrip('.') + '\n')
+
+
+# Packed binary: a header and the bitmap of the bounding box, one bit per cell
+def read_packed(path):
+    """Read the alive cells of a packed binary (.golb) file
+    """
+    with open_board(path, 'rb') as f:
+        magic, i, j, width, height = PACKED_HEADER.unpack(f.read(PACKED_HEADER.size))
+        if magic != PACKED_MAGIC:
+            raise ValueError("%s is not a packed board file" % path)
+        bits = np.frombuffer(f.read(), dtype=np.uint8)
+    bitmap = np.unpackbits(bits, count=width*height, bitorder='little').reshape(width, height)
+    return np.argwhere(bitmap) + (i, j)
+
+
+def write_packed(path, cells):
+    """Write the alive (i, j) cells as a packed binary file
+    """
+    corner, bitmap = bounding_box(cells)
+    with open_board(path, 'wb') as f:
+        f.write(PACKED_HEADER.pack(PACKED_MAGIC, corner[0], corner[1], *bitmap.shape))
+        f.write(np.packbits(bitmap, axis=None, bitorder='little').tobytes())
+
+
+# File formats by extension
+FORMATS = ['.rle', '.cells', '.golb', '.csv']
+
+
+def board_format(path):
+    """Return the format (extension) of a board file, csv when it is not known; the
+    files of any format can be gzip compressed, with the .gz extension after it
+    """
+    path = path.lower()
+    if path.endswith(GZIP):
+        path = path[:-len(GZIP)]
+    ext = os.path.splitext(path)[1]
+    return ext if ext in FORMATS else '.csv'
+
+
+def read_board(path):
+    """Read the alive cells of a board file of any format (or of the board file in
+    the path folder), return the (n, 2) array of (i, j) and whether the cells have
+    their position: RLE and plaintext patterns may have none
+    """
+    path = board_file(path)
+    fmt = board_format(path)
+    if fmt == '.rle':
+        return read_rle(path)
+    elif fmt == '.cells':
+        return read_plaintext(path)
+    elif fmt == '.golb':
+        return read_packed(path), True
+    return read_csv(path), True
+
+
+def read_rule(path):
+    """Return the rulestring of a board file (or of the board file in the path folder),
+    None when it has none: only the RLE and plaintext files keep the rule
+    """
+    path = board_file(path)
+    fmt = board_format(path)
+    if fmt not in ('.rle', '.cells'):
+        return None
+    with open_board(path) as f:
+        for line in f:
+            line = line.strip()
+            if fmt == '.rle' and line.startswith('x'):
+                match = re.search(r'rule\s*=\s*([^\s,]+)', line)
+                return match.group(1) if match else None
+            elif fmt == '.cells' and line.startswith('!Rule:'):
+                return line[len('!Rule:'):].strip() or None
+            elif line and not line.startswith('#' if fmt == '.rle' else '!'):
+                break
+    return None
+
+
+def write_board(path, cells, height, rule=LIFE):
+    """Write the alive (i, j) cells in the format of the path extension, with the
+    rulestring when the format keeps it
+    """
+    fmt = board_format(path)
+    if fmt == '.rle':
+        write_rle(path, cells, rule)
+    elif fmt == '.cells':
+        write_plaintext(path, cells, rule=rule)
+    elif fmt == '.golb':
+        write_packed(path, cells)
+    else:
+        write_csv(path, cells, height)
@@ -0,0 +1,72 @@
+import collections
+import numpy as np
+
+# Longest period of the cycles looked for
+MAX_PERIOD = 64
+
+
+def coordinate_keys(cells):
+    """Return the 64 bit keys of the (i, j) cells of an unbounded universe, the
+    splitmix64 mix of their coordinates
+    """
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+    z = (cells[:, 0].astype(np.uint64) << np.uint64(32)) ^ (cells[:, 1].astype(np.uint64) & np.uint64(0xffffffff))
+    z += np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class BoardHash(object):
+    """Zobrist hash of a board: the XOR of a 64 bit key for every alive cell,
+    the splitmix64 mix of its coordinates. Flipping a cell flips its key, so
+    after a step the hash is updated with the keys of the changed cells only.
+    The keys are computed when needed, the board keeps no table of them; the
+    hash of an unbounded universe is computed from its alive cells the same way.
+    """
+    def __init__(self, height):
+        self._height = height
+        self._value = np.uint64(0)
+
+    @property
+    def value(self):
+        return int(self._value)
+
+    def reset_cells(self, cells):
+        """Compute the hash of a board or a universe from its alive (i, j) cells
+        """
+        self._value = np.bitwise_xor.reduce(coordinate_keys(cells), initial=np.uint64(0))
+
+    def flip(self, changed):
+        """Update the hash after the cells with the given flat ids changed state
+        """
+        i, j = np.divmod(np.asarray(changed, dtype=np.int64), self._height)
+        self._value ^= np.bitwise_xor.reduce(coordinate_keys(np.stack([i, j], axis=1)), initial=np.uint64(0))
+
+
+class CycleDetector(object):
+    """Hashes of the last generations: a board with the hash of a board p
+    generations before is in a cycle of period p (a still life when p is 1)
+    """
+    def __init__(self, max_period=MAX_PERIOD):
+        self._maxPeriod = max_period
+        self._hashes = collections.deque()      # (generation, hash) of the last generations
+        self._seen = {}                         # last generation of every hash in the deque
+
+    def clear(self):
+        self._hashes.clear()
+        self._seen.clear()
+
+    def add(self, generation, value):
+        """Add the hash of a generation, return the period of the cycle it closes or None
+        """
+        previous = self._seen.get(value)
+        self._hashes.append((generation, value))
+        self._seen[value] = generation
+        if len(self._hashes) > self._maxPeriod + 1:
+            old_generation, old = self._hashes.popleft()
+            if self._seen[old] == old_generation:
+                del self._seen[old]
+        if previous is not None and generation - previous <= self._maxPeriod:
+            return generation - previous
+        return None
@@ -0,0 +1,141 @@
+from PyQt5 import QtCore, QtGui, QtWidgets
+import numpy as np
+import math
+
+# Smallest cells, in pixels, drawn with the grid lines
+GRID_PIXELS = 4
+
+def density_table(dead_color, alive_color):
+    """ Return the 256 colors from the dead color (density 0) to the alive one (255)
+    """
+    return [QtGui.qRgb(*(round(d + (a - d)*k/255) for d, a in zip(dead_color.getRgb()[:3], alive_color.getRgb()[:3])))
+            for k in range(256)]
+
+
+class BoardItem(QtWidgets.QGraphicsItem):
+    """ Graphics item that paints the whole GOL board at once, from an image
+        built directly over the buffer of the board shown, kept up to date with the
+        cells born and dead: the engine can be computing the next generations in
+        another thread.
+        The board is a (columns, rows) array, so the image has one line per board
+        column and it is painted transposed.
+        Only the cells of the exposed rectangle are painted. Zoomed out below one
+        pixel per cell, the board is painted from the level of the mip pyramid with
+        about one block per pixel, as a density image: the cost of a repaint is
+        bounded by the pixels of the view, not by the size of the board.
+    """
+
+    def __init__(self, model, alive_color, dead_color, history_colors, grid_color=QtCore.Qt.lightGray,
+                 pyramid=None):
+        super().__init__()
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption)
+
+        self.model = model
+        self.pyramid = pyramid
+        self._stateTable = [dead_color.rgb(), alive_color.rgb()]
+        self._densityTable = density_table(dead_color, alive_color)
+        # index 0 is a transparent cell, index k the history color of decay k
+        self._historyTable = [QtGui.qRgba(0, 0, 0, 0)] + [c.rgb() for c in history_colors]
+        self._state = np.zeros((model.max_num_cell_x, model.max_num_cell_y), dtype=np.uint8)
+        self._history = np.zeros((model.max_num_cell_x, model.max_num_cell_y), dtype=np.uint8)
+
+        self._pen = QtGui.QPen(grid_color)
+        self._pen.setCosmetic(True)
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def history(self):
+        return self._history
+
+    def boundingRect(self):
+        return QtCore.QRectF(0, 0, self.model.max_num_cell_x*self.model.cell_size,
+                             self.model.max_num_cell_y*self.model.cell_size)
+
+    def _image(self, buffer, colorTable):
+        """ Return an indexed image that shares the memory of the (columns, rows) buffer
+        """
+        image = QtGui.QImage(buffer.data, buffer.shape[1], buffer.shape[0], buffer.strides[0],
+                             QtGui.QImage.Format_Indexed8)
+        image.setColorTable(colorTable)
+        return image
+
+    def visible_cells(self, rect):
+        """ Return the [i0, i1) x [j0, j1) range of the cells in the rect of the item
+        """
+        cs = self.model.cell_size
+        rect = rect.intersected(self.boundingRect())
+        return (max(int(rect.left() // cs), 0), min(int(math.ceil(rect.right() / cs)), self.model.max_num_cell_x),
+                max(int(rect.top() // cs), 0), min(int(math.ceil(rect.bottom() / cs)), self.model.max_num_cell_y))
+
+    def cell_pixels(self, painter):
+        """ Return the side of a cell in pixels of the painter device
+        """
+        return QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())*self.model.cell_size
+
+    def detail_level(self, pixels):
+        """ Return the level of the pyramid to paint cells of the given pixels: 0 for the
+            cells themselves, k for blocks of 2^k cells when the cells are smaller than a pixel
+        """
+        if self.pyramid is None or pixels >= 1 or pixels <= 0:
+            return 0
+        return min(int(math.ceil(-math.log2(pixels))), self.pyramid.depth)
+
+    def paint(self, painter, option, widget=None):
+        """ Paint the exposed board cells, the history cells and the grid lines
+        """
+        rect = option.exposedRect if not option.exposedRect.isEmpty() else self.boundingRect()
+        i0, i1, j0, j1 = self.visible_cells(rect)
+        if i0 >= i1 or j0 >= j1:
+            return
+        cs = self.model.cell_size
+        pixels = self.cell_pixels(painter)
+        level = self.detail_level(pixels)
+        painter.save()
+        painter.setClipRect(self.boundingRect(), QtCore.Qt.IntersectClip)
+        if level == 0:
+            painter.setTransform(QtGui.QTransform(0, cs, cs, 0, i0*cs, j0*cs), True)
+            painter.drawImage(0, 0, self._image(np.ascontiguousarray(self._state[i0:i1, j0:j1]), self._stateTable))
+            history = self._history[i0:i1, j0:j1]
+            if history.any():
+                painter.drawImage(0, 0, self._image(np.ascontiguousarray(history), self._historyTable))
+            painted = (i1 - i0)*(j1 - j0)
+        else:
+            # blocks of the pyramid level that contain the visible cells
+            b = 1 << level
+            bi0, bj0 = i0 >> level, j0 >> level
+            density = self.pyramid.density(level, bi0, bj0, -(-i1 // b), -(-j1 // b))
+            painter.setTransform(QtGui.QTransform(0, cs*b, cs*b, 0, bi0*b*cs, bj0*b*cs), True)
+            painter.drawImage(0, 0, self._image(density, self._densityTable))
+            painted = density.size
+        painter.restore()
+        if self.model.profiler.enabled:
+            self.model.profiler.count('painted', painted)
+        if pixels >= GRID_PIXELS:
+            self.paint_grid(painter, i0, i1, j0, j1)
+
+    def paint_grid(self, painter, i0, i1, j0, j1):
+        """ Draw the grid lines of the cells [i0, i1) x [j0, j1) as an overlay of the cells
+        """
+        cs = self.model.cell_size
+        painter.setPen(self._pen)
+        painter.drawLines([QtCore.QLineF(i*cs, j0*cs, i*cs, j1*cs) for i in range(i0, i1 + 1)] +
+                          [QtCore.QLineF(i0*cs, j*cs, i1*cs, j*cs) for j in range(j0, j1 + 1)])
+
+    def set_history(self, decay):
+        """ Color the cells with the history colors of their decay index (flat array)
+        """
+        np.minimum(decay, len(self._historyTable) - 1, out=self._history.reshape(-1))
+        self.update()
+
+    def update_cells(self, born, dead):
+        """ Repaint the board after the cells born and dead (lists of ids) changed,
+            they are not history cells anymore
+        """
+        self._state.flat[born] = 1
+        self._state.flat[dead] = 0
+        self._history.flat[born] = 0
+        self._history.flat[dead] = 0
+        self.update()
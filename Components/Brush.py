@@ -0,0 +1,88 @@
+import numpy as np
+
+# Brush sizes offered by the GUI, in cells
+BRUSH_SIZES = [1, 2, 3, 5, 9]
+
+
+def line_cells(i0, j0, i1, j1):
+    """ Return the (n, 2) array of the (i, j) cells of the Bresenham line from
+        (i0, j0) to (i1, j1), both included
+    """
+    di, dj = abs(i1 - i0), -abs(j1 - j0)
+    si, sj = (1 if i0 < i1 else -1), (1 if j0 < j1 else -1)
+    error = di + dj
+    cells = []
+    while True:
+        cells.append((i0, j0))
+        if i0 == i1 and j0 == j1:
+            break
+        e2 = 2*error
+        if e2 >= dj:
+            error += dj
+            i0 += si
+        if e2 <= di:
+            error += di
+            j0 += sj
+    return np.array(cells, dtype=np.int64)
+
+
+def brush_offsets(size):
+    """ Return the (i, j) offsets of the cells of a round brush of size cells across
+    """
+    k = np.arange(size) - size // 2
+    centre = (size - 1) / 2 - size // 2
+    di, dj = np.meshgrid(k, k, indexing='ij')
+    inside = (di - centre)**2 + (dj - centre)**2 <= (size / 2)**2
+    return np.stack([di[inside], dj[inside]], axis=1)
+
+
+class Stroke(object):
+    """ Cells painted alive (or dead) by a mouse drag on a (width, height) board.
+        Every point added is joined to the previous one with a Bresenham line
+        stamped with the brush, so fast drags do not skip cells; the cells are
+        collected until take() is called, once per frame, to be written in one batch.
+        The ids of the cells the stroke actually changed are kept to undo it.
+    """
+    def __init__(self, width, height, alive, size=1):
+        self._width = width
+        self._height = height
+        self._alive = alive
+        self._offsets = brush_offsets(size)
+        self._last = None
+        self._pending = []
+        self._changed = []
+
+    @property
+    def alive(self):
+        return self._alive
+
+    @property
+    def changed(self):
+        """ Ids of the cells changed by the stroke
+        """
+        return np.concatenate(self._changed) if self._changed else np.zeros(0, dtype=np.int64)
+
+    def add(self, i, j):
+        """ Add the point of the (i, j) cell to the stroke
+        """
+        start = self._last if self._last is not None else (i, j)
+        self._last = (i, j)
+        cells = (line_cells(start[0], start[1], i, j)[:, None, :] + self._offsets).reshape(-1, 2)
+        inside = ((cells[:, 0] >= 0) & (cells[:, 0] < self._width) &
+                  (cells[:, 1] >= 0) & (cells[:, 1] < self._height))
+        self._pending.append(cells[inside, 0]*self._height + cells[inside, 1])
+
+    def take(self):
+        """ Return the ids of the cells added since the last call, each one once
+        """
+        if not self._pending:
+            return np.zeros(0, dtype=np.int64)
+        ids = np.unique(np.concatenate(self._pending))
+        self._pending = []
+        return ids
+
+    def applied(self, changed):
+        """ Keep the ids of the cells that changed when the taken ones were written
+        """
+        if len(changed):
+            self._changed.append(np.asarray(changed, dtype=np.int64))
@@ -1,7 +1,13 @@
+import numpy as np
+
+from Components.Rule import LIFE_RULE
+
 
 class CellState(object):
     """Abstract CellState class
     """
+    __slots__ = ('state',)
+
     def isAlive(self):
         """Checks whether the state is Live
         """
@@ -11,6 +17,8 @@ class CellState(object):
 class DeadState(CellState):
     """State representing a Dead Cell
     """
+    __slots__ = ()
+
     def __init__(self):
         self.state = False
 
@@ -23,6 +31,8 @@ class DeadState(CellState):
 class AliveState(CellState):
     """State representing Live Cell
     """
+    __slots__ = ()
+
     def __init__(self):
         self.state = True
 
@@ -32,77 +42,196 @@ class AliveState(CellState):
         return self.state
 
 
+# The states shared by all the cells, by their value in the state arrays
+DEAD = DeadState()
+ALIVE = AliveState()
+STATES = (DEAD, ALIVE)
+
+
+class CellBoard(object):
+    """Cells of a (width, height) board, kept in flat arrays indexed by the cell id
+    i*height + j: the current and the next state (uint8) and the ids of the 8
+    neighbors (-1 outside the board). The state arrays have one more cell, always
+    dead, that the -1 neighbors read.
+    A cell of the board is a Cell, created on access: the board holds no object
+    per cell, and the whole board is updated with array operations.
+    """
+    def __init__(self, width, height, cell_size=1):
+        self._width = width
+        self._height = height
+        self._cellSize = cell_size
+        self._state = np.zeros(width*height + 1, dtype=np.uint8)
+        self._next = np.zeros(width*height + 1, dtype=np.uint8)
+        self._neighbors = np.full((width*height, 8), -1, dtype=np.int32)
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def cell_size(self):
+        return self._cellSize
+
+    @property
+    def state(self):
+        """Flat array of the current states
+        """
+        return self._state[:-1]
+
+    @property
+    def next_state(self):
+        """Flat array of the next states
+        """
+        return self._next[:-1]
+
+    @property
+    def neighbors(self):
+        """(width*height, 8) array of the neighbors ids
+        """
+        return self._neighbors
+
+    def __len__(self):
+        return len(self._neighbors)
+
+    def __getitem__(self, idx):
+        if not -len(self) <= idx < len(self):
+            raise IndexError("cell id outside the board")
+        return Cell(self, idx % len(self))
+
+    def __iter__(self):
+        return (Cell(self, idx) for idx in range(len(self)))
+
+    def set_neighbors(self, table):
+        """Set the neighbors of every cell from a (width*height, 8) table of ids
+        """
+        self._neighbors[...] = table
+
+    def position(self, idx):
+        """Return the (x, y) position of the cell in the board
+        """
+        i, j = divmod(idx, self._height)
+        return i*self._cellSize, j*self._cellSize
+
+    def set_cells(self, ids, alive):
+        """Set the current and the next state of the cells (array of ids)
+        """
+        self._state[ids] = alive
+        self._next[ids] = alive
+
+    def toggle_next(self, ids):
+        """Set the next state of the cells (array of ids) to the opposite of the
+        current one
+        """
+        self._next[ids] = self._state[ids] ^ 1
+
+    def compute_next_states(self, rule=LIFE_RULE):
+        """Set the next state of every cell from its neighbors, by the rule
+        """
+        counts = self._state[self._neighbors].sum(axis=1, dtype=np.uint8)
+        rule.next_state(self.state, counts, out=self.next_state)
+
+    def advance(self):
+        """Move every cell to its next state, return the arrays of the ids of the
+        cells born and dead
+        """
+        born = np.flatnonzero(self._next > self._state)
+        dead = np.flatnonzero(self._next < self._state)
+        self._state[...] = self._next
+        return born, dead
+
+    def clear(self):
+        """Set every cell dead
+        """
+        self._state[...] = 0
+        self._next[...] = 0
+
+
 class Cell(object):
     """Represents a Cell. Either DeadState or AliveState.
+    The cell is a view on its id in a CellBoard, where its state, its next state
+    and its neighbors are kept.
     """
-    def __init__(self, x, y, state=DeadState(), historical=False):
-        super().__init__()
+    __slots__ = ('_board', '_idx')
+
+    def __init__(self, board, idx):
+        self._board = board
+        self._idx = idx
+
+    @property
+    def idx(self):
+        return self._idx
+
+    @property
+    def posx(self):
+        return self._board.position(self._idx)[0]
+
+    @property
+    def posy(self):
+        return self._board.position(self._idx)[1]
 
-        self._posx = x
-        self._posy = y
-        self._state = state
-        self._nextState = self._state
-        self._lastStates = []
-        self._neighbors = []
-        self._historical = historical
+    @property
+    def state(self):
+        return STATES[self._board._state.item(self._idx)]
+
+    @property
+    def nextState(self):
+        return STATES[self._board._next.item(self._idx)]
 
     def setNeighbor(self, cell):
         """Add neighbor cells.
         """
-        self._neighbors.append(cell)
+        row = self._board._neighbors[self._idx]
+        free = np.flatnonzero(row < 0)
+        if len(free) == 0:
+            raise ValueError("a cell has at most 8 neighbors")
+        row[free[0]] = cell.idx
 
     def numOfLiveNeighbors(self):
         """Find the number of live neighbors for this cell.
         """
-        return len(list(filter(lambda x: x.isAlive(), self._neighbors)))
+        return np.count_nonzero(self._board._state[self._board._neighbors[self._idx]])
 
-    def computeNextState(self):
+    def computeNextState(self, rule=LIFE_RULE):
         """Determines whether this cell should live or die based on the
-        number of live neighbors.
+        number of live neighbors, from the table of the rule.
         """
-        aliveNeighbors = self.numOfLiveNeighbors()
-        if aliveNeighbors < 2 or aliveNeighbors > 3:
-            self.setNextToDead()
-
-        if not self.isAlive() and aliveNeighbors == 3:
-            self.setNextToAlive()
+        self._board._next[self._idx] = rule.table.item(self._board._state.item(self._idx), self.numOfLiveNeighbors())
 
     def isAlive(self):
         """Checks whether this cell is alive.
         """
-        return self._state.isAlive()
-    
-    def setToDead(self, state=DeadState()):
+        return bool(self._board._state.item(self._idx))
+
+    def setToDead(self, state=DEAD):
         """Set cell state to dead
         """
-        if len(self._lastStates) > 5:
-            self._lastStates.pop(0)
-        self._lastStates.append(self._state)
-        self._state = state
-        self._nextState = self._state
-        return self._state
-    
-    def setToAlive(self, state=AliveState()):
+        self._board._state[self._idx] = self._board._next[self._idx] = state.isAlive()
+        return state
+
+    def setToAlive(self, state=ALIVE):
         """Set cell state to alive
         """
-        if len(self._lastStates) > 5:
-            self._lastStates.pop(0)
-        self._lastStates.append(self._state)
-        self._state = state
-        self._nextState = self._state
-        return self._state
+        self._board._state[self._idx] = self._board._next[self._idx] = state.isAlive()
+        return state
 
-    def setNextToAlive(self, nextState=AliveState()):
+    def setNextToAlive(self, nextState=ALIVE):
         """Set future cell state to alive
         """
-        self._nextState = nextState
-        return self._nextState
+        self._board._next[self._idx] = nextState.isAlive()
+        return nextState
 
-    def setNextToDead(self, nextState=DeadState()):
+    def setNextToDead(self, nextState=DEAD):
         """Set future cell state to dead
         """
-        self._nextState = nextState
-        return self._nextState
+        self._board._next[self._idx] = nextState.isAlive()
+        return nextState
+
+    def __eq__(self, other):
+        return isinstance(other, Cell) and self._board is other._board and self._idx == other._idx
 
-    def set_historical(self, boolean):
-        self._historical = boolean
+    def __hash__(self):
+        return hash((id(self._board), self._idx))
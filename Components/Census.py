@@ -0,0 +1,135 @@
+import hashlib
+import numpy as np
+
+from Components.TiledUniverse import TiledUniverse
+
+# Longest period looked for when an object is classified
+MAX_PERIOD = 60
+
+# Common objects of random soups, with the (x, y) cells of one phase
+KNOWN_OBJECTS = {
+    'block': [(0, 0), (1, 0), (0, 1), (1, 1)],
+    'blinker': [(0, 0), (1, 0), (2, 0)],
+    'beehive': [(1, 0), (2, 0), (0, 1), (3, 1), (1, 2), (2, 2)],
+    'loaf': [(1, 0), (2, 0), (0, 1), (3, 1), (1, 2), (3, 2), (2, 3)],
+    'boat': [(0, 0), (1, 0), (0, 1), (2, 1), (1, 2)],
+    'ship': [(0, 0), (1, 0), (0, 1), (2, 1), (1, 2), (2, 2)],
+    'tub': [(1, 0), (0, 1), (2, 1), (1, 2)],
+    'pond': [(1, 0), (2, 0), (0, 1), (3, 1), (0, 2), (3, 2), (1, 3), (2, 3)],
+    'long boat': [(0, 0), (1, 0), (0, 1), (2, 1), (1, 2), (3, 2), (2, 3)],
+    'barge': [(1, 0), (0, 1), (2, 1), (1, 2), (3, 2), (2, 3)],
+    'toad': [(1, 0), (2, 0), (3, 0), (0, 1), (1, 1), (2, 1)],
+    'beacon': [(0, 0), (1, 0), (0, 1), (3, 2), (2, 3), (3, 3)],
+    'glider': [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)],
+    'lightweight spaceship': [(1, 0), (4, 0), (0, 1), (0, 2), (4, 2), (0, 3), (1, 3), (2, 3), (3, 3)],
+}
+
+# The eight rotations and reflections of the plane
+SYMMETRIES = [(1, 0, 0, 1), (-1, 0, 0, 1), (1, 0, 0, -1), (-1, 0, 0, -1),
+              (0, 1, 1, 0), (0, -1, 1, 0), (0, 1, -1, 0), (0, -1, -1, 0)]
+
+
+def normalize(cells):
+    """Return the cells moved to the origin as a sorted tuple, and the moved corner
+    """
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+    corner = cells.min(axis=0)
+    moved = cells - corner
+    order = np.lexsort((moved[:, 1], moved[:, 0]))
+    return tuple(map(tuple, moved[order].tolist())), tuple(corner.tolist())
+
+
+def canonical(phases):
+    """Return the smallest form of an object among all its phases and symmetries
+    """
+    forms = []
+    for cells in phases:
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        for a, b, c, d in SYMMETRIES:
+            transformed = np.stack([a*cells[:, 0] + b*cells[:, 1], c*cells[:, 0] + d*cells[:, 1]], axis=1)
+            forms.append(normalize(transformed)[0])
+    return min(forms)
+
+
+def classify(cells, max_period=MAX_PERIOD):
+    """Evolve an isolated object and return its kind ('still life', 'oscillator',
+    'spaceship', 'dies' or 'unknown'), its period and its canonical form
+    """
+    start, corner = normalize(cells)
+    universe = TiledUniverse(tile=16)
+    universe.set_cells(start)
+    phases = [start]
+    for period in range(1, max_period + 1):
+        universe.step()
+        current = universe.cells()
+        if len(current) == 0:
+            return 'dies', period, ()
+        form, moved = normalize(current)
+        if form == start:
+            if moved != (0, 0):
+                kind = 'spaceship'
+            else:
+                kind = 'still life' if period == 1 else 'oscillator'
+            return kind, period, canonical(phases)
+        phases.append(form)
+    return 'unknown', 0, canonical([start])
+
+
+def _known_names():
+    names = {}
+    for name, cells in KNOWN_OBJECTS.items():
+        names[classify(cells)[2]] = name
+    return names
+
+KNOWN_NAMES = _known_names()
+
+# prefix of the names of the objects not in KNOWN_OBJECTS
+PREFIX = {'still life': 'xs', 'oscillator': 'xp', 'spaceship': 'xq', 'unknown': 'xx', 'dies': 'xd'}
+
+
+def object_name(kind, period, form):
+    """Name of a classified object: its common name, or a code made of the
+    kind, the population (still lifes) or the period and a digest of its shape
+    """
+    if form in KNOWN_NAMES:
+        return KNOWN_NAMES[form]
+    size = len(form) if kind in ('still life', 'unknown') else period
+    return '%s%d_%s' % (PREFIX[kind], size, hashlib.sha1(repr(form).encode()).hexdigest()[:8])
+
+
+def split_objects(cells, distance=2):
+    """Group the alive (x, y) cells in separate objects: two cells closer than
+    distance (in both directions) are in the same object
+    """
+    cells = [tuple(c) for c in np.asarray(cells, dtype=np.int64).reshape(-1, 2).tolist()]
+    parent = list(range(len(cells)))
+    index = {c: k for k, c in enumerate(cells)}
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    offsets = [(dx, dy) for dx in range(-distance, distance + 1) for dy in range(-distance, distance + 1)
+               if (dx, dy) > (0, 0)]
+    for k, (x, y) in enumerate(cells):
+        for dx, dy in offsets:
+            other = index.get((x + dx, y + dy))
+            if other is not None:
+                parent[find(other)] = find(k)
+
+    objects = {}
+    for k, c in enumerate(cells):
+        objects.setdefault(find(k), []).append(c)
+    return list(objects.values())
+
+
+def census(cells):
+    """Return a dictionary with the number of objects of each name among the cells
+    """
+    counts = {}
+    for obj in split_objects(cells):
+        name = object_name(*classify(obj))
+        counts[name] = counts.get(name, 0) + 1
+    return counts
@@ -0,0 +1,189 @@
+import numpy as np
+
+from Components.Rule import LIFE_RULE
+
+
+def neighbor_table(width, height):
+    """Return a (width*height, 8) array with the flat ids of the neighbors of
+    every cell, -1 for the neighbors outside the board
+    """
+    i, j = np.divmod(np.arange(width*height), height)
+    table = np.empty((width*height, 8), dtype=np.int64)
+    k = 0
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            if di or dj:
+                ni, nj = i + di, j + dj
+                inside = (ni >= 0) & (ni < width) & (nj >= 0) & (nj < height)
+                table[:, k] = np.where(inside, ni*height + nj, -1)
+                k += 1
+    return table
+
+
+class Engine(object):
+    """Abstract Game of Life engine.
+    The board is a (width, height) grid where the cell at column i and row j
+    has the flat id i*height + j, the same id the model gives to its cells.
+    Cells outside the board are always dead.
+    The next state of a cell is looked up in the table of the Life-like rule,
+    B3/S23 until set_rule is called.
+    """
+    def __init__(self, width, height):
+        self._width = width
+        self._height = height
+        self._rule = LIFE_RULE
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def size(self):
+        return self._width * self._height
+
+    @property
+    def rule(self):
+        return self._rule
+
+    def set_rule(self, rule):
+        """Compute the next generations with the given Rule
+        """
+        self._rule = rule
+
+    def get_state(self):
+        """Return the board as a (width, height) uint8 array, 1 for alive cells
+        """
+        raise NotImplementedError
+
+    def set_state(self, state):
+        """Load a (width, height) array of alive (non zero) and dead cells
+        """
+        raise NotImplementedError
+
+    def is_alive(self, idx):
+        """Checks whether the cell with flat id idx is alive
+        """
+        raise NotImplementedError
+
+    def set_cell(self, idx, alive):
+        """Set the cell with flat id idx to alive or dead
+        """
+        raise NotImplementedError
+
+    def are_alive(self, ids):
+        """Return the boolean array of the states of the cells with the given flat ids
+        """
+        i, j = np.divmod(np.asarray(ids, dtype=np.int64), self.height)
+        return self.get_state()[i, j] != 0
+
+    def set_cells_at(self, ids, alive):
+        """Set the cells with the given flat ids to alive or dead, in one batch
+        """
+        for idx in np.asarray(ids).tolist():
+            self.set_cell(idx, alive)
+
+    def cells(self):
+        """Return the alive cells as an (n, 2) array of (i, j) coordinates
+        """
+        return np.argwhere(self.get_state())
+
+    def set_cells(self, cells):
+        """Set alive the given (i, j) cells, the ones outside the board are ignored
+        """
+        cells = self._on_board(cells)
+        state = self.get_state().copy()
+        state[cells[:, 0], cells[:, 1]] = 1
+        self.set_state(state)
+
+    def _on_board(self, cells):
+        """Return the (i, j) cells of the board among the given ones
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        inside = ((cells[:, 0] >= 0) & (cells[:, 0] < self.width) &
+                  (cells[:, 1] >= 0) & (cells[:, 1] < self.height))
+        return cells[inside]
+
+    def step(self):
+        """Compute the next generation of the whole board.
+        Return the flat ids of the cells that changed state.
+        """
+        raise NotImplementedError
+
+    def advance(self, generations):
+        """Compute the board after the given number of generations
+        """
+        for _ in range(generations):
+            self.step()
+
+    def clear(self):
+        """Kill every cell of the board
+        """
+        self.set_state(np.zeros((self.width, self.height), dtype=np.uint8))
+
+    def population(self):
+        """Number of alive cells
+        """
+        return int(np.count_nonzero(self.get_state()))
+
+
+class NumpyEngine(Engine):
+    """Engine that keeps the board in one contiguous uint8 array and computes
+    the next generation of the whole grid in one vectorized pass.
+    """
+    def __init__(self, width, height):
+        super().__init__(width, height)
+
+        self._state = np.zeros((width, height), dtype=np.uint8)
+        # board with a frame of dead cells, used to count the neighbors
+        # without special cases on the edges
+        self._padded = np.zeros((width + 2, height + 2), dtype=np.uint8)
+        self._count = np.zeros((width, height), dtype=np.uint8)
+        # buffers of the rule lookup
+        self._next = np.zeros((width, height), dtype=np.uint8)
+        self._work = np.zeros((width, height), dtype=np.uint16)
+
+    @property
+    def state(self):
+        return self._state
+
+    def get_state(self):
+        return self._state
+
+    def set_state(self, state):
+        self._state[...] = np.asarray(state) != 0
+
+    def is_alive(self, idx):
+        return bool(self._state.flat[idx])
+
+    def set_cell(self, idx, alive):
+        self._state.flat[idx] = 1 if alive else 0
+
+    def set_cells_at(self, ids, alive):
+        self._state.flat[np.asarray(ids, dtype=np.int64)] = 1 if alive else 0
+
+    def neighbors_count(self):
+        """Number of alive neighbors for every cell of the board
+        """
+        p = self._padded
+        p[1:-1, 1:-1] = self._state
+        c = self._count
+        np.add(p[:-2, :-2], p[:-2, 1:-1], out=c)
+        c += p[:-2, 2:]
+        c += p[1:-1, :-2]
+        c += p[1:-1, 2:]
+        c += p[2:, :-2]
+        c += p[2:, 1:-1]
+        c += p[2:, 2:]
+        return c
+
+    def step(self):
+        count = self.neighbors_count()
+        # the next state of every cell from the rule table, by state and neighbors count
+        nextState = self._rule.next_state(self._state, count, out=self._next, work=self._work)
+        changed = np.flatnonzero(nextState != self._state)
+        self._state[...] = nextState
+        return changed
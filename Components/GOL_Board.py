@@ -1,43 +1,68 @@
 
 from PyQt5 import QtCore, QtGui, QtWidgets
+import time
 
 class GOL_Board(QtWidgets.QGraphicsScene):
 
     # Signal definition
-    aliveCellSignal = QtCore.pyqtSignal(object)
-    deadCellSignal = QtCore.pyqtSignal(object)
+    # mouse strokes: the first point and whether it fills cells, the next points, the end
+    strokeStartSignal = QtCore.pyqtSignal(object, bool)
+    strokeMoveSignal = QtCore.pyqtSignal(object)
+    strokeEndSignal = QtCore.pyqtSignal()
 
     def __init__(self):
         QtWidgets.QGraphicsScene.__init__(self)
+        self._cellItems = []        # graphics items of the cells, by cell id
+        self.profiler = None        # profiler of the paint phase
+        self._paintStart = None
 
-    def mousePressEvent(self, event):
-        """Function called when the user click one GOL cell
+    def add_cell(self, item):
+        """Add the graphics item of the cell with the next id
         """
-        try:
-            ep = event.scenePos()
+        self.addItem(item)
+        self._cellItems.append(item)
 
-            # left click fill cell
-            if event.button() == QtCore.Qt.LeftButton:
-                self.aliveCellSignal.emit([ep.x(), ep.y()])
+    def cell_item(self, idx):
+        """Return the graphics item of the cell idx, None if the cells have no item
+        """
+        if idx < len(self._cellItems):
+            return self._cellItems[idx]
+        return None
+
+    def drawBackground(self, painter, rect):
+        """The background is the first layer painted: the paint phase starts
+        """
+        if self.profiler is not None and self.profiler.enabled:
+            self._paintStart = time.perf_counter()
+        QtWidgets.QGraphicsScene.drawBackground(self, painter, rect)
 
-            #rigth click clear cell
-            elif event.button() == QtCore.Qt.RightButton:
-                self.deadCellSignal.emit([ep.x(), ep.y()])
+    def drawForeground(self, painter, rect):
+        """The foreground is the last layer painted: the paint phase ends
+        """
+        QtWidgets.QGraphicsScene.drawForeground(self, painter, rect)
+        if self._paintStart is not None:
+            self.profiler.add('paint', time.perf_counter() - self._paintStart)
+            self._paintStart = None
 
-        except Exception:
-            pass
+    def mousePressEvent(self, event):
+        """Function called when the user click one GOL cell: a stroke starts,
+        filling cells with the left button and clearing them with the right one
+        """
+        ep = event.scenePos()
+        if event.button() == QtCore.Qt.LeftButton:
+            self.strokeStartSignal.emit([ep.x(), ep.y()], True)
+        elif event.button() == QtCore.Qt.RightButton:
+            self.strokeStartSignal.emit([ep.x(), ep.y()], False)
 
     def mouseMoveEvent(self, event):
         """Function called when the user move the mouse after one click 
         """
-        try:
+        if event.buttons() & (QtCore.Qt.LeftButton | QtCore.Qt.RightButton):
             ep = event.scenePos()
+            self.strokeMoveSignal.emit([ep.x(), ep.y()])
 
-            if event.buttons() == QtCore.Qt.LeftButton:
-                self.aliveCellSignal.emit([ep.x(), ep.y()])
-            
-            elif event.buttons() == QtCore.Qt.RightButton:
-                self.deadCellSignal.emit([ep.x(), ep.y()])
-
-        except Exception as e:
-            pass
\ No newline at end of file
+    def mouseReleaseEvent(self, event):
+        """Function called when the user releases the button: the stroke ends
+        """
+        if event.button() in (QtCore.Qt.LeftButton, QtCore.Qt.RightButton):
+            self.strokeEndSignal.emit()
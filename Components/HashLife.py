@@ -0,0 +1,262 @@
+from Components.Rule import LIFE_RULE
+
+
+class Node(object):
+    """Quadtree node of level k: a square of 2^k x 2^k cells made of four
+    nodes of level k-1 (nw, ne, sw, se). Level 0 nodes are single cells.
+    Nodes are canonical (two equal squares are the same object), so they can
+    be compared and hashed by identity.
+    """
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(self, level, nw=None, ne=None, sw=None, se=None, population=0):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+class HashLife(object):
+    """Memoized quadtree (HashLife) engine for an unbounded universe.
+    Cells are (x, y) coordinates; the universe can be advanced by any number of
+    generations, computing 2^j generations of a node at once and reusing the
+    results of the squares already seen.
+    Memoized results stay valid when a new universe is loaded.
+    The canonical node table is bounded: when it grows past max_nodes, every
+    node not reachable from the current universe and all the memoized results
+    are dropped.
+    The memoized results are dropped as well when the rule changes. Rules where
+    cells are born from nothing (B0) cannot be set: an empty square would not
+    stay empty.
+    """
+    def __init__(self, max_nodes=1 << 20, rule=LIFE_RULE):
+        self.max_nodes = max_nodes
+        self._rule = LIFE_RULE
+
+        self._off = Node(0, population=0)
+        self._on = Node(0, population=1)
+        self._nodes = {}
+        self._results = {}
+        self._empty = [self._off]
+
+        self._root = self.empty(3)
+        self._x = -4                 # coordinates of the root's top left cell
+        self._y = -4
+        self._generation = 0
+        self.rule = rule
+
+    @property
+    def rule(self):
+        return self._rule
+
+    @rule.setter
+    def rule(self, rule):
+        if rule.births_from_nothing:
+            raise ValueError("the rule %s fills an unbounded universe" % rule)
+        if rule != self._rule:
+            self._results = {}
+        self._rule = rule
+        self._table = rule.table.tolist()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def population(self):
+        return self._root.population
+
+    @property
+    def root(self):
+        return self._root
+
+    # Node construction
+    def join(self, nw, ne, sw, se):
+        """Return the canonical node made of the four given quadrants
+        """
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            node = Node(nw.level + 1, nw, ne, sw, se,
+                        nw.population + ne.population + sw.population + se.population)
+            self._nodes[key] = node
+        return node
+
+    def empty(self, level):
+        """Return the empty node of the given level
+        """
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self.join(e, e, e, e))
+        return self._empty[level]
+
+    def _centre(self, node):
+        """Return the node of the next level with the given node in its centre
+        """
+        e = self.empty(node.level - 1)
+        return self.join(self.join(e, e, e, node.nw), self.join(e, e, node.ne, e),
+                         self.join(e, node.sw, e, e), self.join(node.se, e, e, e))
+
+    def _inner(self, node):
+        """Return the central square of half the size of the node
+        """
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _is_padded(self, node):
+        """Check that all the alive cells are in the central quarter of the node
+        """
+        return node.level >= 3 and self._inner(self._inner(node)).population == node.population
+
+    # Evolution
+    def _life_4x4(self, m):
+        """Return the central 2x2 node of a 4x4 node after one generation
+        """
+        cells = [[0]*4 for _ in range(4)]
+        for qy, qx, q in ((0, 0, m.nw), (0, 2, m.ne), (2, 0, m.sw), (2, 2, m.se)):
+            cells[qy][qx] = q.nw.population
+            cells[qy][qx + 1] = q.ne.population
+            cells[qy + 1][qx] = q.sw.population
+            cells[qy + 1][qx + 1] = q.se.population
+
+        table = self._table
+
+        def next_cell(y, x):
+            n = sum(cells[y + dy][x + dx] for dy in (-1, 0, 1) for dx in (-1, 0, 1)) - cells[y][x]
+            return self._on if table[cells[y][x]][n] else self._off
+
+        return self.join(next_cell(1, 1), next_cell(1, 2), next_cell(2, 1), next_cell(2, 2))
+
+    def _successor(self, m, j):
+        """Return the central node of level k-1 of the node m of level k
+        after 2^j generations (j <= k-2)
+        """
+        if m.population == 0:
+            return self.empty(m.level - 1)
+        key = (m, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        if m.level == 2:
+            result = self._life_4x4(m)
+        else:
+            # nine overlapping sub-squares of level k-1: either advanced by 2^j generations,
+            # or advanced twice by 2^(j-1) generations when j is the largest step
+            a, b, c, d = m.nw, m.ne, m.sw, m.se
+            half = j < m.level - 2
+            jj = j if half else j - 1
+            c1 = self._successor(a, jj)
+            c2 = self._successor(self.join(a.ne, b.nw, a.se, b.sw), jj)
+            c3 = self._successor(b, jj)
+            c4 = self._successor(self.join(a.sw, a.se, c.nw, c.ne), jj)
+            c5 = self._successor(self.join(a.se, b.sw, c.ne, d.nw), jj)
+            c6 = self._successor(self.join(b.sw, b.se, d.nw, d.ne), jj)
+            c7 = self._successor(c, jj)
+            c8 = self._successor(self.join(c.ne, d.nw, c.se, d.sw), jj)
+            c9 = self._successor(d, jj)
+            if half:
+                # the nine squares are already 2^j generations ahead: keep their centres
+                result = self.join(self.join(c1.se, c2.sw, c4.ne, c5.nw),
+                                   self.join(c2.se, c3.sw, c5.ne, c6.nw),
+                                   self.join(c4.se, c5.sw, c7.ne, c8.nw),
+                                   self.join(c5.se, c6.sw, c8.ne, c9.nw))
+            else:
+                result = self.join(self._successor(self.join(c1, c2, c4, c5), jj),
+                                   self._successor(self.join(c2, c3, c5, c6), jj),
+                                   self._successor(self.join(c4, c5, c7, c8), jj),
+                                   self._successor(self.join(c5, c6, c8, c9), jj))
+        self._results[key] = result
+        return result
+
+    def _pad(self, level):
+        """Enlarge the root until it has at least the given level and all the
+        alive cells are in its central quarter
+        """
+        while self._root.level < level or not self._is_padded(self._root):
+            half = 1 << (self._root.level - 1)
+            self._root = self._centre(self._root)
+            self._x -= half
+            self._y -= half
+
+    def advance(self, generations):
+        """Advance the universe by the given number of generations
+        """
+        j = 0
+        while generations > 0:
+            if generations & 1:
+                # 2^j generations move the alive cells at most 2^j cells away:
+                # the quarter of padding around them is enough from level j+3
+                self._pad(j + 3)
+                shift = 1 << (self._root.level - 2)
+                self._root = self._successor(self._root, j)
+                self._x += shift
+                self._y += shift
+                self._generation += 1 << j
+                if len(self._nodes) > self.max_nodes:
+                    self.collect()
+            generations >>= 1
+            j += 1
+
+    def collect(self):
+        """Drop the memoized results and the nodes not used by the current universe
+        """
+        self._results = {}
+        nodes = {}
+        stack = [self._root] + self._empty[1:]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key not in nodes:
+                nodes[key] = node
+                stack.extend(key)
+        self._nodes = nodes
+
+    # Conversion from and to cell coordinates
+    def load(self, cells, generation=0):
+        """Replace the universe with the given alive (x, y) cells
+        """
+        cells = list(cells)
+        self._generation = generation
+        if not cells:
+            self._root, self._x, self._y = self.empty(3), -4, -4
+            return
+        x0 = min(x for x, _ in cells)
+        y0 = min(y for _, y in cells)
+        extent = max(max(x for x, _ in cells) - x0, max(y for _, y in cells) - y0) + 1
+        level = max(3, (extent - 1).bit_length())
+        self._root = self._build(level, [(x - x0, y - y0) for x, y in cells])
+        self._x, self._y = x0, y0
+
+    def _build(self, level, cells):
+        """Build the node of the given level with the alive cells (relative coordinates)
+        """
+        if not cells:
+            return self.empty(level)
+        if level == 0:
+            return self._on
+        half = 1 << (level - 1)
+        quadrants = ([], [], [], [])
+        for x, y in cells:
+            quadrants[(y >= half)*2 + (x >= half)].append((x % half, y % half))
+        return self.join(*[self._build(level - 1, q) for q in quadrants])
+
+    def cells(self):
+        """Return the list of the alive (x, y) cells
+        """
+        result = []
+        stack = [(self._root, self._x, self._y)]
+        while stack:
+            node, x, y = stack.pop()
+            if node.population == 0:
+                continue
+            if node.level == 0:
+                result.append((x, y))
+                continue
+            half = 1 << (node.level - 1)
+            stack.extend(((node.nw, x, y), (node.ne, x + half, y),
+                          (node.sw, x, y + half), (node.se, x + half, y + half)))
+        return result
@@ -0,0 +1,78 @@
+from PyQt5 import QtCore, QtGui, QtWidgets
+import math
+
+from Components.BoardItem import density_table
+
+
+class Minimap(QtWidgets.QWidget):
+    """ Overview of the whole board, painted from the level of the mip pyramid with
+        about one block per pixel of the widget, and the rectangle of the part of
+        the board shown by the graphics view. A click or a drag centers the view
+        on the point.
+    """
+    def __init__(self, pyramid, view, cell_size, alive_color, dead_color, frame_color=QtCore.Qt.red):
+        super().__init__()
+        self.pyramid = pyramid
+        self._view = view
+        self._cellSize = cell_size
+        self._densityTable = density_table(dead_color, alive_color)
+        self._pen = QtGui.QPen(frame_color)
+        self._pen.setCosmetic(True)
+        self.setMinimumSize(160, 120)
+
+    def sizeHint(self):
+        return QtCore.QSize(240, 180)
+
+    def board_rect(self):
+        """ Return the rectangle of the widget where the board is painted, keeping its
+            aspect ratio
+        """
+        width, height = self.pyramid.width, self.pyramid.height
+        scale = min(self.width() / width, self.height() / height)
+        return QtCore.QRectF((self.width() - width*scale) / 2, (self.height() - height*scale) / 2,
+                             width*scale, height*scale)
+
+    def paintEvent(self, event):
+        rect = self.board_rect()
+        # cells in a pixel of the widget: the level has blocks of at most that many cells
+        cells = self.pyramid.width / rect.width()
+        level = min(max(int(math.floor(math.log2(cells))), 0) if cells >= 1 else 0, self.pyramid.depth)
+        b = 1 << level
+        density = self.pyramid.density(level, 0, 0, -(-self.pyramid.width // b), -(-self.pyramid.height // b))
+        image = QtGui.QImage(density.data, density.shape[1], density.shape[0], density.strides[0],
+                             QtGui.QImage.Format_Indexed8)
+        image.setColorTable(self._densityTable)
+
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), self.palette().window())
+        scale = rect.width() / self.pyramid.width
+        painter.save()
+        painter.setClipRect(rect)
+        # the density is a (columns, rows) array: its image is painted transposed
+        painter.setTransform(QtGui.QTransform(0, scale*b, scale*b, 0, rect.left(), rect.top()))
+        painter.drawImage(0, 0, image)
+        painter.restore()
+
+        visible = self._view.mapToScene(self._view.viewport().rect()).boundingRect()
+        painter.setPen(self._pen)
+        painter.drawRect(QtCore.QRectF(rect.left() + visible.left()*scale/self._cellSize,
+                                       rect.top() + visible.top()*scale/self._cellSize,
+                                       visible.width()*scale/self._cellSize,
+                                       visible.height()*scale/self._cellSize).intersected(rect))
+        painter.end()
+
+    def center_view(self, pos):
+        """ Center the graphics view on the board point under the widget position
+        """
+        rect = self.board_rect()
+        scale = rect.width() / self.pyramid.width
+        self._view.centerOn((pos.x() - rect.left())*self._cellSize/scale,
+                            (pos.y() - rect.top())*self._cellSize/scale)
+        self.update()
+
+    def mousePressEvent(self, event):
+        self.center_view(event.pos())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & QtCore.Qt.LeftButton:
+            self.center_view(event.pos())
@@ -0,0 +1,92 @@
+import numpy as np
+
+# The smallest level is at most this many blocks on its longest side
+MIN_SIZE = 64
+
+# Changed cells above this fraction of the board rebuild the whole pyramid
+REBUILD_FRACTION = 0.125
+
+
+def halve(counts):
+    """ Return the sums of the 2x2 blocks of an array with even sides
+    """
+    w, h = counts.shape
+    return counts.reshape(w // 2, 2, h // 2, 2).sum(axis=(1, 3), dtype=np.uint32)
+
+
+class MipPyramid(object):
+    """ Alive cells counts of a (width, height) board at decreasing resolutions:
+        level k has one block for every 2^k x 2^k cells, down to a level of at most
+        MIN_SIZE blocks across. The board is padded with dead cells to a multiple of
+        the largest block.
+        The cells born and dead only update their blocks at every level, so the
+        pyramid follows the board at the cost of its changes.
+    """
+    def __init__(self, width, height, min_size=MIN_SIZE):
+        self._width = width
+        self._height = height
+        top = 0
+        while max(width, height) > min_size << top:
+            top += 1
+        block = 1 << top
+        shape = (-(-width // block) * block, -(-height // block) * block)
+        self._levels = [np.zeros((shape[0] >> k, shape[1] >> k), dtype=np.uint32) for k in range(top + 1)]
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def depth(self):
+        """ Index of the smallest level
+        """
+        return len(self._levels) - 1
+
+    def level(self, k):
+        """ Return the (width, height) array of the alive cells in every block of level k
+        """
+        return self._levels[k]
+
+    def density(self, k, i0=0, j0=0, i1=None, j1=None):
+        """ Return the uint8 density (255 for blocks all alive) of the blocks [i0, i1) x
+            [j0, j1) of level k
+        """
+        counts = self._levels[k][i0:i1, j0:j1]
+        return (counts * 255 >> (2*k)).astype(np.uint8)
+
+    def set_state(self, state):
+        """ Rebuild every level from the (width, height) state
+        """
+        self._levels[0][...] = 0
+        self._levels[0][:self._width, :self._height] = np.asarray(state) != 0
+        for k in range(1, len(self._levels)):
+            self._levels[k][...] = halve(self._levels[k - 1])
+
+    def set_cells(self, born, dead):
+        """ Update the blocks of the cells born and dead (lists of flat ids)
+        """
+        born, dead = np.asarray(born, dtype=np.int64), np.asarray(dead, dtype=np.int64)
+        ids = np.concatenate([born, dead])
+        if len(ids) == 0:
+            return
+        level = self._levels[0]
+        if len(ids) > REBUILD_FRACTION * self._width * self._height:
+            state = level[:self._width, :self._height].copy()
+            state.flat[born] = 1
+            state.flat[dead] = 0
+            self.set_state(state)
+            return
+        i, j = np.divmod(ids, self._height)
+        level[i[:len(born)], j[:len(born)]] = 1
+        level[i[len(born):], j[len(born):]] = 0
+        for k in range(1, len(self._levels)):
+            # the blocks of level k that contain a changed block of level k - 1
+            keys = np.unique((i >> 1) * self._levels[k].shape[1] + (j >> 1))
+            i, j = np.divmod(keys, self._levels[k].shape[1])
+            below = self._levels[k - 1]
+            self._levels[k][i, j] = (below[2*i, 2*j] + below[2*i + 1, 2*j] +
+                                     below[2*i, 2*j + 1] + below[2*i + 1, 2*j + 1])
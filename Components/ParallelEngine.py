@@ -0,0 +1,150 @@
+import os
+import weakref
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+from Components.Engine import Engine
+
+# Fewest rows of a stripe: thinner stripes cost more in messages and barriers
+# than their step
+MIN_STRIPE = 64
+
+
+def step_stripe(src, dst, start, stop, count, rule, work):
+    """Compute in dst the next generation of the rows j in [start, stop) of the
+    padded board src. The rows start-1 and stop of src are the halos: the
+    neighbors of the stripe that belong to the stripes of the other workers.
+    """
+    p = src[:, start:stop + 2]
+    np.add(p[:-2, :-2], p[:-2, 1:-1], out=count)
+    count += p[:-2, 2:]
+    count += p[1:-1, :-2]
+    count += p[1:-1, 2:]
+    count += p[2:, :-2]
+    count += p[2:, 1:-1]
+    count += p[2:, 2:]
+    rule.next_state(p[1:-1, 1:-1], count, out=dst[1:-1, start + 1:stop + 1], work=work)
+
+
+def _worker(names, shape, start, stop, barrier, tasks, done):
+    """Worker process: step its stripe of the shared boards for the generations
+    of every task, waiting for the other workers at the end of each generation
+    """
+    memories = [shared_memory.SharedMemory(name=name) for name in names]
+    boards = [np.ndarray(shape, dtype=np.uint8, buffer=m.buf) for m in memories]
+    count = np.zeros((shape[0] - 2, stop - start), dtype=np.uint8)
+    work = np.zeros(count.shape, dtype=np.uint16)
+    try:
+        for current, generations, rule in iter(tasks.get, None):
+            for _ in range(generations):
+                step_stripe(boards[current], boards[1 - current], start, stop, count, rule, work)
+                # no worker reads the next board before all the stripes are written
+                barrier.wait()
+                current = 1 - current
+            done.put(start)
+    finally:
+        del boards
+        for m in memories:
+            m.close()
+
+
+def _shutdown(processes, queues, memories):
+    """Stop the workers and release the shared boards
+    """
+    for q in queues:
+        q.put(None)
+    for p in processes:
+        p.join(timeout=5)
+        if p.is_alive():
+            p.terminate()
+    for m in memories:
+        m.close()
+        m.unlink()
+
+
+class ParallelEngine(Engine):
+    """Engine that splits the board into horizontal stripes (ranges of rows j),
+    stepped in parallel by a persistent pool of worker processes.
+    The board and the next generation are two padded arrays in shared memory:
+    every worker reads its stripe with a one row halo on each side from the
+    current board and writes the stripe in the next one, then all the workers
+    meet at a barrier before the boards are swapped.
+    The workers are at most one for every MIN_STRIPE rows, so a small board is
+    stepped by a single worker.
+    """
+    def __init__(self, width, height, workers=None):
+        super().__init__(width, height)
+
+        workers = max(1, min(workers or os.cpu_count() or 1, height // MIN_STRIPE))
+        shape = (width + 2, height + 2)
+        self._memories = [shared_memory.SharedMemory(create=True, size=shape[0]*shape[1]) for _ in range(2)]
+        self._boards = [np.ndarray(shape, dtype=np.uint8, buffer=m.buf) for m in self._memories]
+        for board in self._boards:
+            board[...] = 0
+        self._current = 0
+
+        bounds = np.linspace(0, height, workers + 1).astype(int)
+        self._stripes = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        barrier = multiprocessing.Barrier(workers)
+        self._done = multiprocessing.Queue()
+        self._tasks = [multiprocessing.Queue() for _ in range(workers)]
+        self._processes = []
+        for (start, stop), tasks in zip(self._stripes, self._tasks):
+            p = multiprocessing.Process(target=_worker, daemon=True,
+                                        args=([m.name for m in self._memories], shape, start, stop,
+                                              barrier, tasks, self._done))
+            p.start()
+            self._processes.append(p)
+        self._finalizer = weakref.finalize(self, _shutdown, self._processes, self._tasks, self._memories)
+
+    @property
+    def workers(self):
+        return len(self._processes)
+
+    @property
+    def stripes(self):
+        return self._stripes
+
+    def close(self):
+        """Stop the worker processes and release the shared memory
+        """
+        self._boards = []
+        self._finalizer()
+
+    def get_state(self):
+        return self._boards[self._current][1:-1, 1:-1]
+
+    def set_state(self, state):
+        self.get_state()[...] = np.asarray(state) != 0
+
+    def is_alive(self, idx):
+        i, j = divmod(int(idx), self.height)
+        return bool(self._boards[self._current][i + 1, j + 1])
+
+    def set_cell(self, idx, alive):
+        i, j = divmod(int(idx), self.height)
+        self._boards[self._current][i + 1, j + 1] = 1 if alive else 0
+
+    def set_cells_at(self, ids, alive):
+        i, j = np.divmod(np.asarray(ids, dtype=np.int64), self.height)
+        self._boards[self._current][i + 1, j + 1] = 1 if alive else 0
+
+    def _run(self, generations):
+        """Let the workers compute the generations, wait for all of them
+        """
+        for tasks in self._tasks:
+            tasks.put((self._current, generations, self._rule))
+        for _ in self._processes:
+            self._done.get()
+        self._current = (self._current + generations) % 2
+
+    def step(self):
+        self._run(1)
+        # the previous generation is still in the other board
+        old = self._boards[1 - self._current][1:-1, 1:-1]
+        return np.flatnonzero(old != self.get_state())
+
+    def advance(self, generations):
+        if generations > 0:
+            self._run(generations)
@@ -0,0 +1,57 @@
+from PyQt5 import QtCore, QtGui
+import numpy as np
+
+# Side of the pattern thumbnails, in pixels
+THUMBNAIL_SIZE = 32
+
+
+class PatternListModel(QtCore.QAbstractListModel):
+    """ Items of the pattern combo box: the first entries, the patterns of the library
+        and the last entries. The thumbnail of a pattern is drawn the first time the
+        combo box shows it, then kept; its tooltip comes from the library index.
+    """
+
+    def __init__(self, library, first, last, alive_color, dead_color):
+        super().__init__()
+        self._library = library
+        self._rows = list(first) + library.names() + list(last)
+        self._colors = np.array([dead_color.rgb(), alive_color.rgb()], dtype=np.uint32)
+        self._icons = {}
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self._rows[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return name
+        if name not in self._library.index:
+            return None
+        if role == QtCore.Qt.DecorationRole:
+            if name not in self._icons:
+                self._icons[name] = self.thumbnail(name)
+            return self._icons[name]
+        if role == QtCore.Qt.ToolTipRole:
+            info = self._library.index[name]
+            period = "period %d" % info['period'] if info['period'] else "not periodic"
+            return "%s: %d cells in %dx%d, %s" % (name, info['population'], info['width'], info['height'], period)
+        return None
+
+    def thumbnail(self, name):
+        """ Return the icon of a pattern: its bounding box scaled into a square
+        """
+        bitmap = self._library.bitmap(name)
+        pixmap = QtGui.QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        pixmap.fill(QtGui.QColor(int(self._colors[0])))
+        if bitmap.size:
+            # the bitmap is (columns, rows): the image has one line per row
+            pixels = np.ascontiguousarray(self._colors[bitmap.T.astype(np.uint8)])
+            height, width = pixels.shape
+            image = QtGui.QImage(pixels.data, width, height, 4*width, QtGui.QImage.Format_RGB32)
+            image = image.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, QtCore.Qt.KeepAspectRatio)
+            painter = QtGui.QPainter(pixmap)
+            painter.drawImage((THUMBNAIL_SIZE - image.width()) // 2, (THUMBNAIL_SIZE - image.height()) // 2, image)
+            painter.end()
+        return QtGui.QIcon(pixmap)
@@ -0,0 +1,205 @@
+import os, json, threading, collections
+import numpy as np
+
+from Components.BoardFormats import FORMATS, GZIP, board_file, board_format, read_board, read_rule, bounding_box
+from Components.Engine import NumpyEngine
+from Components.BoardHash import MAX_PERIOD
+from Components.Rule import Rule
+
+# Index of the patterns of a library folder
+INDEX_NAME = '.index.json'
+INDEX_VERSION = 2
+
+# Memory of the parsed patterns kept in the cache
+CACHE_BYTES = 32 << 20
+
+# Patterns with more cells are not evolved to look for their period
+PERIOD_CELLS = 100000
+
+
+def pattern_files(directory):
+    """ Return the name and board file of every pattern of the directory: a folder
+        with a board file, named as the folder, or a board file, named as the file
+    """
+    patterns = {}
+    for entry in sorted(os.listdir(directory)):
+        path = os.path.join(directory, entry)
+        if entry.startswith('.'):
+            continue
+        if os.path.isdir(path):
+            path = board_file(path)
+            if os.path.isfile(path):
+                patterns[entry] = path
+        elif entry.lower().endswith(GZIP) or os.path.splitext(entry)[1].lower() in FORMATS:
+            name = entry[:-len(GZIP)] if entry.lower().endswith(GZIP) else entry
+            patterns[os.path.splitext(name)[0]] = path
+    return patterns
+
+
+def pattern_period(cells, rule=None, max_period=MAX_PERIOD):
+    """ Return the period of an oscillator or still life (1 for a pattern that dies
+        or does not change) under the rule of a rulestring (Life by default), None
+        when the pattern does not come back to itself within max_period generations
+        The pattern evolves in a box with a margin of max_period cells: no cell can
+        reach the border, so the box behaves as the unbounded universe, unless cells
+        are born from nothing
+    """
+    corner, bitmap = bounding_box(cells)
+    width, height = bitmap.shape
+    engine = NumpyEngine(width + 2*max_period + 2, height + 2*max_period + 2)
+    if rule is not None:
+        engine.set_rule(Rule.parse(rule))
+    first = np.zeros((engine.width, engine.height), dtype=np.uint8)
+    first[max_period + 1:max_period + 1 + width, max_period + 1:max_period + 1 + height] = bitmap
+    engine.set_state(first)
+    for period in range(1, max_period + 1):
+        engine.step()
+        state = engine.get_state()
+        if np.array_equal(state, first) or (period == 1 and not state.any()):
+            return period
+    return None
+
+
+class PatternLibrary(object):
+    """ Patterns of a folder, indexed once: the index (name, file, size, bounding box,
+        population, rule and period of every pattern) is kept on disk and only the patterns
+        whose file changed are read again.
+        The parsed patterns are kept in an LRU cache of at most max_bytes, so a
+        pattern picked again is not read again; preload() fills the cache in a
+        background thread.
+    """
+    def __init__(self, directory, max_bytes=CACHE_BYTES, index_path=None):
+        self._directory = directory
+        self._indexPath = index_path or os.path.join(directory, INDEX_NAME)
+        self._maxBytes = max_bytes
+        self._cache = collections.OrderedDict()     # name: (cells, positioned), last used at the end
+        self._cacheBytes = 0
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def cache_bytes(self):
+        return self._cacheBytes
+
+    def names(self):
+        return list(self._index)
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def find(self, name):
+        """ Return the name of the pattern called name, with spaces or dashes, in any case
+        """
+        if name in self._index:
+            return name
+        keys = {key.lower().replace('-', ' '): key for key in self._index}
+        return keys.get(name.lower().replace('-', ' '))
+
+    def info(self, name):
+        return self._index[self.find(name)]
+
+    def _load_index(self):
+        """ Read the index from disk and bring it up to date with the folder
+        """
+        index = {}
+        try:
+            with open(self._indexPath) as f:
+                saved = json.load(f)
+            if saved.get('version') == INDEX_VERSION:
+                index = saved['patterns']
+        except (OSError, ValueError):
+            pass
+
+        files = pattern_files(self._directory) if os.path.isdir(self._directory) else {}
+        changed = set(index) - set(files)
+        fresh = {}
+        for name, path in files.items():
+            stat = os.stat(path)
+            entry = index.get(name)
+            if (entry is None or entry['file'] != os.path.relpath(path, self._directory) or
+                    entry['mtime'] != stat.st_mtime or entry['bytes'] != stat.st_size):
+                entry = self._index_entry(name, path, stat)
+                changed.add(name)
+            fresh[name] = entry
+        if changed:
+            try:
+                with open(self._indexPath, 'w') as f:
+                    json.dump({'version': INDEX_VERSION, 'patterns': fresh}, f, indent=1)
+            except OSError:
+                pass        # a read only library is indexed at every start
+        return fresh
+
+    def _index_entry(self, name, path, stat):
+        """ Read a pattern file and return its index entry, the pattern is cached
+        """
+        cells, positioned = read_board(path)
+        rule = read_rule(path)
+        try:
+            rule = Rule.parse(rule).rulestring if rule is not None else None
+        except ValueError:
+            rule = None         # not a Life-like rule, the pattern keeps the rule of the board
+        self._cache_put(name, (cells, positioned))
+        corner, bitmap = bounding_box(cells)
+        return {'file': os.path.relpath(path, self._directory), 'format': board_format(path),
+                'mtime': stat.st_mtime, 'bytes': stat.st_size,
+                'width': bitmap.shape[0], 'height': bitmap.shape[1],
+                'bbox': [corner[0], corner[1], corner[0] + bitmap.shape[0] - 1, corner[1] + bitmap.shape[1] - 1],
+                'population': len(cells), 'positioned': positioned, 'rule': rule,
+                'period': pattern_period(cells, rule) if 0 < len(cells) <= PERIOD_CELLS else None}
+
+    def _cache_put(self, name, pattern):
+        """ Cache a pattern, read only since it is shared, dropping the least recently used ones
+        """
+        pattern[0].setflags(write=False)
+        size = pattern[0].nbytes
+        with self._lock:
+            if name in self._cache:
+                self._cacheBytes -= self._cache.pop(name)[0].nbytes
+            if size > self._maxBytes:
+                return
+            self._cache[name] = pattern
+            self._cacheBytes += size
+            while self._cacheBytes > self._maxBytes:
+                self._cacheBytes -= self._cache.popitem(last=False)[1][0].nbytes
+
+    def pattern(self, name):
+        """ Return the (n, 2) array of the (i, j) alive cells of a pattern and whether
+            they have their position, from the cache when it is there
+        """
+        key = self.find(name)
+        if key is None:
+            raise KeyError("no pattern named %r" % name)
+        with self._lock:
+            pattern = self._cache.get(key)
+            if pattern is not None:
+                self._cache.move_to_end(key)
+                return pattern
+        pattern = read_board(os.path.join(self._directory, self._index[key]['file']))
+        self._cache_put(key, pattern)
+        return pattern
+
+    def preload(self):
+        """ Read the patterns in a background thread, until the cache is full
+        """
+        def load():
+            for name in self.names():
+                if self._cacheBytes >= self._maxBytes:
+                    break
+                if name not in self._cache:
+                    self.pattern(name)
+        thread = threading.Thread(target=load, daemon=True)
+        thread.start()
+        return thread
+
+    def bitmap(self, name):
+        """ Return the (width, height) boolean bitmap of the bounding box of a pattern
+        """
+        return bounding_box(self.pattern(name)[0])[1]
@@ -0,0 +1,153 @@
+import collections, json, threading, time
+import numpy as np
+
+# Phases of a tick, in the order they are reported
+PHASES = ['evolve', 'snapshot', 'latency', 'update_state', 'history', 'timeline', 'paint']
+# Percentiles of the phase durations
+PERCENTILES = [50, 90, 99]
+# Seconds between two statistics returned by end_tick
+STATS_INTERVAL = 0.5
+
+
+class _NullPhase(object):
+    """ Context manager of the phases of a disabled profiler: does nothing
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase(object):
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.add(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Profiler(object):
+    """ Per tick instrumentation of the board evolution: the seconds spent in every
+        phase of a tick and the counters (signals emitted, cells touched...) are
+        summed until end_tick(), which keeps the last window ticks for rolling
+        percentiles and writes the tick as one JSON line in the log file.
+        A tick is the time between two frames shown. Phases and counters can be
+        added from any thread.
+        Disabled, phase() returns a shared context manager that does nothing and
+        count() and add() return at once.
+    """
+    def __init__(self, window=256):
+        self._enabled = False
+        self._lock = threading.Lock()
+        self._window = window
+        self._log = None
+        self.reset()
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        if value and not self._enabled:
+            self.reset()
+        self._enabled = value
+
+    @property
+    def log_path(self):
+        return self._log.name if self._log is not None else None
+
+    def reset(self):
+        """ Forget the ticks measured
+        """
+        with self._lock:
+            self._tick = {}                 # seconds of the phases of the current tick
+            self._counts = {}               # counters of the current tick
+            self._ticks = 0
+            self._times = collections.deque(maxlen=self._window)        # end of the last ticks
+            self._phases = collections.defaultdict(lambda : collections.deque(maxlen=self._window))
+            self._counters = collections.defaultdict(lambda : collections.deque(maxlen=self._window))
+            self._lastStats = 0.0
+
+    def open_log(self, path):
+        """ Write every tick in the path file, as a JSON line
+        """
+        self.close_log()
+        self._log = open(path, 'w')
+
+    def close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def phase(self, name):
+        """ Context manager that adds its duration to the phase name of the tick
+        """
+        if not self._enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add(self, name, seconds):
+        """ Add seconds to the phase name of the tick
+        """
+        if self._enabled:
+            with self._lock:
+                self._tick[name] = self._tick.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        """ Add n to the counter name of the tick
+        """
+        if self._enabled:
+            with self._lock:
+                self._counts[name] = self._counts.get(name, 0) + n
+
+    def end_tick(self):
+        """ Close the current tick; every STATS_INTERVAL seconds return the statistics
+            of the last ticks, otherwise None
+        """
+        if not self._enabled:
+            return None
+        now = time.perf_counter()
+        with self._lock:
+            tick, counts = self._tick, self._counts
+            self._tick, self._counts = {}, {}
+            self._ticks += 1
+            self._times.append(now)
+            for name in set(self._phases) | set(tick):
+                self._phases[name].append(tick.get(name, 0.0))
+            for name in set(self._counters) | set(counts):
+                self._counters[name].append(counts.get(name, 0))
+        if self._log is not None:
+            self._log.write(json.dumps({'tick': self._ticks, 'time': now,
+                                        'ms': {name: 1000*s for name, s in tick.items()},
+                                        'counts': counts}) + '\n')
+        if now - self._lastStats < STATS_INTERVAL:
+            return None
+        self._lastStats = now
+        return self.stats()
+
+    def stats(self):
+        """ Return the statistics of the last ticks: ticks per second, percentiles,
+            mean and max in milliseconds of every phase, mean per tick of every counter
+        """
+        with self._lock:
+            times = list(self._times)
+            phases = {name: np.array(values) for name, values in self._phases.items()}
+            counters = {name: np.array(values) for name, values in self._counters.items()}
+        fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        ms = {}
+        for name in sorted(phases, key=lambda name: PHASES.index(name) if name in PHASES else len(PHASES)):
+            values = 1000*phases[name]
+            ms[name] = dict(zip(['p%d' % p for p in PERCENTILES], np.percentile(values, PERCENTILES).tolist()),
+                            mean=float(values.mean()), max=float(values.max()))
+        return {'ticks': self._ticks, 'fps': fps, 'ms': ms,
+                'counts': {name: float(values.mean()) for name, values in sorted(counters.items())}}
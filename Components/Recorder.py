@@ -0,0 +1,190 @@
+import os, zlib, struct, queue, threading, bisect
+import numpy as np
+
+# Header of a recording: magic, width, height and keyframe interval of the board
+RECORDING_MAGIC = b'GOLR'
+HEADER = struct.Struct('<4sIII')
+# Header of every generation: kind (keyframe, delta ids or delta bitmap),
+# generation, payload size
+RECORD = struct.Struct('<cqI')
+KEYFRAME, DELTA, XOR = b'K', b'D', b'X'
+# Compression level: the fastest one, the board bitmaps compress well anyway
+LEVEL = 1
+
+
+def encode_keyframe(state):
+    """Compressed bitmap of the whole board
+    """
+    return zlib.compress(np.packbits(state.ravel()).tobytes(), LEVEL)
+
+
+def decode_keyframe(payload, width, height):
+    bits = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+    return np.unpackbits(bits, count=width*height).reshape(width, height)
+
+
+def encode_delta(changed):
+    """Compressed flat ids of the cells born or dead since the previous generation,
+    stored as the gaps between consecutive ids
+    """
+    return zlib.compress(np.diff(changed, prepend=0).astype('<u4').tobytes(), LEVEL)
+
+
+def decode_delta(payload):
+    return np.cumsum(np.frombuffer(zlib.decompress(payload), dtype='<u4'), dtype=np.int64)
+
+
+class Recorder(object):
+    """Stream the generations of a board to a file: a full keyframe every
+    keyframe_interval generations and, in between, the cells that changed
+    since the previous generation (their ids, or the bitmap of the changes
+    when they are many).
+    record() only copies the board; the deltas are computed, compressed and
+    written by a background thread, so recording does not slow the evolution.
+    """
+    def __init__(self, path, width, height, keyframe_interval=100):
+        if width*height > 2**32:
+            raise ValueError("boards with more than 2**32 cells can not be recorded")
+        self._path = path
+        self._width = width
+        self._height = height
+        self._interval = keyframe_interval
+        self._queue = queue.Queue()
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(RECORDING_MAGIC, width, height, keyframe_interval))
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self):
+        return self._path
+
+    def record(self, generation, state):
+        """Queue the (width, height) board of a generation for writing
+        """
+        self._queue.put((generation, np.array(state, dtype=np.uint8)))
+
+    def close(self):
+        """Write the generations still queued and close the file
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+
+    def _write(self):
+        previous, count = None, 0
+        for generation, state in iter(self._queue.get, None):
+            if previous is None or count >= self._interval:
+                kind, payload, count = KEYFRAME, encode_keyframe(state), 0
+            else:
+                diff = state != previous
+                changed = np.flatnonzero(diff)
+                # the ids take 32 bits each, the bitmap one bit per cell
+                if 32*len(changed) < diff.size:
+                    kind, payload = DELTA, encode_delta(changed)
+                else:
+                    kind, payload = XOR, encode_keyframe(diff)
+            self._file.write(RECORD.pack(kind, generation, len(payload)))
+            self._file.write(payload)
+            if kind == KEYFRAME:
+                # a recording still being written can be replayed up to the last keyframe
+                self._file.flush()
+            previous = state
+            count += 1
+
+
+class Player(object):
+    """Replay a recording: any generation is reached from the keyframe before it,
+    applying at most keyframe_interval deltas
+    """
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        magic, self._width, self._height, self._interval = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != RECORDING_MAGIC:
+            raise ValueError("%s is not a recording" % path)
+
+        # generation, kind and payload position of every record
+        self._generations, self._kinds, self._offsets, self._sizes = [], [], [], []
+        offset, end = HEADER.size, os.fstat(self._file.fileno()).st_size
+        while True:
+            header = self._file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            kind, generation, size = RECORD.unpack(header)
+            offset += RECORD.size
+            if offset + size > end:
+                break       # the last record is still being written
+            self._generations.append(generation)
+            self._kinds.append(kind)
+            self._offsets.append(offset)
+            self._sizes.append(size)
+            offset += size
+            self._file.seek(offset)
+        self._keyframes = [k for k, kind in enumerate(self._kinds) if kind == KEYFRAME]
+
+        self._position = -1
+        self._state = np.zeros((self._width, self._height), dtype=np.uint8)
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def generations(self):
+        return self._generations
+
+    @property
+    def generation(self):
+        return self._generations[self._position] if self._position >= 0 else None
+
+    @property
+    def state(self):
+        return self._state
+
+    def __len__(self):
+        return len(self._generations)
+
+    def _payload(self, k):
+        self._file.seek(self._offsets[k])
+        return self._file.read(self._sizes[k])
+
+    def _apply(self, k):
+        """Move the board to the record k, from the record k - 1 or from a keyframe
+        """
+        if self._kinds[k] == KEYFRAME:
+            self._state = decode_keyframe(self._payload(k), self._width, self._height)
+        elif self._kinds[k] == XOR:
+            self._state ^= decode_keyframe(self._payload(k), self._width, self._height)
+        else:
+            self._state.flat[decode_delta(self._payload(k))] ^= 1
+        self._position = k
+
+    def seek(self, generation):
+        """Move to the last recorded generation not after the given one, return its board
+        """
+        k = bisect.bisect_right(self._generations, generation) - 1
+        if k < 0:
+            raise IndexError("generation %d is before the recording" % generation)
+        keyframe = self._keyframes[bisect.bisect_right(self._keyframes, k) - 1]
+        # start from the keyframe, unless the current record is already between it and k
+        if not keyframe <= self._position <= k:
+            self._apply(keyframe)
+        for r in range(self._position + 1, k + 1):
+            self._apply(r)
+        return self._state
+
+    def step(self):
+        """Move to the next recorded generation, return its board or None at the end
+        """
+        if self._position + 1 >= len(self._generations):
+            return None
+        self._apply(self._position + 1)
+        return self._state
+
+    def close(self):
+        self._file.close()
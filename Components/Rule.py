@@ -0,0 +1,113 @@
+import re
+import numpy as np
+
+# Rulestring of Conway's Game of Life
+LIFE = 'B3/S23'
+
+# Life-like rules offered by the GUI, by name
+RULES = {'Life': 'B3/S23',
+         'HighLife': 'B36/S23',
+         'Day & Night': 'B3678/S34678',
+         'Seeds': 'B2/S',
+         'Life without Death': 'B3/S012345678',
+         'Maze': 'B3/S12345',
+         '2x2': 'B36/S125',
+         'Diamoeba': 'B35678/S5678'}
+
+
+class Rule(object):
+    """Life-like rule: a dead cell is born when its number of alive neighbors is in
+    born, an alive cell survives when it is in survive.
+    The rule is compiled into the (2, 9) lookup table of the next state of a cell
+    by its state and its neighbors count, table[state, count]. Each row of the
+    table is also packed in a 9 bit word, bit count of words[state], so that the
+    next state of a whole board is looked up with shifts of uint16 arrays: NumPy
+    gathers with uint8 indices cost more than the comparisons of B3/S23 itself.
+    """
+    def __init__(self, born=(3,), survive=(2, 3)):
+        born, survive = sorted(set(born)), sorted(set(survive))
+        if any(not 0 <= n <= 8 for n in born + survive):
+            raise ValueError("neighbors counts of a Life-like rule are between 0 and 8")
+        self._born = tuple(born)
+        self._survive = tuple(survive)
+
+        self._table = np.zeros((2, 9), dtype=np.uint8)
+        self._table[0, born] = 1
+        self._table[1, survive] = 1
+        self._table.setflags(write=False)
+        self._words = [np.uint16(sum(1 << n for n in counts)) for counts in (born, survive)]
+
+    @classmethod
+    def parse(cls, rulestring):
+        """Return the rule of a rulestring: B3/S23 notation, in any case and with or
+        without the slash, the S/B notation of the old programs, 23/3, or a name
+        of RULES. The topology suffix of the Golly rules (B3/S23:T80,60) is ignored
+        """
+        names = {name.lower(): value for name, value in RULES.items()}
+        text = names.get(rulestring.strip().lower(), rulestring)
+        text = text.split(':')[0].strip().upper().replace(' ', '')
+        match = re.fullmatch(r'B([0-8]*)/?S([0-8]*)', text)
+        if match:
+            born, survive = match.groups()
+        else:
+            match = re.fullmatch(r'S?([0-8]*)/B?([0-8]*)', text)
+            if match is None:
+                raise ValueError("%r is not a B/S rulestring" % rulestring)
+            survive, born = match.groups()
+        return cls(map(int, born), map(int, survive))
+
+    @property
+    def born(self):
+        return self._born
+
+    @property
+    def survive(self):
+        return self._survive
+
+    @property
+    def table(self):
+        return self._table
+
+    @property
+    def words(self):
+        return self._words
+
+    @property
+    def rulestring(self):
+        return 'B%s/S%s' % (''.join(map(str, self._born)), ''.join(map(str, self._survive)))
+
+    @property
+    def births_from_nothing(self):
+        """Check whether dead cells without alive neighbors are born (B0 rules): the
+        whole board changes at every step, and an unbounded universe fills up
+        """
+        return 0 in self._born
+
+    def next_state(self, state, count, out=None, work=None):
+        """Return the next state (1 alive, 0 dead) of cells with the given uint8 states
+        and neighbors counts; work is an optional uint16 buffer of the same shape
+        """
+        born, survive = self._words
+        # word of every cell: born ^ (born ^ survive) for the alive cells
+        work = np.multiply(state, born ^ survive, out=work, dtype=np.uint16)
+        np.bitwise_xor(work, born, out=work)
+        np.right_shift(work, count, out=work)
+        if out is None:
+            out = np.empty(np.shape(work), dtype=np.uint8)
+        return np.bitwise_and(work, 1, out=out, casting='unsafe')
+
+    def __eq__(self, other):
+        return isinstance(other, Rule) and self._table.tobytes() == other._table.tobytes()
+
+    def __hash__(self):
+        return hash((self._born, self._survive))
+
+    def __str__(self):
+        return self.rulestring
+
+    def __repr__(self):
+        return 'Rule.parse(%r)' % self.rulestring
+
+
+# Rule of the engines that are not given one
+LIFE_RULE = Rule.parse(LIFE)
@@ -0,0 +1,160 @@
+from PyQt5 import QtCore
+import collections, threading, time
+
+from Components.Profiler import Profiler
+
+# Snapshot of the board published by the simulation: generation, (width, height)
+# read-only state, flat history decay (None without history), cycle of the board,
+# generations per second achieved in the last second and time.perf_counter() of
+# the publication
+Frame = collections.namedtuple('Frame', 'generation state decay cycle rate time')
+
+# Seconds of evolution the achieved rate is measured over
+RATE_WINDOW = 1.0
+
+
+class Simulation(QtCore.QThread):
+    """ Evolve a GOL_Core in a background thread, at a target number of generations
+        per second, with turbo generations computed for every published frame.
+        Frames are immutable snapshots and only the latest one is kept: frameReady
+        is emitted when a frame is published and the previous one was taken, so a
+        slow view skips the frames it cannot paint instead of slowing the evolution.
+        The core is changed only while holding lock, that the GUI holds too when it
+        edits the board.
+        The evolve and snapshot phases, the generations and the dropped frames are
+        counted by the profiler.
+    """
+
+    frameReady = QtCore.pyqtSignal()
+
+    def __init__(self, core, lock, evolve=None, history_length=None, profiler=None):
+        super().__init__()
+        self._core = core
+        self._lock = lock
+        self._profiler = profiler or Profiler()
+        self._evolve = evolve or core.step      # computes one generation of the core
+        self._historyLength = history_length    # decay of the frames, None for no history
+        self._target = 10.0                     # generations per second
+        self._turbo = 1                         # generations of every frame
+        self._stopOnCycle = False
+        self._stopEvent = threading.Event()
+        self._frame = None                      # latest frame, not taken yet
+        self._frameLock = threading.Lock()
+        self._dropped = 0                       # frames replaced before being taken
+        self._times = collections.deque()       # (time, generation) of the last frames
+
+    @property
+    def target(self):
+        return self._target
+
+    @target.setter
+    def target(self, value):
+        self._target = max(float(value), 1e-3)
+
+    @property
+    def turbo(self):
+        return self._turbo
+
+    @turbo.setter
+    def turbo(self, value):
+        self._turbo = max(int(value), 1)
+
+    @property
+    def history_length(self):
+        return self._historyLength
+
+    @history_length.setter
+    def history_length(self, value):
+        self._historyLength = value
+
+    @property
+    def stop_on_cycle(self):
+        return self._stopOnCycle
+
+    @stop_on_cycle.setter
+    def stop_on_cycle(self, value):
+        self._stopOnCycle = value
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    def start(self):
+        """ Start the evolution, if it is not running
+        """
+        if not self.isRunning():
+            self._stopEvent.clear()
+            self._times.clear()
+            super().start()
+
+    def stop(self):
+        """ Stop the evolution and wait for the thread, the frame not taken yet is dropped
+        """
+        self._stopEvent.set()
+        self.wait()
+        with self._frameLock:
+            self._frame = None
+
+    def take_frame(self):
+        """ Return the latest frame, or None when it was already taken
+        """
+        with self._frameLock:
+            frame, self._frame = self._frame, None
+        return frame
+
+    def run(self):
+        deadline = time.perf_counter()
+        known = self._core.cycle                # a board already periodic keeps running
+        while not self._stopEvent.is_set():
+            generations = 0
+            with self._profiler.phase('evolve'):
+                for _ in range(self._turbo):
+                    # stop() waits for the thread: a long turbo batch must not delay it
+                    if self._stopEvent.is_set():
+                        break
+                    with self._lock:
+                        self._evolve()
+                    generations += 1
+                    if self._stopOnCycle and self._core.cycle not in (None, known):
+                        self._stopEvent.set()
+                        break
+            self._profiler.count('generations', generations)
+            with self._profiler.phase('snapshot'):
+                self._publish()
+            # wait for the time of the generations at the target rate, a late
+            # evolution does not try to catch up
+            deadline += generations / self._target
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                self._stopEvent.wait(delay)
+            else:
+                deadline = time.perf_counter()
+
+    def _publish(self):
+        """ Publish a snapshot of the core, replacing the frame not taken yet
+        """
+        with self._lock:
+            core = self._core
+            state = core.engine.get_state().copy()
+            decay = core.history(self._historyLength) if self._historyLength else None
+            generation, cycle = core.generation, core.cycle
+        state.setflags(write=False)
+        if decay is not None:
+            decay.setflags(write=False)
+
+        now = time.perf_counter()
+        self._times.append((now, generation))
+        while len(self._times) > 2 and now - self._times[0][0] > RATE_WINDOW:
+            self._times.popleft()
+        (first, start), (last, end) = self._times[0], self._times[-1]
+        rate = (end - start) / (last - first) if last > first else 0.0
+
+        with self._frameLock:
+            pending = self._frame is not None
+            self._frame = Frame(generation, state, decay, cycle, rate, time.perf_counter())
+            self._dropped += pending
+        if pending:
+            self._profiler.count('dropped')
+        else:
+            self._profiler.count('signals')
+            self.frameReady.emit()
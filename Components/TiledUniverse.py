@@ -0,0 +1,241 @@
+import numpy as np
+
+from Components.Engine import Engine
+from Components.Rule import LIFE_RULE
+
+
+class TiledUniverse(object):
+    """Unbounded Game of Life universe stored as a dictionary of square tiles.
+    The tile (tx, ty) holds the cells with x // tile == tx and y // tile == ty
+    as a (tile, tile) uint8 array indexed [x % tile, y % tile].
+    Tiles are allocated when alive cells enter them and freed when they become
+    empty, so the memory follows the alive population and not the bounding box.
+    Rules where cells are born from nothing (B0) would fill the whole universe:
+    they cannot be set.
+    """
+    def __init__(self, tile=64, rule=LIFE_RULE):
+        self.tile = tile
+        self._tiles = {}
+        self.rule = rule
+
+        # (source, destination) slices that copy the side of a neighbor tile
+        # into the frame of dead cells around a tile
+        T = tile
+        self._halo = {-1: (slice(T - 1, T), slice(0, 1)),
+                      0: (slice(0, T), slice(1, T + 1)),
+                      1: (slice(0, 1), slice(T + 1, T + 2))}
+
+    @property
+    def tiles(self):
+        return self._tiles
+
+    @property
+    def rule(self):
+        return self._rule
+
+    @rule.setter
+    def rule(self, rule):
+        if rule.births_from_nothing:
+            raise ValueError("the rule %s fills an unbounded universe" % rule)
+        self._rule = rule
+
+    def population(self):
+        return int(sum(np.count_nonzero(t) for t in self._tiles.values()))
+
+    def clear(self):
+        self._tiles = {}
+
+    def get(self, x, y):
+        """Checks whether the cell (x, y) is alive
+        """
+        t = self._tiles.get((x // self.tile, y // self.tile))
+        return t is not None and bool(t[x % self.tile, y % self.tile])
+
+    def set(self, x, y, alive):
+        """Set the cell (x, y) to alive or dead
+        """
+        key = (x // self.tile, y // self.tile)
+        t = self._tiles.get(key)
+        if t is None:
+            if not alive:
+                return
+            t = self._tiles[key] = np.zeros((self.tile, self.tile), dtype=np.uint8)
+        t[x % self.tile, y % self.tile] = 1 if alive else 0
+        if not alive and not t.any():
+            del self._tiles[key]
+
+    def cells(self):
+        """Return the alive cells as an (n, 2) array of (x, y) coordinates
+        """
+        cells = [np.argwhere(t) + (tx*self.tile, ty*self.tile) for (tx, ty), t in self._tiles.items()]
+        if not cells:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.concatenate(cells)
+
+    def set_cells(self, cells, alive=True):
+        """Set alive (or dead) the given (x, y) cells
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        keys = cells // self.tile
+        local = cells % self.tile
+        for key in set(map(tuple, keys.tolist())):
+            inside = (keys[:, 0] == key[0]) & (keys[:, 1] == key[1])
+            t = self._tiles.get(key)
+            if t is None:
+                if not alive:
+                    continue
+                t = self._tiles[key] = np.zeros((self.tile, self.tile), dtype=np.uint8)
+            t[local[inside, 0], local[inside, 1]] = 1 if alive else 0
+            if not alive and not t.any():
+                del self._tiles[key]
+
+    def _tile_range(self, x0, y0, width, height):
+        """Keys of the tiles overlapping the given rectangle
+        """
+        T = self.tile
+        return [(tx, ty) for tx in range(x0 // T, (x0 + width - 1) // T + 1)
+                for ty in range(y0 // T, (y0 + height - 1) // T + 1)]
+
+    def _overlap(self, key, x0, y0, width, height):
+        """Slices of the tile key and of the rectangle that overlap
+        """
+        T = self.tile
+        ax, ay = max(x0, key[0]*T), max(y0, key[1]*T)
+        bx, by = min(x0 + width, (key[0] + 1)*T), min(y0 + height, (key[1] + 1)*T)
+        tile = (slice(ax - key[0]*T, bx - key[0]*T), slice(ay - key[1]*T, by - key[1]*T))
+        rect = (slice(ax - x0, bx - x0), slice(ay - y0, by - y0))
+        return tile, rect
+
+    def window(self, x0, y0, width, height, out=None):
+        """Return the (width, height) rectangle of cells with top left cell (x0, y0)
+        """
+        if out is None:
+            out = np.zeros((width, height), dtype=np.uint8)
+        else:
+            out[...] = 0
+        for key in self._tile_range(x0, y0, width, height):
+            t = self._tiles.get(key)
+            if t is not None:
+                tile, rect = self._overlap(key, x0, y0, width, height)
+                out[rect] = t[tile]
+        return out
+
+    def set_window(self, x0, y0, state):
+        """Replace the rectangle of cells with top left cell (x0, y0) with state
+        """
+        state = np.asarray(state) != 0
+        width, height = state.shape
+        for key in self._tile_range(x0, y0, width, height):
+            tile, rect = self._overlap(key, x0, y0, width, height)
+            t = self._tiles.get(key)
+            if t is None:
+                if not state[rect].any():
+                    continue
+                t = self._tiles[key] = np.zeros((self.tile, self.tile), dtype=np.uint8)
+            t[tile] = state[rect]
+            if not t.any():
+                del self._tiles[key]
+
+    def step(self):
+        """Compute the next generation of the universe
+        """
+        T = self.tile
+        candidates = set(self._tiles)
+        for (tx, ty), t in self._tiles.items():
+            # cells can be born in a neighbor tile only next to an alive border cell
+            if t[0].any() or t[-1].any() or t[:, 0].any() or t[:, -1].any():
+                candidates.update((tx + dx, ty + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+        candidates = list(candidates)
+        if not candidates:
+            return
+
+        # every candidate tile with a frame of its neighbors' border cells
+        p = np.zeros((len(candidates), T + 2, T + 2), dtype=np.uint8)
+        for n, (tx, ty) in enumerate(candidates):
+            for dx, (sx, px) in self._halo.items():
+                for dy, (sy, py) in self._halo.items():
+                    t = self._tiles.get((tx + dx, ty + dy))
+                    if t is not None:
+                        p[n, px, py] = t[sx, sy]
+
+        count = (p[:, :-2, :-2] + p[:, :-2, 1:-1] + p[:, :-2, 2:] + p[:, 1:-1, :-2] +
+                 p[:, 1:-1, 2:] + p[:, 2:, :-2] + p[:, 2:, 1:-1] + p[:, 2:, 2:])
+        nextState = self._rule.next_state(p[:, 1:-1, 1:-1], count)
+        alive = nextState.reshape(len(candidates), -1).any(axis=1)
+        self._tiles = {candidates[n]: nextState[n].copy() for n in np.flatnonzero(alive)}
+
+
+class TiledEngine(Engine):
+    """Engine over an unbounded TiledUniverse. The board is a (width, height)
+    window on the universe whose top left cell is origin; the cells outside
+    the window keep evolving.
+    """
+    def __init__(self, width, height, tile=64):
+        super().__init__(width, height)
+
+        self._universe = TiledUniverse(tile)
+        self._origin = (0, 0)
+        self._window = np.zeros((width, height), dtype=np.uint8)
+
+    @property
+    def universe(self):
+        return self._universe
+
+    @property
+    def origin(self):
+        return self._origin
+
+    def _refresh(self):
+        """Copy the window of the universe on the board and return the changed ids
+        """
+        old = self._window.copy()
+        self._universe.window(self._origin[0], self._origin[1], self.width, self.height, out=self._window)
+        return np.flatnonzero(old != self._window)
+
+    def get_state(self):
+        return self._window
+
+    def set_state(self, state):
+        self._universe.set_window(self._origin[0], self._origin[1], state)
+        self._refresh()
+
+    def is_alive(self, idx):
+        return bool(self._window.flat[idx])
+
+    def set_cell(self, idx, alive):
+        i, j = divmod(int(idx), self.height)
+        self._universe.set(self._origin[0] + i, self._origin[1] + j, alive)
+        self._window[i, j] = 1 if alive else 0
+
+    def set_cells_at(self, ids, alive):
+        i, j = np.divmod(np.asarray(ids, dtype=np.int64), self.height)
+        self._universe.set_cells(np.stack([self._origin[0] + i, self._origin[1] + j], axis=1), alive)
+        self._window[i, j] = 1 if alive else 0
+
+    def set_rule(self, rule):
+        self._universe.rule = rule
+        super().set_rule(rule)
+
+    def population(self):
+        return self._universe.population()
+
+    def clear(self):
+        self._universe.clear()
+        self._refresh()
+
+    def cells(self):
+        return self._universe.cells()
+
+    def set_cells(self, cells):
+        self._universe.set_cells(cells)
+        self._refresh()
+
+    def step(self):
+        self._universe.step()
+        return self._refresh()
+
+    def scroll(self, dx, dy):
+        """Move the window on the universe by (dx, dy) cells, return the changed ids
+        """
+        self._origin = (self._origin[0] + dx, self._origin[1] + dy)
+        return self._refresh()
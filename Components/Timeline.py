@@ -0,0 +1,124 @@
+import bisect
+import numpy as np
+
+from Components.Recorder import encode_keyframe, decode_keyframe
+
+
+class Timeline(object):
+    """Bounded in-memory history of the generations of a board.
+    Every keyframe_interval generations the whole board is kept as a keyframe,
+    the other generations as the XOR with the previous one, all of them packed
+    one bit per cell and compressed. A XOR delta moves the board one generation
+    forward or backward, so stepping back costs one delta and any generation is
+    at most keyframe_interval deltas away from a keyframe.
+    When the timeline takes more than max_bytes, the oldest keyframes are
+    evicted with their deltas.
+    """
+    def __init__(self, width, height, keyframe_interval=64, max_bytes=64 << 20):
+        self._width = width
+        self._height = height
+        self._interval = keyframe_interval
+        self._maxBytes = max_bytes
+        self.clear()
+
+    def clear(self):
+        """Forget every generation
+        """
+        self._generations = []      # generation of every entry
+        self._payloads = []         # compressed keyframe or XOR delta of every entry
+        self._keyframes = []        # positions of the keyframe entries
+        self._bytes = 0
+        self._last = None           # board of the last entry
+        self._position = -1         # entry of the board in _cursor
+        self._cursor = None
+
+    @property
+    def first(self):
+        return self._generations[0] if self._generations else None
+
+    @property
+    def last(self):
+        return self._generations[-1] if self._generations else None
+
+    @property
+    def generations(self):
+        return self._generations
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._generations)
+
+    def __contains__(self, generation):
+        k = bisect.bisect_left(self._generations, generation)
+        return k < len(self._generations) and self._generations[k] == generation
+
+    def push(self, generation, state):
+        """Add the (width, height) board of a generation. The generations after it,
+        left by a move back in the timeline, are dropped first
+        """
+        state = np.asarray(state, dtype=np.uint8)
+        if self._generations and self._generations[-1] >= generation:
+            self._truncate(generation)
+        if not self._keyframes or len(self._generations) - self._keyframes[-1] >= self._interval:
+            self._keyframes.append(len(self._generations))
+            payload = encode_keyframe(state)
+        else:
+            payload = encode_keyframe(state ^ self._last)
+        self._generations.append(generation)
+        self._payloads.append(payload)
+        self._bytes += len(payload)
+        self._last = state.copy()
+        self._evict()
+
+    def _truncate(self, generation):
+        """Drop the entries of the given generation and of the following ones
+        """
+        k = bisect.bisect_left(self._generations, generation)
+        if k > 0:
+            self._last = self.seek(self._generations[k - 1]).copy()
+        self._bytes -= sum(len(p) for p in self._payloads[k:])
+        del self._generations[k:], self._payloads[k:]
+        self._keyframes = [kf for kf in self._keyframes if kf < k]
+        if self._position >= k:
+            self._position, self._cursor = -1, None
+
+    def _evict(self):
+        """Drop the oldest keyframes, with their deltas, while the memory is over the cap
+        """
+        while self._bytes > self._maxBytes and len(self._keyframes) > 1:
+            k = self._keyframes[1]
+            self._bytes -= sum(len(p) for p in self._payloads[:k])
+            del self._generations[:k], self._payloads[:k]
+            self._keyframes = [kf - k for kf in self._keyframes[1:]]
+            self._position = self._position - k if self._position >= k else -1
+            if self._position < 0:
+                self._cursor = None
+
+    def _decode(self, k):
+        return decode_keyframe(self._payloads[k], self._width, self._height)
+
+    def seek(self, generation):
+        """Return the board of a generation in the timeline, the array is reused
+        by the following seeks
+        """
+        k = bisect.bisect_left(self._generations, generation)
+        if k == len(self._generations) or self._generations[k] != generation:
+            raise IndexError("generation %d is not in the timeline" % generation)
+        segment = bisect.bisect_right(self._keyframes, k)
+        keyframe = self._keyframes[segment - 1]
+        end = self._keyframes[segment] if segment < len(self._keyframes) else len(self._generations)
+        # from the cursor, forward or backward, when it is after the same keyframe
+        # and closer than the keyframe
+        if (self._cursor is None or not keyframe <= self._position < end or
+                abs(self._position - k) > k - keyframe):
+            self._cursor, self._position = self._decode(keyframe), keyframe
+        while self._position < k:
+            self._position += 1
+            self._cursor ^= self._decode(self._position)
+        while self._position > k:
+            self._cursor ^= self._decode(self._position)
+            self._position -= 1
+        return self._cursor
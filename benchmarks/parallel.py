@@ -0,0 +1,63 @@
+""" Parallel efficiency of the ParallelEngine: generations per second of a large
+    random board for a growing number of worker processes, compared with the
+    single process NumpyEngine
+
+    $ python benchmarks/parallel.py --size 4000x4000 --workers 1 2 4 8 -n 20
+"""
+import os, sys, time, json, argparse
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from Components.Engine import NumpyEngine
+from Components.ParallelEngine import ParallelEngine
+
+
+def time_engine(engine, state, generations):
+    """ Return the seconds spent computing the generations from the state
+    """
+    engine.set_state(state)
+    engine.advance(1)       # warm up the workers
+    start = time.perf_counter()
+    engine.advance(generations)
+    return time.perf_counter() - start
+
+
+def efficiency(width, height, workers, generations, density=0.3, seed=0):
+    """ Return the NumpyEngine seconds and one row per number of workers with the
+        speedup over one worker and the parallel efficiency (speedup / workers)
+    """
+    state = (np.random.default_rng(seed).random((width, height)) < density).astype(np.uint8)
+    serial = time_engine(NumpyEngine(width, height), state, generations)
+    rows, base = [], None
+    for n in sorted(set(workers) | {1}):
+        engine = ParallelEngine(width, height, workers=n)
+        # the engine has fewer workers than asked on boards of few rows
+        n = engine.workers
+        seconds = time_engine(engine, state, generations)
+        engine.close()
+        base = base or seconds      # one worker comes first
+        speedup = base / seconds
+        rows.append({'workers': n, 'seconds': seconds, 'generations_per_second': generations/seconds,
+                     'speedup': speedup, 'efficiency': speedup/n, 'vs_numpy': serial/seconds})
+    return serial, rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--size', default='2000x2000', help="board size as WIDTHxHEIGHT")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()],
+                        help="numbers of worker processes")
+    parser.add_argument('-n', '--generations', type=int, default=20, help="generations timed")
+    parser.add_argument('--json', help="also write the results in this file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split('x'))
+    serial, rows = efficiency(width, height, args.workers, args.generations)
+    print("%s board, %d cores, NumpyEngine %.1f gen/s" % (args.size, os.cpu_count(), args.generations/serial))
+    print("%8s %10s %10s %9s %11s %9s" % ('workers', 'seconds', 'gen/s', 'speedup', 'efficiency', 'vs numpy'))
+    for row in rows:
+        print("%(workers)8d %(seconds)10.3f %(generations_per_second)10.1f %(speedup)9.2f "
+              "%(efficiency)11.2f %(vs_numpy)9.2f" % row)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'size': args.size, 'cores': os.cpu_count(), 'numpy_seconds': serial, 'rows': rows}, f, indent=2)
@@ -0,0 +1,47 @@
+""" Startup time of the Game of Life board (init_board: grid creation and cells
+    neighborhood) and Python memory of the model, per cell, for growing values of
+    max_window_dim
+
+    $ QT_QPA_PLATFORM=offscreen python benchmarks/startup.py
+"""
+import os, sys, time, gc, tracemalloc, argparse
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtWidgets
+from model import GameOfLife
+from view import GOL_View
+
+SIZES = ['800x600', '1600x1200', '3200x2400']
+
+
+def time_startup(max_window_dim, render_mode):
+    """ Return the number of cells, the seconds spent by init_board and the bytes
+        allocated by Python for the model and its board (Qt items not included)
+    """
+    gc.collect()
+    tracemalloc.start()
+    model = GameOfLife(max_window_dim)
+    view = GOL_View(model, render_mode=render_mode)
+    start = time.perf_counter()
+    model.init_board()
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    model.close()
+    return len(model.boardCell), elapsed, allocated
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', nargs='+', default=SIZES, help="window sizes as WIDTHxHEIGHT")
+    parser.add_argument('--modes', nargs='+', default=['image', 'items'], help="view render modes")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+    print("%-10s %-6s %10s %10s %12s %12s" % ('size', 'mode', 'cells', 'seconds', 'us/cell', 'bytes/cell'))
+    for size in args.sizes:
+        dim = tuple(int(v) for v in size.split('x'))
+        for mode in args.modes:
+            cells, elapsed, allocated = time_startup(dim, mode)
+            print("%-10s %-6s %10d %10.3f %12.2f %12.1f" % (size, mode, cells, elapsed, 1e6*elapsed/cells,
+                                                           allocated/cells))
@@ -0,0 +1,283 @@
+""" Benchmark suite of the Game of Life: generations per second of the engines on
+    the preset patterns, on random boards of several densities, on boards of
+    several sizes and with several rules, the GUI startup, cells update, history and painting (on the
+    offscreen Qt platform) and the board files round trips
+
+    $ python benchmarks/suite.py --json results.json
+    $ python benchmarks/suite.py --baseline benchmarks/baseline.json
+    $ python benchmarks/suite.py --only engine io --save-baseline benchmarks/baseline.json
+
+    Every result has a value, a unit and whether higher values are better. With
+    a baseline, the results that got worse by more than the tolerance are
+    reported as regressions and the exit status is 1.
+"""
+import os, sys, time, json, platform, tempfile, argparse
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+from core import GOL_Core, PATTERN_DIR, FORMATS
+from Components.PatternLibrary import pattern_files
+
+ENGINES = ['numpy', 'bitpacked', 'active']
+DENSITIES = [0.05, 0.3, 0.5]
+SIZES = ['80x60', '256x256', '1024x1024']
+RULES = ['B3/S23', 'B36/S23', 'B3678/S34678', 'B2/S']
+RENDER_MODES = ['image', 'items']
+SECTIONS = ['engine', 'density', 'size', 'rule', 'gui', 'io']
+
+# Board of the GUI, and of the patterns and random boards
+WIDTH, HEIGHT = 80, 60
+
+
+# Measures of every benchmark, the best one is kept: the others were slowed by
+# the rest of the machine
+REPEAT = 3
+
+
+def rate(run, min_seconds, repeat=REPEAT, setup=None):
+    """ Call run(n) with a doubling n until it takes min_seconds, then repeat it;
+        return the best calls of the unit per second
+        setup() is called, untimed, before every run
+    """
+    setup = setup or (lambda : None)
+    n = 1
+    while True:
+        setup()
+        start = time.perf_counter()
+        run(n)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+        n *= 2
+    for _ in range(repeat - 1):
+        setup()
+        start = time.perf_counter()
+        run(n)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return n / elapsed
+
+
+def random_state(width, height, density, seed=0):
+    return (np.random.default_rng(seed).random((width, height)) < density).astype(np.uint8)
+
+
+def result(value, unit, higher_is_better=True):
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def generations_per_second(core, min_seconds):
+    """ Generations per second of the core, every measure starts from its current board:
+        the speed of most engines depends on the board
+    """
+    state = core.engine.get_state().copy()
+    core.advance(1)     # warm up
+    return result(rate(core.advance, min_seconds, setup=lambda : core.engine.set_state(state)), 'gen/s')
+
+
+# Engine sections
+def bench_engine(engines, min_seconds):
+    """ Generations per second of every engine on every preset pattern
+    """
+    results = {}
+    for name, path in pattern_files(PATTERN_DIR).items():
+        for engine in engines:
+            core = GOL_Core(WIDTH, HEIGHT, engine)
+            core.load(path)
+            results['engine/%s/%s' % (engine, name)] = generations_per_second(core, min_seconds)
+    return results
+
+
+def bench_density(engines, min_seconds, size=256):
+    """ Generations per second of every engine on random boards of several densities
+    """
+    results = {}
+    for density in DENSITIES:
+        for engine in engines:
+            core = GOL_Core(size, size, engine)
+            core.engine.set_state(random_state(size, size, density))
+            results['density/%s/%g' % (engine, density)] = generations_per_second(core, min_seconds)
+    return results
+
+
+def bench_size(engines, min_seconds, density=0.3):
+    """ Generations per second of every engine on random boards of several sizes
+    """
+    results = {}
+    for size in SIZES:
+        width, height = (int(v) for v in size.split('x'))
+        for engine in engines:
+            core = GOL_Core(width, height, engine)
+            core.engine.set_state(random_state(width, height, density))
+            results['size/%s/%s' % (engine, size)] = generations_per_second(core, min_seconds)
+    return results
+
+
+def bench_rule(engines, min_seconds, size=256, density=0.3):
+    """ Generations per second of every engine with several Life-like rules: the rule
+        table makes them as fast as B3/S23
+    """
+    results = {}
+    for rule in RULES:
+        for engine in engines:
+            core = GOL_Core(size, size, engine, rule=rule)
+            core.engine.set_state(random_state(size, size, density))
+            results['rule/%s/%s' % (engine, rule)] = generations_per_second(core, min_seconds)
+    return results
+
+
+# GUI section
+def bench_gui(min_seconds, pattern='Gosper Gilder Gun'):
+    """ Seconds of init_board, and calls per second of update_state, of the history
+        and of the painting of the whole board, for every render mode
+    """
+    from PyQt5 import QtWidgets, QtGui
+    from model import GameOfLife
+    from view import GOL_View
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    results = {}
+    for mode in RENDER_MODES:
+        seconds = []
+        for _ in range(REPEAT):
+            model = GameOfLife()
+            view = GOL_View(model, render_mode=mode)
+            start = time.perf_counter()
+            model.init_board()
+            seconds.append(time.perf_counter() - start)
+        results['gui/%s/init_board' % mode] = result(min(seconds), 's', False)
+        model.set_pattern(text=pattern)
+        model.history_running = True
+
+        def update(n):
+            for _ in range(n):
+                with model._lock:
+                    changed = model.core.step()
+                model.set_next_states(changed)
+                model.update_state()
+        results['gui/%s/update_state' % mode] = result(rate(update, min_seconds), 'calls/s')
+
+        def history(n):
+            for _ in range(n):
+                model.history()
+        results['gui/%s/history' % mode] = result(rate(history, min_seconds), 'calls/s')
+
+        image = QtGui.QImage(model.max_num_cell_x*model.cell_size, model.max_num_cell_y*model.cell_size,
+                             QtGui.QImage.Format_RGB32)
+
+        def paint(n):
+            painter = QtGui.QPainter(image)
+            for _ in range(n):
+                model.scene.render(painter)
+            painter.end()
+        results['gui/%s/paint' % mode] = result(rate(paint, min_seconds), 'frames/s')
+        view.close()
+        app.processEvents()
+    return results
+
+
+# Board files section
+def bench_io(min_seconds, density=0.3):
+    """ Save and load round trips per second of every board format, for the GUI
+        board and a large one
+    """
+    results = {}
+    folder = tempfile.mkdtemp()
+    for width, height in ((WIDTH, HEIGHT), (1024, 1024)):
+        state = random_state(width, height, density)
+        source = GOL_Core(width, height)
+        source.engine.set_state(state)
+        for ext in FORMATS:
+            path = os.path.join(folder, 'board' + ext)
+
+            def round_trip(n):
+                for _ in range(n):
+                    source.save(path)
+                    GOL_Core(width, height).load(path)
+            results['io/%dx%d/%s' % (width, height, ext[1:])] = result(rate(round_trip, min_seconds), 'round trips/s')
+            os.remove(path)
+    os.rmdir(folder)
+    return results
+
+
+def run(sections, engines, min_seconds):
+    """ Run the benchmark sections, return the results by name
+    """
+    results = {}
+    if 'engine' in sections:
+        results.update(bench_engine(engines, min_seconds))
+    if 'density' in sections:
+        results.update(bench_density(engines, min_seconds))
+    if 'size' in sections:
+        results.update(bench_size(engines, min_seconds))
+    if 'rule' in sections:
+        results.update(bench_rule(engines, min_seconds))
+    if 'gui' in sections:
+        results.update(bench_gui(min_seconds))
+    if 'io' in sections:
+        results.update(bench_io(min_seconds))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """ Return (name, value, baseline value, change) for the results in the baseline,
+        the change is positive when the result got better, and the names of the
+        regressions: results worse than the baseline by more than tolerance
+    """
+    rows, regressions = [], []
+    for name, res in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None or not base['value']:
+            continue
+        ratio = res['value'] / base['value']
+        change = ratio - 1 if res['higher_is_better'] else 1/ratio - 1 if ratio else float('inf')
+        rows.append((name, res['value'], base['value'], change))
+        if change < -tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def machine():
+    info = {'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'cores': os.cpu_count()}
+    try:
+        from PyQt5.QtCore import PYQT_VERSION_STR
+        info['pyqt'] = PYQT_VERSION_STR
+    except ImportError:
+        pass
+    return info
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--only', nargs='+', choices=SECTIONS, default=SECTIONS, help="sections to run")
+    parser.add_argument('--engines', nargs='+', default=ENGINES, help="engines of the engine, density and size sections")
+    parser.add_argument('--min-time', type=float, default=0.2, help="minimum seconds of every measure")
+    parser.add_argument('--json', help="write the results in this file")
+    parser.add_argument('--baseline', help="compare the results with this results file")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="relative slowdown over the baseline reported as a regression")
+    parser.add_argument('--save-baseline', help="write the results as the baseline in this file")
+    args = parser.parse_args()
+
+    results = run(args.only, args.engines, args.min_time)
+    print("%-50s %14s %s" % ('benchmark', 'value', 'unit'))
+    for name, res in sorted(results.items()):
+        print("%-50s %14.3f %s" % (name, res['value'], res['unit']))
+
+    report = {'machine': machine(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        rows, regressions = compare(results, baseline, args.tolerance)
+        print("\n%-50s %14s %14s %8s" % ('benchmark', 'value', 'baseline', 'change'))
+        for name, value, base, change in rows:
+            print("%-50s %14.3f %14.3f %+7.0f%%%s" % (name, value, base, 100*change,
+                                                     '  REGRESSION' if name in regressions else ''))
+        print("\n%d regressions over %d results compared" % (len(regressions), len(rows)))
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,114 @@
+""" Run the Game of Life without the GUI
+
+    $ python cli.py "Gosper Gilder Gun" -n 1000 -o results/
+    $ python cli.py backup-folder/PlayWithMe/board.csv -n 5000 --engine bitpacked
+    $ python cli.py "R Pentomino" -n 1200 --record r-pentomino.golr
+    $ python cli.py r-pentomino.golr --seek 1000 -n 0 --format rle
+    $ python cli.py "R Pentomino" -n 5000 --until-stable
+
+    The board is loaded from a board file (.rle, .cells, .golb or .csv, or a
+    folder with a board file), or from a pattern of backup-folder/pattern. After
+    N generations the final board is written in the output folder as board.csv
+    (or in the --format one), with the timing in timing.json.
+    Every generation can be recorded in a .golr file, and a recording can be the
+    starting board too: the generation given by --seek is replayed from it.
+    With --until-stable the run stops as soon as the board is periodic.
+"""
+import os, sys, time, json, argparse
+
+from core import GOL_Core, ENGINES, PATTERN_DIR, FORMATS, board_file
+
+# Default board: the grid of the GUI (800x600 window, 20 pixels cells, 2x)
+WIDTH, HEIGHT = 80, 60
+
+
+def find_board(source):
+    """ Return the board file of a path or of a pattern name
+    """
+    if os.path.exists(source):
+        return board_file(source)
+    for name in (source, source.replace(' ', '-')):
+        path = os.path.join(PATTERN_DIR, name)
+        if os.path.isdir(path):
+            return board_file(path)
+    raise FileNotFoundError("no board file or pattern named %r" % source)
+
+
+def run(source, generations, width=WIDTH, height=HEIGHT, engine='numpy', jump=False, record=None, seek=None,
+        until_stable=False, rule=None):
+    """ Load a board and compute the given number of generations, return the
+        core with the final board and the timing
+        With record, every generation is written in the record file
+        With until_stable, the run stops when the board becomes periodic
+        With rule, the board evolves with this rulestring instead of the rule of its file
+    """
+    core = GOL_Core(width, height, engine)
+    start = time.perf_counter()
+    if source.endswith('.golr'):
+        core.replay(source, seek if seek is not None else sys.maxsize)
+    else:
+        core.load(find_board(source))
+    if rule is not None:
+        core.set_rule(rule)
+    loaded = time.perf_counter()
+    if record:
+        core.start_recording(record)
+    first = core.generation
+    if jump:
+        core.jump(generations, method='hashlife')
+    elif until_stable:
+        core.run_until_stable(generations)
+        generations = core.generation - first
+    elif record:
+        for _ in range(generations):
+            core.step()
+    else:
+        core.advance(generations)
+    end = time.perf_counter()
+    core.stop_recording()
+
+    elapsed = end - loaded
+    timing = {'board': source, 'engine': 'hashlife' if jump else engine, 'rule': core.rule.rulestring,
+              'start_generation': first, 'width': width, 'height': height, 'generations': generations,
+              'population': core.engine.population(),
+              'load_seconds': loaded - start, 'run_seconds': elapsed,
+              'generations_per_second': generations / elapsed if elapsed > 0 else float('inf')}
+    if until_stable:
+        timing['period'], timing['cycle_start'] = core.cycle or (None, None)
+    return core, timing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Game of Life without the GUI")
+    parser.add_argument('board', help="board file, folder with a board file or pattern name")
+    parser.add_argument('-n', '--generations', type=int, default=100, help="number of generations")
+    parser.add_argument('-o', '--output', default='.', help="folder for the final board.csv and timing.json")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='numpy', help="evolution engine")
+    parser.add_argument('--jump', action='store_true', help="compute the generations with HashLife")
+    parser.add_argument('--width', type=int, default=WIDTH, help="board columns")
+    parser.add_argument('--height', type=int, default=HEIGHT, help="board rows")
+    parser.add_argument('--record', help="record every generation in this .golr file")
+    parser.add_argument('--seek', type=int, help="generation of a .golr board to start from (default: the last one)")
+    parser.add_argument('--until-stable', action='store_true',
+                        help="stop before N generations when the board becomes periodic")
+    parser.add_argument('--rule', help="B/S rulestring or rule name (default: the rule of the board file, or B3/S23)")
+    parser.add_argument('--format', choices=[ext[1:] for ext in FORMATS], default='csv',
+                        help="format of the final board file")
+    args = parser.parse_args(argv)
+
+    core, timing = run(args.board, args.generations, args.width, args.height, args.engine, args.jump,
+                       args.record, args.seek, args.until_stable, args.rule)
+
+    if not os.path.exists(args.output):
+        os.makedirs(args.output)
+    core.save(os.path.join(args.output, 'board.' + args.format))
+    with open(os.path.join(args.output, 'timing.json'), 'w') as f:
+        json.dump(timing, f, indent=2)
+    print("%(generations)d generations of %(board)s in %(run_seconds).3fs "
+          "(%(generations_per_second).1f gen/s), population %(population)d" % timing)
+    if timing.get('period'):
+        print("periodic from generation %(cycle_start)d with period %(period)d" % timing)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,439 @@
+from Components.Engine import NumpyEngine
+from Components.BitPackedEngine import BitPackedEngine
+from Components.ActiveEngine import ActiveEngine
+from Components.HashLife import HashLife
+from Components.TiledUniverse import TiledEngine
+from Components.ParallelEngine import ParallelEngine
+from Components.BoardFormats import board_file, read_board, read_rule, FORMATS
+from Components.Recorder import Recorder, Player
+from Components.Timeline import Timeline
+from Components.BoardHash import BoardHash, CycleDetector
+from Components.Autosave import Snapshot, write_atomic
+from Components.Rule import Rule, RULES, LIFE
+import os
+import numpy as np
+
+DIR_NAME = os.path.dirname(os.path.abspath(__file__))
+PATTERN_DIR = os.path.join(DIR_NAME, 'backup-folder', 'pattern')
+
+# Engines that can compute the board evolution
+ENGINES = {'numpy': NumpyEngine, 'bitpacked': BitPackedEngine, 'active': ActiveEngine,
+           'unbounded': TiledEngine, 'parallel': ParallelEngine}
+
+# Generations a dead cell remembers its last alive state, and the age of the
+# cells never alive (or alive too long ago to be counted)
+HISTORY_LENGTH = 6
+NEVER_ALIVE = 255
+
+# Memory of the timeline of the past generations
+TIMELINE_BYTES = 64 << 20
+
+# Largest jump computed by the engine of a bounded board, larger ones by HashLife
+EXACT_JUMP = 10000
+
+
+class GOL_Core(object):
+    """ Game of Life board without any Qt dependency: the board state in an engine,
+        the generation counter, the evolution and the board files
+        With history, the core also keeps for every cell the number of generations
+        since it was last alive (0 for the alive cells), updated at every step
+        With a timeline of timeline_bytes, the past generations are kept in memory
+        and the board can be moved back to any of them
+        The hash of the board is updated with the cells changed by every step, the
+        hashes of the last generations reveal when the board becomes periodic; its
+        keys are computed from the coordinates of the cells, there is no table of
+        them; the hash of an unbounded engine covers its whole universe, not only
+        the board
+        The cells evolve with a Life-like rule, given by its B/S rulestring, that the
+        engines look up in the table of the rule; it is saved with the board
+    """
+
+    def __init__(self, width, height, engine='numpy', history=False, timeline_bytes=0, rule=LIFE):
+        self._rule = Rule.parse(rule)
+        self._engine_name = engine
+        self._engine = ENGINES[engine](width, height)
+        self._engine.set_rule(self._rule)
+        self._hashlife = HashLife()     # quadtree engine for jumps of many generations
+        if not self._rule.births_from_nothing:
+            self._hashlife.rule = self._rule
+        self._generation = 0
+        self._age = np.full((width, height), NEVER_ALIVE, dtype=np.uint8) if history else None
+        self._recorder = None           # writes every generation in a recording file
+        self._timeline = Timeline(width, height, max_bytes=timeline_bytes) if timeline_bytes else None
+        self._hash = BoardHash(height)
+        self._cycles = CycleDetector()
+        self._cycle = None              # (period, first generation) of the cycle of the board
+        self.rehash()
+
+    @property
+    def engine(self):
+        return self._engine
+
+    @property
+    def engine_name(self):
+        return self._engine_name
+
+    @property
+    def rule(self):
+        return self._rule
+
+    @property
+    def width(self):
+        return self._engine.width
+
+    @property
+    def height(self):
+        return self._engine.height
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def age(self):
+        return self._age
+
+    @property
+    def recorder(self):
+        return self._recorder
+
+    @property
+    def timeline(self):
+        return self._timeline
+
+    @property
+    def hash(self):
+        return self._hash.value
+
+    @property
+    def cycle(self):
+        return self._cycle
+
+    def set_engine(self, name):
+        """ Select the engine (a key of ENGINES), the current board state is moved to the new engine
+        """
+        state = self.engine.get_state().copy()
+        engine = ENGINES[name](self.width, self.height)
+        try:
+            engine.set_rule(self._rule)
+        except ValueError:
+            if hasattr(engine, 'close'):
+                engine.close()
+            raise
+        if hasattr(self.engine, 'close'):
+            self.engine.close()
+        self._engine = engine
+        self._engine_name = name
+        self.engine.set_state(state)
+
+    def set_rule(self, rule):
+        """ Evolve the board with the rule of a B/S rulestring (or a name of RULES) from
+            now on; raise ValueError for a wrong rulestring or a rule the engine cannot run
+        """
+        rule = Rule.parse(rule)
+        self.engine.set_rule(rule)
+        self._rule = rule
+        if not rule.births_from_nothing:
+            self._hashlife.rule = rule
+        # the past generations do not repeat under another rule
+        self.rehash()
+
+    def step(self):
+        """ Compute the next generation, return the ids of the cells that changed
+        """
+        self._keep_in_timeline()
+        self._generation += 1
+        changed = self.engine.step()
+        self._flip_hash(changed)
+        self._detect_cycle()
+        self._update_age(1)
+        self._record()
+        return changed
+
+    def advance(self, generations):
+        """ Compute the given number of generations as fast as possible
+        """
+        self._keep_in_timeline()
+        self.engine.advance(generations)
+        self._generation += generations
+        self._rehash(keep_cycle=True)
+        self._update_age(generations)
+        self._record()
+
+    def rehash(self):
+        """ Compute the hash of the whole board and forget the hashes of the past
+            generations: to be called after any change of the board that is not a step
+        """
+        self._rehash(keep_cycle=False)
+
+    def _rehash(self, keep_cycle):
+        self._hash.reset_cells(self.engine.cells())
+        self._cycles.clear()
+        self._cycles.add(self._generation, self._hash.value)
+        if not keep_cycle:
+            self._cycle = None
+
+    def _flip_hash(self, changed):
+        """ Update the hash with the cells changed in the board; the universe of an
+            unbounded engine also changes outside the board, it is hashed again
+        """
+        if hasattr(self.engine, 'origin'):
+            self._hash.reset_cells(self.engine.cells())
+        else:
+            self._hash.flip(changed)
+
+    def _detect_cycle(self):
+        period = self._cycles.add(self._generation, self._hash.value)
+        if period is not None and self._cycle is None:
+            self._cycle = (period, self._generation - period)
+
+    def run_until_stable(self, max_generations=100000):
+        """ Compute the generations until the board is periodic (or max_generations),
+            return the (period, first generation) of the cycle or None
+        """
+        for _ in range(max_generations):
+            if self._cycle is not None:
+                break
+            self.step()
+        return self._cycle
+
+    def fast_forward(self, generations):
+        """ Advance a periodic board by any number of generations computing at most
+            period - 1 of them, none when the phase reached is in the timeline;
+            return the ids of the cells that changed
+        """
+        if self._cycle is None:
+            raise ValueError("the board is not in a known cycle")
+        period, start = self._cycle
+        self._keep_in_timeline()
+        old = self.engine.get_state().copy()
+        target = self._generation + generations
+        # the generation of the first period with the same phase as the target
+        phase = start + (target - start) % period
+        # the timeline keeps the board only, not the universe of an unbounded engine
+        if self._timeline is not None and phase in self._timeline and not hasattr(self.engine, 'origin'):
+            self.engine.set_state(self._timeline.seek(phase))
+        else:
+            for _ in range(generations % period):
+                self.engine.step()
+        self._generation = target
+        changed = np.flatnonzero(old != self.engine.get_state())
+        self._flip_hash(changed)
+        self._cycles.clear()
+        self._cycles.add(self._generation, self._hash.value)
+        self._update_age(generations)
+        self._record()
+        return changed
+
+    def _update_age(self, generations):
+        """ Age the history after the given generations: the alive cells restart from 0,
+            the other ones grow older up to NEVER_ALIVE
+        """
+        if self._age is None:
+            return
+        generations = min(generations, NEVER_ALIVE)
+        np.minimum(self._age, NEVER_ALIVE - generations, out=self._age)
+        self._age += generations
+        self._mark_alive()
+
+    def _mark_alive(self):
+        if self._age is not None:
+            self._age[self.engine.get_state() != 0] = 0
+
+    def history(self, length=HISTORY_LENGTH):
+        """ Return the flat decay of every cell: the generations since a dead cell was
+            alive, when they are at most length, 0 for the other cells
+        """
+        age = self._age.ravel()
+        dead = self.engine.get_state().ravel() == 0
+        return np.where(dead & (age <= length), age, 0).astype(np.uint8)
+
+    def reset_history(self):
+        """ Forget the alive states of the past generations
+        """
+        if self._age is not None:
+            self._age.fill(NEVER_ALIVE)
+            self._mark_alive()
+
+    def set_cell(self, idx, alive):
+        """ Set the cell with flat id idx to alive or dead: a killed cell was alive
+            one generation ago for the history
+        """
+        if self._age is not None and (alive or self.engine.is_alive(idx)):
+            self._age.flat[idx] = 0 if alive else 1
+        if alive != self.engine.is_alive(idx):
+            self.engine.set_cell(idx, alive)
+            self._flip_hash([idx])
+            self._cycles.clear()
+            self._cycles.add(self._generation, self._hash.value)
+            self._cycle = None
+
+    def paint(self, ids, alive):
+        """ Set the cells with the given flat ids to alive or dead in one batch, return
+            the ids of the cells that changed; killed cells were alive one generation
+            ago for the history, as with set_cell
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        changed = ids[self.engine.are_alive(ids) != alive]
+        if len(changed) == 0:
+            return changed
+        if self._age is not None:
+            self._age.flat[changed] = 0 if alive else 1
+        self.engine.set_cells_at(changed, alive)
+        self._flip_hash(changed)
+        self._cycles.clear()
+        self._cycles.add(self._generation, self._hash.value)
+        self._cycle = None
+        return changed
+
+    def scroll(self, dx, dy):
+        """ Move the window of an unbounded engine over its universe
+        """
+        self.engine.scroll(dx, dy)
+        self.reset_history()
+        self.rehash()
+
+    def jump_method(self, generations):
+        """ Return how jump computes the generations: 'engine' steps the board, as that
+            many single steps; 'hashlife' evolves an unbounded universe, used for the
+            unbounded engine and for the jumps beyond EXACT_JUMP: on a bounded board the
+            cells that leave it are lost, instead of being clipped at the edges
+        """
+        if self._rule.births_from_nothing:
+            # every empty square changes: the quadtree would not shrink anything
+            return 'engine'
+        if hasattr(self.engine, 'origin') or generations > EXACT_JUMP:
+            return 'hashlife'
+        return 'engine'
+
+    def jump(self, generations, method=None):
+        """ Advance the board by any number of generations, return the ids of the cells
+            that changed. The method ('engine' or 'hashlife') is by default the jump_method
+            of the generations; the B0 rules are always advanced by the engine
+        """
+        if method is None:
+            method = self.jump_method(generations)
+        if method == 'engine' or self._rule.births_from_nothing:
+            old = self.engine.get_state().copy()
+            self.advance(generations)
+            return np.flatnonzero(old != self.engine.get_state())
+        self._keep_in_timeline()
+        self._hashlife.load(map(tuple, self.engine.cells().tolist()))
+        self._hashlife.advance(generations)
+        self._generation += generations
+
+        old = self.engine.get_state().copy()
+        self.engine.clear()
+        self.engine.set_cells(self._hashlife.cells())
+        self.rehash()
+        self._update_age(generations)
+        self._record()
+        return np.flatnonzero(old != self.engine.get_state())
+
+    def clear(self):
+        """ Kill every cell and reset the generation counter
+        """
+        self.stop_recording()
+        self.engine.clear()
+        self._generation = 0
+        self.reset_history()
+        self.rehash()
+        if self._timeline is not None:
+            self._timeline.clear()
+
+    def start_recording(self, path, keyframe_interval=100):
+        """ Record the current generation and all the following ones in the path file,
+            the file is written by a background thread
+        """
+        self.stop_recording()
+        self._recorder = Recorder(path, self.width, self.height, keyframe_interval)
+        self._record()
+
+    def stop_recording(self):
+        """ Finish writing the recording, return its path (None when not recording)
+        """
+        if self._recorder is None:
+            return None
+        recorder, self._recorder = self._recorder, None
+        recorder.close()
+        return recorder.path
+
+    def _record(self):
+        if self._recorder is not None:
+            self._recorder.record(self._generation, self.engine.get_state())
+        if self._timeline is not None:
+            self._timeline.push(self._generation, self.engine.get_state())
+
+    def _keep_in_timeline(self):
+        """ Keep the board before a step in the timeline, when it is not its last generation:
+            the first board, or the board left by a move back in the timeline
+        """
+        if self._timeline is not None and self._timeline.last != self._generation:
+            self._timeline.push(self._generation, self.engine.get_state())
+
+    def rewind(self, generation):
+        """ Move the board back (or forward again) to a generation of the timeline,
+            return the ids of the cells that changed
+            The generations after it are dropped at the next step, a recording is finished
+        """
+        self.stop_recording()
+        state = self._timeline.seek(generation)
+        changed = np.flatnonzero(self.engine.get_state() != state)
+        self.engine.set_state(state)
+        self._generation = generation
+        self.reset_history()
+        self.rehash()
+        return changed
+
+    def replay(self, path, generation):
+        """ Set the board to a generation of a recording, return the recorded generation
+            reached (the last one not after the given generation)
+        """
+        self.stop_recording()
+        player = Player(path)
+        try:
+            state = player.seek(generation)
+            self.engine.clear()
+            self.engine.set_cells(np.argwhere(state))
+            self._generation = player.generation
+        finally:
+            player.close()
+        self.reset_history()
+        self.rehash()
+        return self._generation
+
+    def load(self, path):
+        """ Set alive, in one operation, the cells of a board file of any format (or of
+            the board file in the path folder). Patterns without a position are centered
+            The rule of the file, when it has one, becomes the rule of the board
+        """
+        rule = read_rule(path)
+        cells, positioned = read_board(path)
+        if rule is not None:
+            self.set_rule(rule)
+        self.load_cells(cells, positioned)
+
+    def load_cells(self, cells, positioned=True):
+        """ Set alive, in one operation, the (n, 2) array of (i, j) cells of a pattern,
+            centered when it has no position
+        """
+        if not positioned and len(cells):
+            cells = cells + (np.array([self.width, self.height]) - cells.max(axis=0) - 1) // 2
+        self.engine.set_cells(cells)
+        self._mark_alive()
+        self.rehash()
+
+    def save(self, path):
+        """ Save the alive cells, with their absolute coordinates, in a board file of the
+            format of the path extension (.rle, .cells, .golb or .csv, compressed with .gz),
+            the file is replaced atomically. RLE and plaintext files keep the rule
+        """
+        write_atomic(path, self.engine.cells(), self.height, self._rule.rulestring)
+
+    def snapshot(self):
+        """ Return a copy of the board that can be saved while the evolution goes on:
+            the state array, or the alive cells of an unbounded universe
+        """
+        if hasattr(self.engine, 'origin'):
+            return Snapshot(self._generation, None, self.engine.cells(), self._rule.rulestring)
+        return Snapshot(self._generation, self.engine.get_state().copy(), None, self._rule.rulestring)
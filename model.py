@@ -1,12 +1,55 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
-from Components.Cell import Cell
+from Components.Cell import CellBoard
 from Components.GOL_Board import GOL_Board
-import os, sys, csv
+from Components.Engine import neighbor_table
+from core import GOL_Core, HISTORY_LENGTH, FORMATS, TIMELINE_BYTES, PATTERN_DIR, RULES
+from Components.Recorder import Player
+from Components.Simulation import Simulation
+from Components.Profiler import Profiler
+from Components.Autosave import Autosave
+from Components.BoardFormats import GZIP
+from Components.PatternLibrary import PatternLibrary
+from Components.Brush import Stroke
+import os, time, bisect, threading, collections
 import numpy as np
 
 DIR_NAME = os.path.dirname(os.path.abspath('__file__'))
 
+# File of the boards saved in a folder
+BOARD_NAME = 'board.rle'
+# Board files shown by the file dialogs
+BOARD_FILTER = "Boards (%s);;All files (*)" % ' '.join(['*' + ext for ext in FORMATS] + ['*' + GZIP])
+# Folder of the autosaves: the board of the Save action and the last AUTOSAVE_KEEP
+# periodic ones, written every autosave_every generations
+AUTOSAVE_DIR = DIR_NAME + "/backup-folder/autosave/"
+AUTOSAVE_NAME = 'board.rle.gz'
+AUTOSAVE_ROTATION = 'board-*.rle.gz'
+AUTOSAVE_KEEP = 5
+AUTOSAVE_CHOICES = [0, 100, 1000, 10000]
+# Folder and file dialog filter of the recordings of the board evolution
+RECORDINGS_DIR = DIR_NAME + "/backup-folder/recordings/"
+RECORDING_FILTER = "Recordings (*.golr)"
+# Folder of the JSON lines logs of the profiler
+PROFILES_DIR = DIR_NAME + "/backup-folder/profiles/"
+
+# What the evolution does when the board becomes periodic, and the generations
+# of each tick of a fast forwarded board
+CYCLE_ACTIONS = ['continue', 'pause', 'fast-forward']
+FAST_FORWARD = 100
+
+# Target generations per second of the speed slider: from 1 to MAX_SPEED, on a
+# log scale, with SPEED at start
+MAX_SPEED = 10000
+SPEED = 10
+
+# Milliseconds between two writes of the cells of a mouse stroke, and strokes
+# that can be undone
+STROKE_INTERVAL = 16
+UNDO_LENGTH = 100
+
 class GameOfLife(QtCore.QObject):
+    """ Qt adapter of the GOL_Core board: cells, signals for the view, evolution thread and dialogs
+    """
 
     NameItem = 1
 
@@ -19,15 +62,25 @@ class GameOfLife(QtCore.QObject):
     setCheckedSignal = QtCore.pyqtSignal(bool)
     resetSignal = QtCore.pyqtSignal()
     scaleValueSignal = QtCore.pyqtSignal(float)
-    historyFillSignal = QtCore.pyqtSignal(list)
-
-    def __init__(self):
+    historyFillSignal = QtCore.pyqtSignal(object)
+    updateCellsSignal = QtCore.pyqtSignal(object, object)
+    recordingSignal = QtCore.pyqtSignal(bool)
+    timelineSignal = QtCore.pyqtSignal()
+    cycleSignal = QtCore.pyqtSignal(object, object)
+    rateSignal = QtCore.pyqtSignal(float)
+    profileSignal = QtCore.pyqtSignal(object)
+    savedSignal = QtCore.pyqtSignal(str, object)
+    ruleSignal = QtCore.pyqtSignal(str)
+    undoSignal = QtCore.pyqtSignal(bool)
+    messageSignal = QtCore.pyqtSignal(str)
+
+    def __init__(self, max_window_dim=(800, 600)):
         super().__init__()
 
         """ Model attribute """ 
 
         self._cell_size = 20
-        self._max_window_dim = (800, 600)
+        self._max_window_dim = max_window_dim
         self._max_num_cell_x = int(self.max_window_dim[0]*2/self.cell_size)
         self._max_num_cell_y = int(self.max_window_dim[1]*2/self.cell_size)
 
@@ -36,22 +89,53 @@ class GameOfLife(QtCore.QObject):
 
         self._running = False           # check if the board is evolving
         self._counterItems = 0          # counter for item id  
-        self._boardCell = np.zeros((self.max_window_dim[0]//10)*(self.max_window_dim[1]//10)).tolist()
+        # states and neighbors of the cells in flat arrays, a Cell is a view on them
+        self._boardCell = CellBoard(self.max_num_cell_x, self.max_num_cell_y, self.cell_size)
+        # Qt free board state, evolution, history and timeline of the past generations
+        self._core = GOL_Core(self.max_num_cell_x, self.max_num_cell_y, history=True, timeline_bytes=TIMELINE_BYTES)
 
-        self._speed = 500               # evolution speed of GOL view
+        self._speed = SPEED             # target generations per second of the evolution
         self._zoom_count = 0            # number of zoom on the board
 
         self._history_running = False   # check if the history evolution is checked
+        self._history_shown = False     # check if the view is showing history cells
         self._last_pattern = 'Empty'    # set the default GOL pattern
-
-        # Timer for board evolution 
-        self.timer = QtCore.QTimer()
-        self.timer.setInterval(self.speed)
-        self.timer.timeout.connect(lambda : self.boardEvolution())
+        # Preset patterns, indexed on disk and read in the background
+        self._library = PatternLibrary(PATTERN_DIR)
+        self._library.preload()
+        self._cycle_action = 'continue' # what to do when the board becomes periodic
+        self._cycle = None              # last cycle sent to the view
+
+        # Timing of the phases of every tick, disabled until the view asks for it
+        self._profiler = Profiler()
+        self._profile_overlay = False   # check if the view shows the profiler statistics
+        self._scene.profiler = self._profiler
+
+        # Thread that writes the saved boards
+        self._autosave = Autosave(lambda path, error : self.savedSignal.emit(path, error), AUTOSAVE_KEEP)
+        self._autosave_every = 0        # generations between two periodic autosaves, 0 for none
+        self._last_autosave = 0         # generation of the last periodic autosave
+
+        # Mouse strokes: their cells are written in one batch per frame, the finished
+        # strokes can be undone
+        self._stroke = None
+        self._brush_size = 1
+        self._undo = collections.deque(maxlen=UNDO_LENGTH)
+        self._strokeTimer = QtCore.QTimer()
+        self._strokeTimer.setInterval(STROKE_INTERVAL)
+        self._strokeTimer.timeout.connect(self.apply_stroke)
+
+        # Thread of the board evolution, the core is changed only holding the lock
+        self._lock = threading.RLock()
+        self._simulation = Simulation(self.core, self._lock, self.evolve, profiler=self._profiler)
+        self._simulation.target = self.speed
+        self._simulation.stop_on_cycle = self.cycle_action == 'pause'
+        self._simulation.frameReady.connect(self.show_frame)
 
         """ Model Signal """
-        self.scene.aliveCellSignal.connect(self.fill_cell)
-        self.scene.deadCellSignal.connect(self.clear_cell)
+        self.scene.strokeStartSignal.connect(self.start_stroke)
+        self.scene.strokeMoveSignal.connect(self.extend_stroke)
+        self.scene.strokeEndSignal.connect(self.end_stroke)
         self.finishUpdate.connect(self.update_state)
         self.resetSignal.connect(self.play_stop_evolution)
 
@@ -60,6 +144,10 @@ class GameOfLife(QtCore.QObject):
     def cell_size(self):
         return self._cell_size
 
+    @property
+    def library(self):
+        return self._library
+
     @property
     def max_window_dim(self):
         return self._max_window_dim
@@ -92,6 +180,14 @@ class GameOfLife(QtCore.QObject):
     def boardCell(self):
         return self._boardCell
     
+    @property
+    def core(self):
+        return self._core
+
+    @property
+    def engine(self):
+        return self._core.engine
+
     @property
     def scene(self):
         return self._scene
@@ -112,10 +208,47 @@ class GameOfLife(QtCore.QObject):
     def last_pattern(self):
         return self._last_pattern
 
+    @property
+    def cycle_action(self):
+        return self._cycle_action
+
+    @property
+    def simulation(self):
+        return self._simulation
+
+    @property
+    def turbo(self):
+        return self._simulation.turbo
+
+    @property
+    def profiler(self):
+        return self._profiler
+
+    @property
+    def autosave(self):
+        return self._autosave
+
+    @property
+    def rule(self):
+        return self.core.rule.rulestring
+
+    @property
+    def autosave_every(self):
+        return self._autosave_every
+
+    @property
+    def brush_size(self):
+        return self._brush_size
+
+    @property
+    def can_undo(self):
+        return len(self._undo) > 0
+
     # Setter methods for model attributes
     @speed.setter
     def speed(self, slot):
         self._speed = slot
+        self._simulation.target = slot
     
     @zoom_count.setter
     def zoom_count(self, slot):
@@ -129,13 +262,10 @@ class GameOfLife(QtCore.QObject):
     def counterItems(self, slot):
         self._counterItems = slot
 
-    @boardCell.setter
-    def boardCell(self, slot):
-        self._boardCell[slot[0]] = Cell(slot[1]*self.cell_size, slot[2]*self.cell_size)
-
     @history_running.setter
     def history_running(self, slot):
         self._history_running = slot
+        self._simulation.history_length = HISTORY_LENGTH if slot else None
 
     @hist_view.setter
     def hist_view(self, slot):
@@ -145,6 +275,43 @@ class GameOfLife(QtCore.QObject):
     def last_pattern(self, slot):
         self._last_pattern = slot
 
+    @cycle_action.setter
+    def cycle_action(self, slot):
+        if slot not in CYCLE_ACTIONS:
+            raise ValueError("unknown cycle action %r" % slot)
+        self._cycle_action = slot
+        self._simulation.stop_on_cycle = slot == 'pause'
+
+    @turbo.setter
+    def turbo(self, slot):
+        self._simulation.turbo = slot
+
+    @autosave_every.setter
+    def autosave_every(self, slot):
+        self._autosave_every = slot
+        self._last_autosave = self.core.generation
+
+    @brush_size.setter
+    def brush_size(self, slot):
+        self._brush_size = slot
+
+
+    # Engine methods
+    def set_engine(self, name):
+        """ Select the engine (a key of ENGINES) that computes the board evolution,
+            the current board state is moved to the new engine
+        """
+        with self._lock:
+            self.core.set_engine(name)
+
+    def set_rule(self, rule):
+        """ Evolve the board with the rule of a B/S rulestring (or a name of RULES),
+            raise ValueError when the rule is not valid or the engine cannot run it
+        """
+        with self._lock:
+            self.core.set_rule(rule)
+        self.ruleSignal.emit(self.rule)
+
 
     # Init methods
     def init_board(self):
@@ -158,74 +325,185 @@ class GameOfLife(QtCore.QObject):
         """ Create the Game of Life grid 
         """ 
         self.counterItems = 0
+        self.boardCell.clear()
         for i in range(self.max_num_cell_x):
             for j in range(self.max_num_cell_y):
                 self.drawItemAtSingal.emit([self.counterItems,i,j])
-                self.boardCell = [self.counterItems, i, j]
                 self.counterItems = self.counterItems + 1
         self.computeBoardNeighborhood()
 
 
     # Methods for cell neighborhood computation
     def computeBoardNeighborhood(self):
-        [self.computeCellNeighborhood(self.scene.items()[i]) for i in range(len(self.scene.items()))]
-
-    def computeCellNeighborhood(self, rect):
-        """ Compute the cell neighborhood for a cell. That will be computed
-            the first time that the cell is set to Alive. 
-        """
-        delta = int(self.scene.height()/self.cell_size)
-        idx = self.get_rectId(rect)
-        for x in range(-1,2):
-            # col needs to check if the next (or previous) neighbor is on the same board column of idx
-            # if yes the entire row will be not included in idx neighborhood
-            col = idx // delta
-            if (idx+x)//delta == col:
-                # upper neighbors
-                if idx-delta+x >= 0:
-                    self.boardCell[idx].setNeighbor(self.boardCell[idx-delta+x])
-                # aside neighbors
-                if x != 0 and idx+x < len(self.boardCell):
-                    self.boardCell[idx].setNeighbor(self.boardCell[idx+x])
-                # lower neighbors
-                if idx+delta+x < len(self.boardCell): 
-                    self.boardCell[idx].setNeighbor(self.boardCell[idx+delta+x])
+        """ Set the neighbors of every cell from the precomputed neighbor index table
+        """
+        self.boardCell.set_neighbors(neighbor_table(self.max_num_cell_x, self.max_num_cell_y))
 
 
     # Game Of Life engine methods
     def update_state(self):
-        """ Change view in order to the updated cell state
+        """ Move every cell to its next state and send to the view, in one batch,
+            the ids of the cells that were born or died
         """
-        for cell in self.boardCell:
-            if cell._nextState.isAlive():
-                self.fill_cell([cell._posx, cell._posy])
-            else:
-                self.clear_cell([cell._posx, cell._posy])
+        born, dead = self.boardCell.advance()
+        born, dead = born.tolist(), dead.tolist()
+        self.profiler.count('cells', len(born) + len(dead))
+        self.profiler.count('signals')
+        self.updateCellsSignal.emit(born, dead)
 
     def boardEvolution(self):
-        """ For each cell on the GOL grid is computed its evolution based on the rules game
-            If history_running is True, the last 5 states for each board cell are shown
+        """ The engine computes the evolution of the whole GOL grid based on the rules game,
+            then only the cells that changed state get their next state
+            If history_running is True, the cells alive in the last generations are shown
             If history_running is False, the app will clear all the histrory cells
+            This is the single step of the Next action, a playing board evolves in the simulation thread
         """
-        for i in range(len(self.boardCell)):
-            self.boardCell[i].computeNextState()
-        self.finishUpdate.emit()
-        # show the history after the computation of new states
-        if self.history_running:
-            self.history()
-        elif not self.history_running:
+        self.end_tick()
+        with self.profiler.phase('evolve'), self._lock:
+            changed = self.evolve()
+            cycle = self.core.cycle
+        self.set_next_states(changed)
+        self.show_evolution()
+        self.check_cycle(cycle)
+
+    def evolve(self):
+        """ Compute the next generation of the core, return the ids of the cells that changed
+            A periodic board is fast forwarded, without computing it, if cycle_action says so
+        """
+        if self.cycle_action == 'fast-forward' and self.core.cycle is not None:
+            return self.core.fast_forward(FAST_FORWARD)
+        return self.core.step()
+
+    def show_frame(self):
+        """ Show the latest frame of the evolution thread: the cells that changed since
+            the frame shown before, the history, the timeline, the achieved speed and the cycle
+            The frames computed while the view was busy are skipped
+        """
+        frame = self.simulation.take_frame()
+        if frame is None:
+            return
+        self.end_tick()
+        profiler = self.profiler
+        profiler.add('latency', time.perf_counter() - frame.time)
+        with profiler.phase('update_state'):
+            self.sync_cells(frame.state)
+        with profiler.phase('timeline'):
+            profiler.count('signals')
+            self.timelineSignal.emit()
+        with profiler.phase('history'):
+            if self.history_running and frame.decay is not None:
+                self._history_shown = True
+                profiler.count('signals')
+                self.historyFillSignal.emit(frame.decay)
+            else:
+                self.clear_hist_board()
+        profiler.count('signals')
+        self.rateSignal.emit(frame.rate)
+        self.check_cycle(frame.cycle)
+        self.check_autosave(frame.generation)
+
+    def end_tick(self):
+        """ Close the tick of the profiler and send its statistics to the view, when
+            they are due
+        """
+        stats = self.profiler.end_tick()
+        if stats is not None:
+            stats['dropped_total'] = self.simulation.dropped
+            self.profileSignal.emit(stats)
+
+    def check_cycle(self, cycle):
+        """ Tell the view when the board becomes periodic, with its period and the
+            generation where the cycle starts, and pause the evolution if cycle_action says so
+        """
+        if cycle == self._cycle:
+            return
+        self._cycle = cycle
+        if cycle is not None:
+            self.profiler.count('signals')
+            self.cycleSignal.emit(*cycle)
+            if self.cycle_action == 'pause':
+                self.pause_evolution()
+
+    def jump(self, generations):
+        """ Advance the GOL grid by any number of generations, by the engine or by HashLife
+            (see GOL_Core.jump_method): HashLife evolves an unbounded universe, the cells
+            that leave a bounded grid are lost
+        """
+        with self._lock:
+            changed = self.core.jump(generations)
+        self.set_next_states(changed)
+        self.show_evolution()
+
+    def sync_cells(self, state=None):
+        """ Fill or clear, in one batch, the cells whose state differs from the given
+            (width, height) state, by default the engine one
+        """
+        if state is None:
+            with self._lock:
+                state = self.engine.get_state().copy()
+        state = state.ravel() != 0
+        current = self.boardCell.state != 0
+        born, dead = np.flatnonzero(state & ~current), np.flatnonzero(current & ~state)
+        self.boardCell.set_cells(born, 1)
+        self.boardCell.set_cells(dead, 0)
+        born, dead = born.tolist(), dead.tolist()
+        self.profiler.count('cells', len(born) + len(dead))
+        self.profiler.count('signals')
+        self.updateCellsSignal.emit(born, dead)
+
+    def scroll_board(self, dx, dy):
+        """ Move the grid over the unbounded universe by (dx, dy) cells
+        """
+        if hasattr(self.engine, 'scroll'):
+            # the strokes to undo are kept as ids of the board, not of the universe
+            self.end_stroke()
+            self._undo.clear()
+            self.undoSignal.emit(False)
+            with self._lock:
+                self.core.scroll(dx, dy)
+            self.sync_cells()
             self.clear_hist_board()
+
+    def set_next_states(self, changed):
+        """ Set the next state of the cells (list of ids) that changed in the engine
+        """
+        self.boardCell.toggle_next(changed)
+
+    def show_evolution(self):
+        """ Update the view with the new cells state, the history and the timeline
+        """
+        with self.profiler.phase('update_state'):
+            self.finishUpdate.emit()
+        with self.profiler.phase('timeline'):
+            self.timelineSignal.emit()
+        self.profiler.count('signals', 2)
+        # show the history after the computation of new states
+        with self.profiler.phase('history'):
+            if self.history_running:
+                self.history()
+            elif not self.history_running:
+                self.clear_hist_board()
+        self.check_autosave(self.core.generation)
         
     def stop_evolution(self):
-        """ Stop the timer of GOL loop 
+        """ Stop the thread of the board evolution and show the last generation it computed
         """
-        self.timer.stop()
+        self.simulation.stop()
+        self.sync_cells()
+
+    def pause_evolution(self):
+        """ Stop the board evolution and uncheck the play button
+        """
+        if self.running:
+            self.stop_evolution()
+            self.running = False
+            self.setCheckedSignal.emit(False)
 
     def play_evolution(self):
-        """ Start the timer of GOL loop
+        """ Start the thread of the board evolution
         """
         if self.running:
-            self.timer.start()
+            self.simulation.start()
             self.show_hist()
 
     def play_stop_evolution(self):
@@ -253,23 +531,34 @@ class GameOfLife(QtCore.QObject):
         return idx
 
     def get_rect(self, x, y):
-        """ Return the item at the position (x,y) of the GOL board 
+        """ Return the item at the position (x,y) of the GOL board (None when the
+            board is painted as one image), its id and its state
         """
-        rect = self.scene.itemAt(x, y, QtGui.QTransform())
-        idx = self.get_rectId(rect)
+        idx = self.get_cellId(x, y)
+        rect = self.scene.cell_item(idx)
         currentState = self.boardCell[idx].isAlive()
         return rect, idx, currentState
 
 
+    def get_cellId(self, x, y):
+        """ Return the id of the cell at the position (x,y) of the GOL board
+        """
+        i, j = int(x // self.cell_size), int(y // self.cell_size)
+        if not (0 <= i < self.max_num_cell_x and 0 <= j < self.max_num_cell_y):
+            raise IndexError("position outside the GOL board")
+        return i*self.max_num_cell_y + j
+
+
     #  Methods for cell state management
     def fill_cell(self, pos):
         """ Fill the cell at current position (pos list of coordinates)
         """
         try:
-            cell, idx, currentState = self.get_rect(pos[0], pos[1])
-            self.boardCell[idx]._historical = False
+            idx = self.get_cellId(pos[0], pos[1])
             self.boardCell[idx].setToAlive()
-            self.fillCellSignal.emit(cell)
+            with self._lock:
+                self.core.set_cell(idx, True)
+            self.updateCellsSignal.emit([idx], [])
         except Exception as e:
             pass
         
@@ -277,32 +566,113 @@ class GameOfLife(QtCore.QObject):
         """ Kill the cell at current position (pos list of coordinates)
         """
         try:
-            cell, idx, currentState = self.get_rect(pos[0], pos[1])
-            self.boardCell[idx]._historical = False
+            idx = self.get_cellId(pos[0], pos[1])
             self.boardCell[idx].setToDead()
-            self.clearCellSignal.emit(cell)
+            with self._lock:
+                self.core.set_cell(idx, False)
+            self.updateCellsSignal.emit([], [idx])
         except Exception:
             pass
         
+    # Mouse stroke methods
+    def start_stroke(self, pos, alive):
+        """ Start a stroke at the position (pos list of coordinates), filling or
+            clearing cells with the brush; the first cell is written at once
+        """
+        self.end_stroke()
+        self._stroke = Stroke(self.max_num_cell_x, self.max_num_cell_y, alive, self.brush_size)
+        self.extend_stroke(pos)
+        self.apply_stroke()
+        self._strokeTimer.start()
+
+    def extend_stroke(self, pos):
+        """ Add to the stroke the line to the position (pos list of coordinates)
+        """
+        if self._stroke is not None:
+            self._stroke.add(int(pos[0] // self.cell_size), int(pos[1] // self.cell_size))
+
+    def apply_stroke(self):
+        """ Write in one batch the cells added to the stroke since the last frame
+        """
+        stroke = self._stroke
+        if stroke is None:
+            return
+        ids = stroke.take()
+        if len(ids) == 0:
+            return
+        with self._lock:
+            changed = self.core.paint(ids, stroke.alive)
+        stroke.applied(changed)
+        self.show_painted(changed, stroke.alive)
+
+    def end_stroke(self):
+        """ Write the last cells of the stroke and keep it to be undone
+        """
+        stroke = self._stroke
+        if stroke is None:
+            return
+        self._strokeTimer.stop()
+        self.apply_stroke()
+        self._stroke = None
+        changed = stroke.changed
+        if len(changed):
+            self._undo.append((changed, stroke.alive))
+            self.undoSignal.emit(True)
+
+    def undo_stroke(self):
+        """ Give back to the cells changed by the last stroke their state before it
+        """
+        self.end_stroke()
+        if not self._undo:
+            return
+        changed, alive = self._undo.pop()
+        with self._lock:
+            restored = self.core.paint(changed, not alive)
+        self.show_painted(restored, not alive)
+        self.undoSignal.emit(self.can_undo)
+
+    def show_painted(self, changed, alive):
+        """ Fill or clear the cells (array of ids) painted in the core
+        """
+        self.boardCell.set_cells(changed, alive)
+        changed = changed.tolist()
+        self.profiler.count('cells', len(changed))
+        self.profiler.count('signals')
+        if alive:
+            self.updateCellsSignal.emit(changed, [])
+        else:
+            self.updateCellsSignal.emit([], changed)
+
     def clear_board(self):
-        """ Clear the GOL grid
+        """ Clear the GOL grid, a recording of the evolution is finished, the strokes
+            drawn cannot be undone anymore
         """
         self.resetSignal.emit()
-        for i, cell in enumerate(self.boardCell):
-            if cell.isAlive():
-                self.clear_cell([cell._posx, cell._posy])
+        self.end_stroke()
+        self._undo.clear()
+        self.undoSignal.emit(False)
+        if self.core.recorder is not None:
+            self.record_board(False)
+        dead = np.flatnonzero(self.boardCell.state).tolist()
+        self.boardCell.clear()
+        # the unbounded universe has alive cells outside the grid too
+        with self._lock:
+            self.core.clear()
+        self.updateCellsSignal.emit([], dead)
         self.clear_hist_board(resetting=True)
+        self.timelineSignal.emit()
 
     def clear_hist_board(self, resetting=False):
         """ Clear all filled cell of history
-            The cell last 5 states are resetted only when the user clear the board (clear button)
+            The cell past states are resetted only when the user clear the board (clear button)
         """
-        for cell in self.boardCell:
-            if resetting:
-                cell._lastStates = []
-            if cell._historical and not cell.isAlive():
-                rect, _, _ = self.get_rect(cell._posx, cell._posy)
-                self.clearCellSignal.emit(rect)
+        if resetting:
+            with self._lock:
+                self.core.reset_history()
+        if self._history_shown:
+            self._history_shown = False
+            self.profiler.count('signals')
+            self.historyFillSignal.emit(np.zeros(len(self.boardCell), dtype=np.uint8))
     
 
     # Zoom buttons methods
@@ -332,32 +702,54 @@ class GameOfLife(QtCore.QObject):
         try:
             options = QtWidgets.QFileDialog.Options()
             options |= QtWidgets.QFileDialog.DontUseNativeDialog
-            path = QtWidgets.QFileDialog.getSaveFileName(caption="Choose save folder", directory=DIR_NAME, options=options)
-            if path != '':
+            path = QtWidgets.QFileDialog.getSaveFileName(caption="Choose save folder or board file", directory=DIR_NAME,
+                                                         filter=BOARD_FILTER, options=options)
+            if path[0] != '':
                 self.save_csv(str(path[0]))
         except Exception:
             pass
 
     def save_board(self):
-        """ Autosave method for backup saving
+        """ Autosave method for backup saving, in a compressed board file
         """
-        savepath = DIR_NAME + "/backup-folder/autosave/"
-        self.save_csv(savepath)
+        self.save_csv(AUTOSAVE_DIR + AUTOSAVE_NAME)
 
     def save_csv(self, savepath):
-        """ Save the current state of the board in img
+        """ Save the current state of the board in the savepath folder, or in the savepath
+            file when it has the extension of a board format (.rle, .cells, .golb or .csv,
+            compressed with .gz)
+            The evolution goes on: the board is copied and written by the autosave thread,
+            savedSignal tells when the file is written
         """
-        if not os.path.exists(savepath):
-            os.makedirs(savepath)
-        if self.running:
-            self.play_stop_evolution()
-        savepath = savepath + '/board.csv'
-
-        with open(savepath, 'w') as csvfile:
-                filewriter = csv.writer(csvfile)
-                for rect in self.scene.items():
-                    if self.boardCell[self.get_rectId(rect)]._state.isAlive():
-                        filewriter.writerow(rect.data(self.NameItem))
+        if not savepath.lower().endswith(GZIP) and os.path.splitext(savepath)[1].lower() not in FORMATS:
+            savepath = os.path.join(savepath, BOARD_NAME)
+        with self._lock:
+            snapshot = self.core.snapshot()
+        self.autosave.save(savepath, snapshot, self.core.height)
+
+    def check_autosave(self, generation):
+        """ Save the board in a new file of the autosave folder when autosave_every
+            generations passed since the last one, only the last AUTOSAVE_KEEP are kept
+        """
+        if not self.autosave_every:
+            return
+        if generation < self._last_autosave:
+            # the board was cleared or moved back in the timeline
+            self._last_autosave = generation
+        elif generation - self._last_autosave >= self.autosave_every:
+            self._last_autosave = generation
+            with self._lock:
+                snapshot = self.core.snapshot()
+            # the evolution thread may be some generations after the frame
+            name = time.strftime("board-%Y%m%d-%H%M%S") + "-g%010d.rle.gz" % snapshot.generation
+            self.autosave.save(AUTOSAVE_DIR + name, snapshot, self.core.height, AUTOSAVE_ROTATION)
+
+    def close(self):
+        """ Stop the evolution and write the boards still queued
+        """
+        self.simulation.stop()
+        self.autosave.close()
+        self.profiler.close_log()
     
 
     # Loading Grid methods
@@ -378,79 +770,171 @@ class GameOfLife(QtCore.QObject):
             self.clear_board()
             options = QtWidgets.QFileDialog.Options()
             options |= QtWidgets.QFileDialog.DontUseNativeDialog
-            file_path = QtWidgets.QFileDialog.getOpenFileName(caption="Choose csv file to load", directory=DIR_NAME, options=options)
+            file_path = QtWidgets.QFileDialog.getOpenFileName(caption="Choose board file to load", directory=DIR_NAME,
+                                                              filter=BOARD_FILTER, options=options)
             if file_path != '':
                 self.read_csv(file_path[0])
         except Exception:
             pass
     
     def read_csv(self, file):
-        """ Utility function from read alive cell to draw
+        """ Utility function from read alive cell to draw, the whole board file (of any
+            format) is set in the engine at once; a file whose rule the engine cannot
+            run is not loaded, the board keeps its rule
+        """
+        try:
+            with self._lock:
+                self.core.load(file)
+        except ValueError as e:
+            self.messageSignal.emit("Cannot load %s: %s" % (file, e))
+            return
+        self.sync_cells()
+        self.ruleSignal.emit(self.rule)
+
+
+    # Timeline methods
+    def timeline_position(self):
+        """ Return the position of the current generation in the timeline and the
+            number of generations it keeps
+        """
+        with self._lock:
+            generations = self.core.timeline.generations
+            return bisect.bisect_left(generations, self.core.generation), len(generations)
+
+    def scrub(self, position):
+        """ Stop the evolution and move the board to the generation at the given
+            position of the timeline, without computing it again
+        """
+        self.pause_evolution()
+        if self.core.recorder is not None:
+            self.record_board(False)
+        with self._lock:
+            changed = self.core.rewind(self.core.timeline.generations[position])
+        self.set_next_states(changed)
+        self.show_evolution()
+
+    def previous_generation(self):
+        """ Move the board back to the previous generation of the timeline
         """
-        if not os.path.isfile(file):
-            file = file + '/board.csv'
-        with open(file, 'r') as csvfile:
-            for line in csvfile.readlines():
-                line = line.replace('\n', '').split(',')
-                self.fill_cell( [self.boardCell[int(line[0])]._posx, self.boardCell[int(line[0])]._posy] )
+        position, count = self.timeline_position()
+        if 0 < position <= count:
+            self.scrub(position - 1)
+
+
+    # Recording methods
+    def record_board(self, recording):
+        """ Start or stop recording every generation in a new file of the recordings folder
+        """
+        if recording:
+            if not os.path.exists(RECORDINGS_DIR):
+                os.makedirs(RECORDINGS_DIR)
+            with self._lock:
+                self.core.start_recording(RECORDINGS_DIR + time.strftime("run-%Y%m%d-%H%M%S.golr"))
+        else:
+            with self._lock:
+                self.core.stop_recording()
+        self.recordingSignal.emit(recording)
+
+    def open_recording(self):
+        """ Load on the board a generation, chosen by the user, of a recording
+        """
+        try:
+            options = QtWidgets.QFileDialog.Options()
+            options |= QtWidgets.QFileDialog.DontUseNativeDialog
+            file_path = QtWidgets.QFileDialog.getOpenFileName(caption="Choose recording to replay", directory=DIR_NAME,
+                                                              filter=RECORDING_FILTER, options=options)
+            if file_path[0] == '':
+                return
+            player = Player(file_path[0])
+            first, last = player.generations[0], player.generations[-1]
+            player.close()
+            generation, ok = QtWidgets.QInputDialog.getInt(None, "Replay recording",
+                                                           "Generation (%d - %d)" % (first, last), last, first, last)
+            if ok:
+                self.clear_board()
+                with self._lock:
+                    self.core.replay(file_path[0], generation)
+                self.sync_cells()
+        except Exception:
+            pass
 
 
     #  Speed Slider methords
     def change_speed(self, value): 
-        """ Change cell evolution speed [ms]
+        """ Change the target generations per second of the evolution from the speed
+            slider value (0 - 100): 1 to MAX_SPEED on a log scale
+        """
+        self.speed = round(MAX_SPEED ** (value / 100), 1)
+
+
+    # Profiler methods
+    def profile_overlay(self, shown):
+        """ Time the ticks while the view shows the profiler statistics
+        """
+        self._profile_overlay = shown
+        self.profiler.enabled = shown or self.profiler.log_path is not None
+
+    def log_profile(self, logging):
+        """ Start or stop writing every tick of the profiler in a JSON lines file of
+            the profiles folder, return the file
         """
-        self.speed = (2002 - value)
-        if self.speed <= 0:
-            self.speed = 2
-        self.timer.setInterval(self.speed)
+        path = None
+        if logging:
+            if not os.path.exists(PROFILES_DIR):
+                os.makedirs(PROFILES_DIR)
+            path = PROFILES_DIR + time.strftime("profile-%Y%m%d-%H%M%S.jsonl")
+            self.profiler.open_log(path)
+        else:
+            self.profiler.close_log()
+        self.profiler.enabled = logging or self._profile_overlay
+        return path
 
 
     # History methods
     def show_hist(self):
-        """ Show history while the timer is running or clear the history board
+        """ Show history while the evolution is running or clear the history board
         """ 
-        if self.history_running and self.timer.isActive():
+        if self.history_running and self.simulation.isRunning():
             self.history()
         elif not self.history_running:
             self.clear_hist_board()
     
     def history(self):
-        """Show the last 5 alive states before the present one
+        """Show the alive states of the last HISTORY_LENGTH generations before the present one
+            Dead cells are colored by their most recent alive state: the view gets, in one
+            batch, the decay of every cell (0 for the cells with no alive state in their history)
         """
-        for cell in self.boardCell:
-            rect,_,currentState = self.get_rect(cell._posx, cell._posy)
-            for i,ls in enumerate(cell._lastStates):
-                 if ls.isAlive() and not currentState:
-                    cell._historical = True
-                    decay = len(cell._lastStates) - i
-                    self.historyFillSignal.emit([rect,decay])
+        self._history_shown = True
+        with self._lock:
+            decay = self.core.history(HISTORY_LENGTH)
+        self.profiler.count('signals')
+        self.historyFillSignal.emit(decay)
 
 
     # Grid pattern methods
     def set_pattern(self, pattern=None, text=None):
         """ Set the pattern selected by the user 
         """
+        name = pattern or text
+        rule = self.library.info(name)['rule'] if name in self.library else None
+        if rule is not None:
+            # set before clearing: a rule the engine cannot run keeps the board and its rule
+            try:
+                self.set_rule(rule)
+            except ValueError as e:
+                self.messageSignal.emit("Cannot load %s: %s" % (name, e))
+                return
         self.clear_board()
-        if pattern == 'Empty' or text == 'Empty':
+        if name == 'Empty':
             self.last_pattern = 'Empty'
-        elif pattern == 'Random' or text == 'Random':
+        elif name == 'Random':
             self.last_pattern = 'Random'
             self.random_board()
-        elif pattern == 'Die Hard' or text == 'Die Hard':
-            self.last_pattern = 'Die Hard'
-            self.read_csv(DIR_NAME+'/backup-folder/pattern/Die Hard')
-        elif pattern == 'R Pentomino' or text == 'R Pentomino':
-            self.last_pattern = 'R Pentomino'
-            self.read_csv(DIR_NAME+'/backup-folder/pattern/R-Pentomino')
-        elif pattern == 'Block-laying Switch Engine' or text == 'Block-laying Switch Engine':
-            self.last_pattern = 'Block-laying Switch Engine'
-            self.read_csv(DIR_NAME+'/backup-folder/pattern/Block-laying Switch Engine')
-        elif pattern == 'Block-laying Switch Engine v2' or text == 'Block-laying Switch Engine v2':
-            self.last_pattern = 'Block-laying Switch Engine v2'
-            self.read_csv(DIR_NAME+'/backup-folder/pattern/Block-laying Switch Engine v2')
-        elif pattern == 'Gosper Gilder Gun' or text == 'Gosper Gilder Gun':
-            self.last_pattern = 'Gosper Gilder Gun'
-            self.read_csv(DIR_NAME+'/backup-folder/pattern/Gosper Gilder Gun')
+        elif name in self.library:
+            self.last_pattern = self.library.find(name)
+            with self._lock:
+                self.core.load_cells(*self.library.pattern(name))
+            self.sync_cells()
         else:
             self.load_board_from_file()
 
@@ -461,4 +945,4 @@ class GameOfLife(QtCore.QObject):
         for cell in self.boardCell:
             # 0.7 because we don't want to fill to much cells (empirical value)
             if np.random.random() > 0.7:
-                self.fill_cell([cell._posx, cell._posy])
\ No newline at end of file
+                self.fill_cell([cell.posx, cell.posy])
\ No newline at end of file
@@ -0,0 +1,170 @@
+""" Search random soups and count the objects they leave
+
+    $ python soup.py --seed 42 --soups 10000 --workers 4
+
+    Every soup is a square of random cells in the centre of a larger box,
+    evolved until its population becomes periodic. The remains are split into
+    separate objects and classified (still lifes, oscillators, spaceships) in a
+    census; the objects that fly towards the border of the box, like gliders,
+    are classified and removed as soon as they reach it.
+    Soup k of a search is generated from the seed (seed, k), so a search is
+    reproducible; the progress is saved in the state file after each chunk of
+    soups, and a search started again with the same state file resumes from it.
+"""
+import os, sys, time, json, argparse
+import multiprocessing
+import numpy as np
+
+from Components.Engine import NumpyEngine
+from Components.Census import census, split_objects, classify, object_name
+
+# Soups computed by a worker task, the unit of the saved progress
+CHUNK = 50
+# Longest period of the population looked for and number of periods that must repeat
+MAX_PERIOD = 30
+REPEATS = 4
+# Side of the box of the soups and width of its border where the escaping objects are removed
+BOX = 256
+MARGIN = 16
+
+
+def stabilised(populations, max_period=MAX_PERIOD, repeats=REPEATS):
+    """ Check whether the last populations repeat with a period up to max_period
+    """
+    window = populations[-max_period*repeats:]
+    if len(window) < max_period*repeats:
+        return False
+    return any(window[p:] == window[:-p] for p in range(1, max_period + 1))
+
+
+def remove_escaping(engine, escaped):
+    """ Remove from the engine the objects that reached the border of the box,
+        counting them in the escaped census, return the number of removed cells
+    """
+    state = engine.get_state()
+    border = state.copy()
+    border[MARGIN:-MARGIN, MARGIN:-MARGIN] = 0
+    if not border.any():
+        return 0
+    removed = 0
+    state = state.copy()
+    for obj in split_objects(engine.cells()):
+        obj = np.array(obj)
+        if border[obj[:, 0], obj[:, 1]].any():
+            name = object_name(*classify(obj))
+            escaped[name] = escaped.get(name, 0) + 1
+            state[obj[:, 0], obj[:, 1]] = 0
+            removed += len(obj)
+    engine.set_state(state)
+    return removed
+
+
+def run_soup(seed, size=16, density=0.5, max_generations=10000):
+    """ Evolve the soup of the given seed until it stabilises, return its alive
+        cells, the census of the objects that escaped and the number of generations
+    """
+    rng = np.random.default_rng(seed)
+    engine = NumpyEngine(BOX, BOX)
+    corner = (BOX - size) // 2
+    engine.set_cells(np.argwhere(rng.random((size, size)) < density) + corner)
+    populations = []
+    escaped = {}
+    for generation in range(1, max_generations + 1):
+        engine.step()
+        populations.append(engine.population())
+        if generation % MAX_PERIOD == 0:
+            removed = remove_escaping(engine, escaped)
+            if removed:
+                # the population of the box without the removed objects
+                populations = [p - removed for p in populations]
+            if stabilised(populations):
+                break
+    return engine.cells(), escaped, generation
+
+
+def search_chunk(task):
+    """ Worker task: census of the soups of one chunk
+    """
+    seed, chunk, size, density = task
+    start = time.perf_counter()
+    counts = {}
+    for k in range(chunk*CHUNK, (chunk + 1)*CHUNK):
+        cells, escaped, _ = run_soup([seed, k], size, density)
+        for objects in (census(cells), escaped):
+            for name, n in objects.items():
+                counts[name] = counts.get(name, 0) + n
+    return chunk, counts, time.perf_counter() - start
+
+
+def load_state(path, params):
+    """ Read the progress of a search with the same parameters, or start a new one
+    """
+    if path and os.path.exists(path):
+        with open(path) as f:
+            state = json.load(f)
+        if state['params'] != params:
+            raise ValueError("%s belongs to a search with different parameters: %s" % (path, state['params']))
+        return state
+    return {'params': params, 'done': [], 'census': {}, 'cpu_seconds': 0.0}
+
+
+def save_state(path, state):
+    """ Write the progress atomically: a search interrupted while saving can still resume
+    """
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def search(seed, soups, workers=None, size=16, density=0.5, state_path=None, verbose=True):
+    """ Run the census of the soups with a pool of worker processes, return the state
+    """
+    workers = workers or multiprocessing.cpu_count()
+    params = {'seed': seed, 'size': size, 'density': density, 'chunk': CHUNK}
+    state = load_state(state_path, params)
+    chunks = -(-soups // CHUNK)
+    todo = [c for c in range(chunks) if c not in set(state['done'])]
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        tasks = [(seed, c, size, density) for c in todo]
+        for chunk, counts, seconds in pool.imap_unordered(search_chunk, tasks):
+            for name, n in counts.items():
+                state['census'][name] = state['census'].get(name, 0) + n
+            state['done'].append(chunk)
+            state['cpu_seconds'] += seconds
+            if state_path:
+                save_state(state_path, state)
+            if verbose:
+                print("chunk %d done: %d/%d soups" % (chunk, len(state['done'])*CHUNK, chunks*CHUNK))
+    elapsed = time.perf_counter() - start
+
+    computed = len(todo)*CHUNK
+    state['report'] = {'soups': len(state['done'])*CHUNK, 'workers': workers, 'seconds': elapsed,
+                       'soups_per_second': computed/elapsed if elapsed > 0 else 0.0,
+                       'soups_per_second_per_core': computed/elapsed/workers if elapsed > 0 else 0.0}
+    return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search random soups and count the objects they leave")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the search")
+    parser.add_argument('--soups', type=int, default=1000, help="number of soups (rounded up to chunks of %d)" % CHUNK)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--size', type=int, default=16, help="side of the soup square")
+    parser.add_argument('--density', type=float, default=0.5, help="probability of an alive cell in the soup")
+    parser.add_argument('--state', default='soup_census.json', help="file with the progress of the search")
+    args = parser.parse_args(argv)
+
+    state = search(args.seed, args.soups, args.workers, args.size, args.density, args.state)
+    report = state['report']
+    print("\n%-32s %10s" % ('object', 'count'))
+    for name, n in sorted(state['census'].items(), key=lambda item: -item[1]):
+        print("%-32s %10d" % (name, n))
+    print("\n%(soups)d soups, %(soups_per_second).1f soups/s with %(workers)d workers "
+          "(%(soups_per_second_per_core).1f soups/s per core)" % report)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+""" The board of the core under the rules an engine cannot run: the B0 rules fill
+    an unbounded universe, the board keeps its engine, its cells and its rule.
+    The hash of the board, updated by the steps, and its memory on a large board
+"""
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+import numpy as np
+
+from core import GOL_Core, ENGINES
+from Components.BoardFormats import write_board
+
+WIDTH, HEIGHT = 20, 15
+
+
+class UnboundedRuleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_set_engine(self):
+        core = GOL_Core(WIDTH, HEIGHT, rule='B0/S8')
+        core.load_cells(np.array([[3, 4], [5, 6], [7, 8]]))
+        state = core.engine.get_state().copy()
+        with self.assertRaises(ValueError):
+            core.set_engine('unbounded')
+        self.assertEqual(core.engine_name, 'numpy')
+        self.assertEqual(core.rule.rulestring, 'B0/S8')
+        np.testing.assert_array_equal(core.engine.get_state(), state)
+        core.step()
+
+    def test_set_rule(self):
+        core = GOL_Core(WIDTH, HEIGHT, 'unbounded')
+        with self.assertRaises(ValueError):
+            core.set_rule('B0/S8')
+        self.assertEqual(core.rule.rulestring, 'B3/S23')
+
+    def test_load(self):
+        path = os.path.join(self.folder, 'board.rle')
+        write_board(path, np.array([[1, 1], [1, 2], [1, 3]]), HEIGHT, 'B0/S8')
+        core = GOL_Core(WIDTH, HEIGHT, 'unbounded')
+        with self.assertRaises(ValueError):
+            core.load(path)
+        self.assertEqual(core.rule.rulestring, 'B3/S23')
+        self.assertEqual(core.engine.population(), 0)
+
+
+class BoardHashTest(unittest.TestCase):
+
+    def test_steps(self):
+        cells = np.argwhere(np.random.default_rng(0).random((30, 20)) < 0.35) + (5, 5)
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                core = GOL_Core(WIDTH*2, HEIGHT*2, name)
+                core.load_cells(cells)
+                core.paint([3, 4, 50], True)
+                for _ in range(10):
+                    core.step()
+                value = core.hash
+                core.rehash()
+                self.assertEqual(core.hash, value)
+                if hasattr(core.engine, 'close'):
+                    core.engine.close()
+
+    def test_memory(self):
+        """ The core of a 5000x5000 bit-packed board needs about the two bits per cell
+            of its engine: the hash keeps no key per cell, no board is unpacked
+        """
+        width = height = 5000
+        tracemalloc.start()
+        try:
+            core = GOL_Core(width, height, 'bitpacked')
+            core.load_cells(np.argwhere(np.random.default_rng(0).random((300, 300)) < 0.3) + 2000)
+            core.paint([5, 10, 12000], True)
+            core.set_cell(7, True)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, width*height // 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
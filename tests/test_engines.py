@@ -0,0 +1,147 @@
+""" Every engine against a brute-force NumPy step of the rule, on boards whose
+    sizes are not multiples of the words and stripes of the engines
+
+    $ python -m unittest discover tests
+"""
+import unittest
+import numpy as np
+
+from Components.Engine import NumpyEngine
+from Components.BitPackedEngine import BitPackedEngine
+from Components.ActiveEngine import ActiveEngine
+from Components.ParallelEngine import ParallelEngine
+from Components.TiledUniverse import TiledEngine
+from Components.HashLife import HashLife
+from Components.Rule import Rule
+
+RULES = ['B3/S23', 'B36/S23', 'B3678/S34678', 'B2/S', 'B1/S1', 'B0/S8', 'B0123478/S34678']
+SIZES = [(13, 64), (9, 130), (64, 13), (80, 60), (1, 1)]
+GENERATIONS = 8
+
+
+def reference_step(state, rule):
+    """ Next generation of a bounded board, the cells outside it are dead
+    """
+    padded = np.pad(state, 1)
+    w, h = state.shape
+    count = sum(padded[1 + di:1 + di + w, 1 + dj:1 + dj + h]
+                for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj)
+    return np.where(state == 1, np.isin(count, rule.survive), np.isin(count, rule.born)).astype(np.uint8)
+
+
+def random_state(width, height, seed, density=0.35):
+    return (np.random.default_rng(seed).random((width, height)) < density).astype(np.uint8)
+
+
+class BoundedEnginesTest(unittest.TestCase):
+
+    def check(self, factory):
+        for rulestring in RULES:
+            rule = Rule.parse(rulestring)
+            for seed, (width, height) in enumerate(SIZES):
+                with self.subTest(rule=rulestring, size=(width, height)):
+                    engine = factory(width, height)
+                    try:
+                        engine.set_rule(rule)
+                        state = random_state(width, height, seed)
+                        engine.set_state(state)
+                        for _ in range(GENERATIONS):
+                            old = state
+                            state = reference_step(state, rule)
+                            changed = engine.step()
+                            np.testing.assert_array_equal(engine.get_state(), state)
+                            self.assertEqual(sorted(np.asarray(changed).tolist()),
+                                             np.flatnonzero(old != state).tolist())
+                    finally:
+                        if hasattr(engine, 'close'):
+                            engine.close()
+
+    def test_numpy(self):
+        self.check(NumpyEngine)
+
+    def test_bitpacked(self):
+        self.check(BitPackedEngine)
+
+    def test_active(self):
+        self.check(ActiveEngine)
+
+    def test_parallel(self):
+        self.check(lambda width, height: ParallelEngine(width, height, workers=2))
+
+
+class BatchedCellsTest(unittest.TestCase):
+    """ The cells written in one batch by the brush, then a step from them
+    """
+
+    def test_set_cells_at(self):
+        rule = Rule.parse('B3/S23')
+        factories = {'numpy': NumpyEngine, 'bitpacked': BitPackedEngine, 'active': ActiveEngine,
+                     'parallel': lambda width, height: ParallelEngine(width, height, workers=2),
+                     'unbounded': TiledEngine}
+        for name, factory in factories.items():
+            for seed, (width, height) in enumerate(SIZES):
+                with self.subTest(engine=name, size=(width, height)):
+                    engine = factory(width, height)
+                    try:
+                        rng = np.random.default_rng(seed)
+                        state = random_state(width, height, seed)
+                        engine.set_state(state)
+                        for alive in (1, 0, 1):
+                            ids = np.unique(rng.integers(0, width*height, width*height // 3 + 1))
+                            engine.set_cells_at(ids, alive)
+                            state.flat[ids] = alive
+                            np.testing.assert_array_equal(engine.are_alive(ids), state.flat[ids] != 0)
+                            np.testing.assert_array_equal(engine.get_state(), state)
+                        engine.step()
+                        np.testing.assert_array_equal(engine.get_state(), reference_step(state, rule))
+                    finally:
+                        if hasattr(engine, 'close'):
+                            engine.close()
+
+
+class UnboundedEnginesTest(unittest.TestCase):
+    """ The unbounded engines against the reference on a board larger than the
+        cells can reach; they cannot run the B0 rules
+    """
+
+    def test_tiled(self):
+        for rulestring in RULES:
+            rule = Rule.parse(rulestring)
+            for seed, (width, height) in enumerate(SIZES):
+                with self.subTest(rule=rulestring, size=(width, height)):
+                    engine = TiledEngine(width, height)
+                    if rule.births_from_nothing:
+                        self.assertRaises(ValueError, engine.set_rule, rule)
+                        continue
+                    engine.set_rule(rule)
+                    state = random_state(width, height, seed)
+                    engine.set_state(state)
+                    universe = np.pad(state, GENERATIONS)
+                    for _ in range(GENERATIONS):
+                        engine.step()
+                        universe = reference_step(universe, rule)
+                    window = universe[GENERATIONS:GENERATIONS + width, GENERATIONS:GENERATIONS + height]
+                    np.testing.assert_array_equal(engine.get_state(), window)
+                    self.assertEqual(engine.population(), int(universe.sum()))
+
+    def test_hashlife(self):
+        for rulestring in RULES:
+            rule = Rule.parse(rulestring)
+            if rule.births_from_nothing:
+                continue
+            for seed, (width, height) in enumerate(SIZES):
+                for generations in (1, 5, 64):
+                    with self.subTest(rule=rulestring, size=(width, height), generations=generations):
+                        hashlife = HashLife(rule=rule)
+                        state = random_state(width, height, seed)
+                        hashlife.load(map(tuple, np.argwhere(state).tolist()))
+                        hashlife.advance(generations)
+                        universe = np.pad(state, generations)
+                        for _ in range(generations):
+                            universe = reference_step(universe, rule)
+                        expected = sorted(map(tuple, (np.argwhere(universe) - generations).tolist()))
+                        self.assertEqual(sorted(map(tuple, np.asarray(hashlife.cells()).tolist())), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+""" Round trips of the board files: every format, compressed or not, gives back
+    the cells, their position and the rule
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from Components.BoardFormats import FORMATS, GZIP, read_board, read_rule, write_board
+
+HEIGHT = 60
+
+
+class BoardFormatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        self.cells = np.argwhere(rng.random((37, 23)) < 0.3) + (5, 7)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def round_trip(self, name, cells, rule='B3/S23'):
+        path = os.path.join(self.folder, name)
+        write_board(path, cells, HEIGHT, rule)
+        read, positioned = read_board(path)
+        return np.asarray(read).reshape(-1, 2), positioned, read_rule(path)
+
+    def test_round_trip(self):
+        for fmt in FORMATS:
+            for suffix in ('', GZIP):
+                with self.subTest(format=fmt + suffix):
+                    read, positioned, _ = self.round_trip('board' + fmt + suffix, self.cells)
+                    self.assertTrue(positioned)
+                    self.assertEqual(sorted(map(tuple, read.tolist())), sorted(map(tuple, self.cells.tolist())))
+
+    def test_empty_board(self):
+        for fmt in FORMATS:
+            with self.subTest(format=fmt):
+                read, _, _ = self.round_trip('empty' + fmt, np.zeros((0, 2), dtype=np.int64))
+                self.assertEqual(len(read), 0)
+
+    def test_rule(self):
+        for fmt in ('.rle', '.cells'):
+            with self.subTest(format=fmt):
+                _, _, rule = self.round_trip('highlife' + fmt, self.cells, 'B36/S23')
+                self.assertEqual(rule, 'B36/S23')
+
+
+if __name__ == '__main__':
+    unittest.main()
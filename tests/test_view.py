@@ -0,0 +1,65 @@
+""" The window under a B0 rule: the unbounded universe cannot run it, choosing it
+    shows why in the status bar and keeps the bounded board, an exception in the
+    slot would abort the application
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+try:
+    from PyQt5 import QtWidgets
+except ImportError:
+    QtWidgets = None
+
+from Components.BoardFormats import write_board
+
+
+@unittest.skipIf(QtWidgets is None, "PyQt5 is not installed")
+class UnboundedRuleViewTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from model import GameOfLife
+        from view import GOL_View
+        cls.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+        cls.model = GameOfLife()
+        cls.view = GOL_View(cls.model)
+        cls.model.init_board()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.view.close()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        if self.view.unboundedAction.isChecked():
+            self.view.unboundedAction.trigger()
+        self.model.set_rule('B3/S23')
+
+    def test_unbounded_action(self):
+        self.model.set_rule('B0/S8')
+        self.view.unboundedAction.trigger()
+        self.assertFalse(self.view.unboundedAction.isChecked())
+        self.assertEqual(self.model.core.engine_name, 'numpy')
+        self.assertEqual(self.model.rule, 'B0/S8')
+        self.assertIn('fills an unbounded universe', self.view.statusBar().currentMessage())
+
+    def test_load_board(self):
+        self.view.unboundedAction.trigger()
+        self.assertEqual(self.model.core.engine_name, 'unbounded')
+        path = os.path.join(self.folder, 'board.rle')
+        write_board(path, np.array([[1, 1], [1, 2], [1, 3]]), self.model.max_num_cell_y, 'B0/S8')
+        self.model.read_csv(path)
+        self.assertEqual(self.model.rule, 'B3/S23')
+        self.assertIn('fills an unbounded universe', self.view.statusBar().currentMessage())
+
+
+if __name__ == '__main__':
+    unittest.main()
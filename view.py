@@ -4,7 +4,14 @@ from PyQt5 import QtGui, QtCore, QtWidgets
 import sys, os, csv
 import numpy as np
 
-from Components.Cell import Cell
+from Components.BoardItem import BoardItem
+from Components.MipPyramid import MipPyramid
+from Components.Minimap import Minimap
+from Components.PatternBox import PatternListModel, THUMBNAIL_SIZE
+from core import HISTORY_LENGTH, EXACT_JUMP
+from model import MAX_SPEED, AUTOSAVE_CHOICES, RULES
+from Components.Brush import BRUSH_SIZES
+import math
 
 DIR_NAME = os.path.dirname(os.path.abspath('__file__'))
 
@@ -22,6 +29,34 @@ HISTORY_5 = (115,81,0)
 
 CELL_ALIVE_COLOR = QtGui.QColor(240,201,2)
 BACKGROUND_COLOR = CELL_DEAD_COLOR = QtGui.QColor(150,150,161)
+CELL_ALIVE_BRUSH = QtGui.QBrush(CELL_ALIVE_COLOR)
+CELL_DEAD_BRUSH = QtGui.QBrush(CELL_DEAD_COLOR)
+
+# Default board rendering: 'image' paints the board from one image of the cells,
+# 'items' draws one graphics item for each cell
+RENDER_MODE = 'image'
+
+# Number of cells moved by the arrow keys on the unbounded universe
+SCROLL_STEP = 10
+
+def history_color(decay):
+    """ Return the RGB color of a history cell that was alive decay generations ago
+    """
+    if decay == 1:
+        return HISTORY_1
+    elif decay == 2:
+        return HISTORY_2
+    elif decay == 3:
+        return HISTORY_4
+    elif decay == 4:
+        return HISTORY_4
+    else:
+        return HISTORY_5
+
+# Palette of the history cells: brush of every decay index (0 is not a history cell)
+HISTORY_BRUSHES = [None] + [QtGui.QBrush(QtGui.QColor(*history_color(decay)))
+                            for decay in range(1, HISTORY_LENGTH + 1)]
+
 
 class GOL_View(QMainWindow):
 
@@ -29,20 +64,26 @@ class GOL_View(QMainWindow):
     speedChanged = QtCore.pyqtSignal()
     resetSignal = QtCore.pyqtSignal()
 
-    def __init__(self, model):
+    def __init__(self, model, render_mode=RENDER_MODE):
         super().__init__()
 
         self.model = model
+        self.render_mode = render_mode
 
         # Set up the user interface from Designer.
         self.ui = Ui_GameOfLife()
         self._pen = QtGui.QPen(QtCore.Qt.lightGray)
+        self.boardItem = None   # board image item
+        self._history = None    # decay of the history cells drawn as items
+        self.pyramid = None     # alive cells counts of the board at decreasing resolutions
 
         # Model signal 
         self.model.initViewSignal.connect(self.init_view)
-        self.model.drawItemAtSingal.connect(self.draw_cell)
+        if self.render_mode == 'items':
+            self.model.drawItemAtSingal.connect(self.draw_cell)
         self.model.fillCellSignal.connect(self.fill_cell)
         self.model.clearCellSignal.connect(self.clear_cell)
+        self.model.updateCellsSignal.connect(self.update_cells)
         self.model.historyFillSignal.connect(self.change_cell_intensity)
         self.model.resetSignal.connect(self.set_parBoard)
 
@@ -52,7 +93,14 @@ class GOL_View(QMainWindow):
         # Inizialize the QDesigner view
         self.ui.setupUi(self)
         self.ui.grid.setScene(self.model.scene)
-        self.ui.grid.setBackgroundBrush( QtGui.QBrush(BACKGROUND_COLOR, QtCore.Qt.SolidPattern))        
+        self.model.scene.setBackgroundBrush(QtGui.QBrush(BACKGROUND_COLOR, QtCore.Qt.SolidPattern))        
+        self.pyramid = MipPyramid(self.model.max_num_cell_x, self.model.max_num_cell_y)
+        if self.render_mode == 'image':
+            self.boardItem = BoardItem(self.model, CELL_ALIVE_COLOR, CELL_DEAD_COLOR,
+                                       [b.color() for b in HISTORY_BRUSHES[1:]], pyramid=self.pyramid)
+            self.model.scene.addItem(self.boardItem)
+        else:
+            self._history = np.zeros(self.model.max_num_cell_x*self.model.max_num_cell_y, dtype=np.uint8)
         # Disabling scroll area and scroll bar for the view.
         self.ui.grid.verticalScrollBar().blockSignals(True)
         self.ui.grid.horizontalScrollBar().blockSignals(True)
@@ -61,7 +109,19 @@ class GOL_View(QMainWindow):
         self.ui.grid.centerOn(QtCore.QPointF(self.model.max_window_dim[0]/2, self.model.max_window_dim[1]/2))
         self.ui.grid.scale(self.model.initialScale, self.model.initialScale)
 
+        self.init_patternBox()
         self.init_speedSlider()
+        self.init_turboBox()
+        self.init_stepBox()
+        self.init_timeline()
+        self.init_universe()
+        self.init_recording()
+        self.init_cycle()
+        self.init_rule()
+        self.init_brush()
+        self.init_profiler()
+        self.init_autosave()
+        self.init_minimap()
         self.connect()
     
     def set_parBoard(self):
@@ -100,6 +160,27 @@ class GOL_View(QMainWindow):
         self.ui.Zoom_Out.triggered.connect(lambda : self.model.zoom_view())
         self.ui.History.triggered.connect(lambda : self.history_action())
         self.ui.History.setCheckable(True)
+        self.unboundedAction.triggered.connect(lambda : self.change_universe())
+        self.recordAction.triggered.connect(lambda : self.model.record_board(self.recordAction.isChecked()))
+        self.replayAction.triggered.connect(lambda : self.model.open_recording())
+        self.previousAction.triggered.connect(lambda : self.model.previous_generation())
+        self.timelineSlider.valueChanged.connect(self.model.scrub)
+        self.model.timelineSignal.connect(self.update_timeline)
+        self.cycleGroup.triggered.connect(lambda action : setattr(self.model, 'cycle_action', action.data()))
+        self.model.cycleSignal.connect(self.show_cycle)
+        self.model.recordingSignal.connect(self.show_recording)
+        self.model.rateSignal.connect(self.show_rate)
+        self.model.profileSignal.connect(self.show_profile)
+        self.autosaveGroup.triggered.connect(lambda action : setattr(self.model, 'autosave_every', action.data()))
+        self.model.savedSignal.connect(self.show_saved)
+        self.ruleGroup.triggered.connect(self.set_rule)
+        self.brushGroup.triggered.connect(lambda action : setattr(self.model, 'brush_size', action.data()))
+        self.undoAction.triggered.connect(self.model.undo_stroke)
+        self.model.undoSignal.connect(self.undoAction.setEnabled)
+        self.model.ruleSignal.connect(self.show_rule)
+        self.model.messageSignal.connect(self.statusBar().showMessage)
+        self.overlayAction.triggered.connect(lambda : self.profile_overlay(self.overlayAction.isChecked()))
+        self.profileLogAction.triggered.connect(lambda : self.log_profile(self.profileLogAction.isChecked()))
 
         self.ui.actionRandom.triggered.connect(lambda : self.model.set_pattern(text="Random"))
         self.ui.actionDie_Hard.triggered.connect(lambda : self.model.set_pattern(text="Die Hard"))
@@ -108,7 +189,7 @@ class GOL_View(QMainWindow):
         self.ui.actionBlock_laying_Switch_Engine_v2.triggered.connect(lambda : self.model.set_pattern(text="Block-laying Switch Engine v2"))
         self.ui.actionGosper_GIlder_Gun.triggered.connect(lambda : self.model.set_pattern(text="Gosper Gilder Gun"))
 
-        self.ui.Quit.triggered.connect(lambda : sys.exit())
+        self.ui.Quit.triggered.connect(lambda : self.close())
 
         self.ui.historyCheckBox.stateChanged.connect(lambda : self.check_history())        
         self.ui.patternBox.activated.connect(lambda : self.model.set_pattern(self.ui.patternBox.currentText()))
@@ -117,20 +198,312 @@ class GOL_View(QMainWindow):
         self.model.scaleValueSignal.connect(self.change_scaleView)
 
 
+    def init_patternBox(self):
+        """ Fill the pattern box with the patterns of the library, with their thumbnail
+        """
+        self.patternModel = PatternListModel(self.model.library, ['Empty', 'Random'], ['Load your pattern...'],
+                                             CELL_ALIVE_COLOR, CELL_DEAD_COLOR)
+        self.ui.patternBox.setModel(self.patternModel)
+        self.ui.patternBox.setIconSize(QtCore.QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+
     def init_speedSlider(self):
-        """ Define behavior for the speed slider 
+        """ Define behavior for the speed slider: the target generations per second,
+            on a log scale, and the label with the speed achieved
         """
-        self.ui.speedSlider.setMinimum(400)
-        self.ui.speedSlider.setMaximum(2000)
-        self.ui.speedSlider.setValue(1200)
+        self.ui.speedSlider.setMinimum(0)
+        self.ui.speedSlider.setMaximum(100)
+        self.ui.speedSlider.setValue(round(100*math.log(self.model.speed, MAX_SPEED)))
         self.ui.speedSlider.valueChanged.connect(self.model.change_speed)
         self.ui.speedSlider.sliderMoved.connect(self.model.change_speed)
+        self.ui.speedSlider.valueChanged.connect(lambda : self.show_rate())
+        self.rateLabel = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.rateLabel)
+        self.show_rate()
+
+    def show_rate(self, rate=None):
+        """ Show the target generations per second and the ones achieved by the evolution
+        """
+        if rate is None:
+            self.rateLabel.setText("target %g gen/s" % self.model.speed)
+        else:
+            self.rateLabel.setText("%.1f gen/s (target %g)" % (rate, self.model.speed))
+
+    def init_turboBox(self):
+        """ Add to the tool bar the generations computed for every frame shown
+        """
+        self.turboBox = QtWidgets.QSpinBox()
+        self.turboBox.setRange(1, 10**4)
+        self.turboBox.setPrefix("x")
+        self.turboBox.setToolTip("Turbo: generations computed for every frame shown")
+        self.turboBox.valueChanged.connect(lambda value : setattr(self.model, 'turbo', value))
+        self.ui.toolBar.addWidget(self.turboBox)
+
+    def init_stepBox(self):
+        """ Add to the tool bar the number of generations computed by the Next action
+        """
+        self.stepBox = QtWidgets.QSpinBox()
+        self.stepBox.setRange(1, 10**9)
+        self.stepBox.setToolTip("Generations computed by Next Move; above %d, by HashLife on an "
+                                "unbounded universe" % EXACT_JUMP)
+        self.ui.toolBar.insertWidget(self.ui.History, self.stepBox)
+
+    def init_timeline(self):
+        """ Add to the tool bar and to the Edit menu the Previous Generation action, and
+            to the tool bar the slider that scrubs the timeline of the past generations
+        """
+        self.previousAction = QtWidgets.QAction(self.style().standardIcon(QtWidgets.QStyle.SP_MediaSkipBackward),
+                                                "&Previous Generation", self)
+        self.previousAction.setShortcut(QtGui.QKeySequence("Alt+Left"))
+        self.ui.toolBar.insertAction(self.ui.Next_Move, self.previousAction)
+        self.ui.menu_Edit.insertAction(self.ui.Next_Move, self.previousAction)
+        self.timelineSlider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        self.timelineSlider.setMaximumWidth(200)
+        self.timelineSlider.setEnabled(False)
+        self.timelineSlider.setToolTip("Timeline of the past generations")
+        self.ui.toolBar.insertWidget(self.ui.History, self.timelineSlider)
+
+    def update_timeline(self):
+        """ Move the timeline slider to the current generation
+        """
+        position, count = self.model.timeline_position()
+        self.timelineSlider.blockSignals(True)
+        self.timelineSlider.setRange(0, max(count - 1, 0))
+        self.timelineSlider.setValue(position)
+        self.timelineSlider.setEnabled(count > 1)
+        self.timelineSlider.blockSignals(False)
+
+    def init_universe(self):
+        """ Add to the Edit menu the choice of the unbounded universe, that can be
+            scrolled with the arrow keys
+        """
+        self.unboundedAction = QtWidgets.QAction("&Unbounded universe", self)
+        self.unboundedAction.setCheckable(True)
+        self.ui.menu_Edit.addSeparator()
+        self.ui.menu_Edit.addAction(self.unboundedAction)
+        for key, dx, dy in ((QtCore.Qt.Key_Left, -1, 0), (QtCore.Qt.Key_Right, 1, 0),
+                            (QtCore.Qt.Key_Up, 0, -1), (QtCore.Qt.Key_Down, 0, 1)):
+            shortcut = QtWidgets.QShortcut(QtGui.QKeySequence(key), self)
+            shortcut.activated.connect(lambda dx=dx, dy=dy : self.scroll_board(dx*SCROLL_STEP, dy*SCROLL_STEP))
+
+    def init_recording(self):
+        """ Add to the Edit menu the recording of the generations and to the File menu
+            the replay of a recording
+        """
+        self.recordAction = QtWidgets.QAction("&Record generations", self)
+        self.recordAction.setCheckable(True)
+        self.ui.menu_Edit.addAction(self.recordAction)
+        self.replayAction = QtWidgets.QAction("Open &recording...", self)
+        actions = self.ui.menu_Save.actions()
+        self.ui.menu_Save.insertAction(actions[actions.index(self.ui.Open) + 1], self.replayAction)
+
+    def show_recording(self, recording):
+        """ Check the Record action and show the recording file while recording
+        """
+        self.recordAction.setChecked(recording)
+        if recording:
+            self.statusBar().showMessage("Recording in %s" % self.model.core.recorder.path)
+        else:
+            self.statusBar().clearMessage()
+
+    def init_cycle(self):
+        """ Add to the Edit menu the choice of what the evolution does when the board
+            becomes periodic
+        """
+        menu = self.ui.menu_Edit.addMenu("When &stable")
+        self.cycleGroup = QtWidgets.QActionGroup(self)
+        for name, text in (('continue', "&Keep running"), ('pause', "&Pause"), ('fast-forward', "&Fast forward")):
+            action = menu.addAction(text)
+            action.setData(name)
+            action.setCheckable(True)
+            action.setChecked(name == self.model.cycle_action)
+            self.cycleGroup.addAction(action)
+
+    def show_cycle(self, period, generation):
+        """ Show in the status bar that the board is periodic
+        """
+        if period == 1:
+            self.statusBar().showMessage("Still life since generation %d" % generation)
+        else:
+            self.statusBar().showMessage("Cycle of period %d since generation %d" % (period, generation))
+
+    def init_rule(self):
+        """ Add to the Edit menu the rule of the evolution: the Life-like rules of RULES
+            and any rule given by its B/S rulestring
+        """
+        menu = self.ui.menu_Edit.addMenu("&Rule")
+        self.ruleGroup = QtWidgets.QActionGroup(self)
+        for name, rulestring in RULES.items():
+            action = menu.addAction("%s (%s)" % (name.replace("&", "&&"), rulestring))
+            action.setData(rulestring)
+            action.setCheckable(True)
+            self.ruleGroup.addAction(action)
+        menu.addSeparator()
+        self.customRuleAction = menu.addAction("&Custom...")
+        self.customRuleAction.setCheckable(True)
+        self.ruleGroup.addAction(self.customRuleAction)
+        self.show_rule(self.model.rule)
+
+    def set_rule(self, action):
+        """ Set the rule of the action, or ask the rulestring of a custom one
+        """
+        rule = action.data()
+        if action is self.customRuleAction:
+            rule, ok = QtWidgets.QInputDialog.getText(self, "Custom rule", "B/S rulestring (B36/S23, 23/36...):",
+                                                      text=self.model.rule)
+            if not ok:
+                self.show_rule(self.model.rule)
+                return
+        try:
+            self.model.set_rule(rule)
+        except ValueError as e:
+            self.statusBar().showMessage(str(e))
+            self.show_rule(self.model.rule)
+
+    def show_rule(self, rulestring):
+        """ Check the action of the rule, the custom one when it is not in the menu
+        """
+        for action in self.ruleGroup.actions():
+            if action.data() == rulestring:
+                action.setChecked(True)
+                break
+        else:
+            self.customRuleAction.setChecked(True)
+        self.customRuleAction.setText("&Custom (%s)..." % rulestring if self.customRuleAction.isChecked()
+                                      else "&Custom...")
+
+    def init_brush(self):
+        """ Add to the Edit menu the undo of the last stroke and the size of the brush
+            that draws the cells
+        """
+        self.undoAction = QtWidgets.QAction("&Undo stroke", self)
+        self.undoAction.setShortcut(QtGui.QKeySequence.Undo)
+        self.undoAction.setEnabled(self.model.can_undo)
+        self.ui.menu_Edit.addAction(self.undoAction)
+        menu = self.ui.menu_Edit.addMenu("&Brush size")
+        self.brushGroup = QtWidgets.QActionGroup(self)
+        for size in BRUSH_SIZES:
+            action = menu.addAction("%d cell%s" % (size, 's' if size > 1 else ''))
+            action.setData(size)
+            action.setCheckable(True)
+            action.setChecked(size == self.model.brush_size)
+            self.brushGroup.addAction(action)
+
+    def init_profiler(self):
+        """ Add to the Edit menu the overlay with the profiler statistics, drawn over
+            the board, and the log of the profiler
+        """
+        self.overlayAction = QtWidgets.QAction("Profiler &overlay", self)
+        self.overlayAction.setShortcut(QtGui.QKeySequence("F12"))
+        self.overlayAction.setCheckable(True)
+        self.profileLogAction = QtWidgets.QAction("&Log profile", self)
+        self.profileLogAction.setCheckable(True)
+        self.ui.menu_Edit.addSeparator()
+        self.ui.menu_Edit.addAction(self.overlayAction)
+        self.ui.menu_Edit.addAction(self.profileLogAction)
+        self.overlay = QtWidgets.QLabel(self.ui.grid)
+        self.overlay.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: white; padding: 4px;")
+        self.overlay.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        self.overlay.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.overlay.move(8, 8)
+        self.overlay.hide()
+
+    def profile_overlay(self, shown):
+        """ Show or hide the profiler statistics over the board
+        """
+        self.model.profile_overlay(shown)
+        self.overlay.setText("profiling...")
+        self.overlay.adjustSize()
+        self.overlay.setVisible(shown)
+
+    def log_profile(self, logging):
+        """ Start or stop the log of the profiler and show its file
+        """
+        path = self.model.log_profile(logging)
+        if path:
+            self.statusBar().showMessage("Profiling in %s" % path)
+        else:
+            self.statusBar().clearMessage()
+
+    def show_profile(self, stats):
+        """ Write in the overlay the ticks per second, the percentiles of the duration of
+            every phase and the counters per tick
+        """
+        if not self.overlay.isVisible():
+            return
+        lines = ["%6.1f fps   %d ticks   %d dropped" % (stats['fps'], stats['ticks'], stats['dropped_total']),
+                 "%-12s %7s %7s %7s %7s" % ('ms', 'p50', 'p90', 'p99', 'max')]
+        for name, ms in stats['ms'].items():
+            lines.append("%-12s %7.2f %7.2f %7.2f %7.2f" % (name, ms['p50'], ms['p90'], ms['p99'], ms['max']))
+        lines.append('   '.join("%s/tick %.1f" % item for item in stats['counts'].items()))
+        self.overlay.setText('\n'.join(lines))
+        self.overlay.adjustSize()
+
+    def init_autosave(self):
+        """ Add to the Edit menu the choice of the generations between two autosaves
+        """
+        menu = self.ui.menu_Edit.addMenu("&Autosave")
+        self.autosaveGroup = QtWidgets.QActionGroup(self)
+        for every in AUTOSAVE_CHOICES:
+            action = menu.addAction("Every %d generations" % every if every else "&Off")
+            action.setData(every)
+            action.setCheckable(True)
+            action.setChecked(every == self.model.autosave_every)
+            self.autosaveGroup.addAction(action)
+
+    def show_saved(self, path, error):
+        """ Show in the status bar the board file written, or why it was not
+        """
+        if error is None:
+            self.statusBar().showMessage("Saved %s" % path, 5000)
+        else:
+            self.statusBar().showMessage("Could not save %s: %s" % (path, error))
+
+    def init_minimap(self):
+        """ Add the minimap of the whole board in a dock, shown or hidden from the Edit menu
+        """
+        self.minimap = Minimap(self.pyramid, self.ui.grid, self.model.cell_size, CELL_ALIVE_COLOR, CELL_DEAD_COLOR)
+        self.minimapDock = QtWidgets.QDockWidget("Minimap", self)
+        self.minimapDock.setObjectName("minimapDock")
+        self.minimapDock.setWidget(self.minimap)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.minimapDock)
+        self.minimapDock.hide()
+        self.minimapAction = self.minimapDock.toggleViewAction()
+        self.minimapAction.setText("&Minimap")
+        self.minimapAction.setShortcut(QtGui.QKeySequence("Ctrl+M"))
+        self.ui.menu_Edit.addAction(self.minimapAction)
+
+    def closeEvent(self, event):
+        """ Stop the evolution and finish writing the saved boards before closing
+        """
+        self.model.close()
+        super().closeEvent(event)
+
+    def change_universe(self):
+        """ Switch between the bounded grid and the unbounded universe, the board keeps
+            its engine when the new one cannot run the rule
+        """
+        try:
+            self.model.set_engine('unbounded' if self.unboundedAction.isChecked() else 'numpy')
+        except ValueError as e:
+            self.statusBar().showMessage(str(e))
+            self.unboundedAction.setChecked(hasattr(self.model.engine, 'origin'))
+            return
+        self.model.sync_cells()
+        self.statusBar().clearMessage()
+
+    def scroll_board(self, dx, dy):
+        """ Move the grid over the unbounded universe and show its origin
+        """
+        self.model.scroll_board(dx, dy)
+        if hasattr(self.model.engine, 'origin'):
+            self.statusBar().showMessage("Origin: (%d, %d)" % self.model.engine.origin)
 
     def change_scaleView(self, value):
         """ Zooming the grid view according to the value 
         """
         self.ui.grid.centerOn(QtCore.QPointF(self.model.max_window_dim[0]/2, self.model.max_window_dim[1]/2)) 
         self.ui.grid.scale(value,value)
+        self.minimap.update()
 
     def draw_cell(self, data):
         """ Draw cell in the grid at pos (list of coordinates of graphic scene)
@@ -138,9 +511,9 @@ class GOL_View(QMainWindow):
         i, j = data[1], data[2]
         rect = QtWidgets.QGraphicsRectItem(i*self.model.cell_size, j*self.model.cell_size, self.model.cell_size, self.model.cell_size)
         rect.setPen(self._pen)
-        self.model.scene.addItem(rect)
         # Add functional data to GOL cell
         rect.setData(self.model.NameItem, data)
+        self.model.scene.add_cell(rect)
 
     def fill_cell(self, cell, color=CELL_ALIVE_COLOR):
         """ Fill the selected cell
@@ -152,30 +525,55 @@ class GOL_View(QMainWindow):
         """
         cell.setBrush( QtGui.QBrush( color ) )
 
-    def nextMove(self):
+    def update_cells(self, born, dead):
+        """ Fill the born cells and clear the dead ones (lists of cell ids)
+        """
+        self.pyramid.set_cells(born, dead)
+        if self.minimapDock.isVisible():
+            self.minimap.update()
+        if self.boardItem is not None:
+            self.boardItem.update_cells(born, dead)
+            return
+        self._history[born] = 0
+        self._history[dead] = 0
+        for idx in born:
+            self.model.scene.cell_item(idx).setBrush(CELL_ALIVE_BRUSH)
+        for idx in dead:
+            self.model.scene.cell_item(idx).setBrush(CELL_DEAD_BRUSH)
+
+    def nextMove(self, steps=None):
         """ When the Next action is triggered, that action will stop the board evolution
+            and compute the number of generations (steps) set in the step box
         """
+        if steps is None:
+            steps = self.stepBox.value()
         self.model.play_stop_evolution()
         self.ui.History.setChecked(False)
-        self.model.boardEvolution()
-    
-    def change_cell_intensity(self, data):
-        """ Change cell color intensity based on the decay index
-        """
-        rect = data[0]
-        decay = data[1]
-        if decay == 1:
-            new_color_intensity = HISTORY_1
-        elif decay == 2:
-            new_color_intensity = HISTORY_2
-        elif decay == 3:
-            new_color_intensity = HISTORY_4
-        elif decay == 4:
-            new_color_intensity = HISTORY_4
+        if steps == 1:
+            self.model.boardEvolution()
+            return
+        if self.model.core.jump_method(steps) == 'hashlife' and not hasattr(self.model.engine, 'origin'):
+            self.statusBar().showMessage("%d generations computed by HashLife on an unbounded universe: "
+                                         "the cells that left the board are lost" % steps)
         else:
-            new_color_intensity = HISTORY_5
-        color = QtGui.QColor(new_color_intensity[0], new_color_intensity[1], new_color_intensity[2])
-        self.fill_cell(rect, color)
+            self.statusBar().clearMessage()
+        self.model.jump(steps)
+    
+    def change_cell_intensity(self, decay):
+        """ Change cells color intensity based on their decay index (flat array of
+            every cell, 0 for the cells that are not history cells)
+        """
+        if self.boardItem is not None:
+            self.boardItem.set_history(decay)
+            return
+        # only the items whose history color changed are repainted
+        for idx in np.flatnonzero(decay != self._history).tolist():
+            if decay[idx]:
+                brush = HISTORY_BRUSHES[decay[idx]]
+            else:
+                brush = CELL_ALIVE_BRUSH if self.model.boardCell[idx].isAlive() else CELL_DEAD_BRUSH
+            self.model.scene.cell_item(idx).setBrush(brush)
+        self._history[...] = decay
 
     def check_history(self):
         """ Set model attribute history running like the status of the check box